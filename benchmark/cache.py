@@ -0,0 +1,66 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Optional
+
+import fastapi_async_safe
+
+ROOT = Path(__file__).parent
+CACHE_DIR = ROOT / ".cache"
+
+_PACKAGE_NAME = "fastapi-async-safe-dependencies"
+
+
+def library_version() -> str:
+    try:
+        version = metadata.version(_PACKAGE_NAME)
+    except metadata.PackageNotFoundError:
+        version = "0+unknown"
+
+    # version alone is not enough, local changes should invalidate cached results too
+    digest = hashlib.sha256()
+    for path in sorted(Path(fastapi_async_safe.__file__).parent.glob("*.py")):
+        digest.update(path.read_bytes())
+
+    return f"{version}+{digest.hexdigest()[:12]}"
+
+
+@dataclass
+class ResultsCache:
+    path: Path
+    version: str
+
+    @classmethod
+    def for_namespace(cls, namespace: str) -> "ResultsCache":
+        return cls(path=CACHE_DIR / namespace, version=library_version())
+
+    def _key(self, params: dict[str, Any]) -> dict[str, Any]:
+        return {**params, "version": self.version}
+
+    def _file(self, params: dict[str, Any]) -> Path:
+        raw = json.dumps(self._key(params), sort_keys=True, default=str)
+        return self.path / f"{hashlib.sha256(raw.encode()).hexdigest()}.json"
+
+    def get(self, **params: Any) -> Optional[Any]:
+        file = self._file(params)
+
+        try:
+            return json.loads(file.read_text())["result"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+    def set(self, result: Any, **params: Any) -> None:
+        file = self._file(params)
+        file.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp = file.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"params": self._key(params), "result": result}, default=str, indent=4))
+        tmp.replace(file)
+
+
+__all__ = [
+    "ResultsCache",
+    "library_version",
+]
@@ -0,0 +1,66 @@
+import json
+import sys
+from pathlib import Path
+
+import click
+
+from benchmark.history import HISTORY_FILE, Comparison, ResultsHistory, compare
+from benchmark.run import _FIELD_FORMATS, _TIME_FORMAT, _format_float, _md_output_gen
+
+
+def _format_params(params: str) -> str:
+    return " ".join(f"{key}={value}" for key, value in json.loads(params).items())
+
+
+def _md_output(comparisons: list[Comparison], metric: str) -> None:
+    fmt, *_ = _FIELD_FORMATS.get(metric, _TIME_FORMAT)
+
+    headers = ["Suite", "Params", "Config", "Old", "New", "Change", "95% CI of diff", "Verdict"]
+    rows = [
+        (
+            c.suite,
+            _format_params(c.params),
+            c.config,
+            fmt(c.old),
+            fmt(c.new),
+            f"{_format_float(c.change * 100)}%",
+            f"[{fmt(c.low)}, {fmt(c.high)}]",
+            c.verdict,
+        )
+        for c in comparisons
+    ]
+    width = max(len(v) for v in [*headers, *(v for row in rows for v in row)])
+
+    print("\n".join(_md_output_gen(rows, headers, width)))
+
+
+@click.command()
+@click.argument("old")
+@click.argument("new")
+@click.option("-m", "--metric", default="mean", help="Which field of benchmark result to compare")
+@click.option(
+    "--history",
+    default=HISTORY_FILE,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="File where benchmark results are stored",
+)
+def main(old: str, new: str, metric: str, history: Path) -> None:
+    records = ResultsHistory(history).load()
+    comparisons = compare(records, old, new, metric)
+
+    if not comparisons:
+        revisions = sorted({record.revision for record in records})
+
+        click.echo("No results to compare, each revision needs at least 2 runs with the same params", err=True)
+        click.echo(f"Stored revisions: {', '.join(revisions) or '-'}", err=True)
+        sys.exit(1)
+
+    _md_output(comparisons, metric)
+
+    # non-zero exit code, so it can be used as a CI check
+    if any(c.verdict == "regression" for c in comparisons):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,96 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict
 from operator import attrgetter
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 
+import click
 import matplotlib.pyplot as plt
 
-from benchmark.runner import benchmark
+from benchmark.cache import ResultsCache
+from benchmark.runner import BenchmarkResult, BenchmarkTestSuite, benchmark
 from benchmark.utils import run
 
 ROOT = Path(__file__).parent
 
+CONCURRENCY = [
+    *range(1, 10),
+    *range(10, 50, 2),
+    *range(50, 100, 5),
+    *range(100, 200, 10),
+    *range(200, 501, 25),
+]
+
+_Point = tuple[BenchmarkResult, BenchmarkResult]
+
+
+def _run_point(suite: BenchmarkTestSuite, requests: int, concurrency: int) -> list[dict[str, Any]]:
+    # executed inside of worker process, `run` creates fresh event loop for each point
+    results = run(
+        benchmark(
+            requests=requests,
+            concurrency=concurrency,
+            suite=suite,
+        ),
+    )
+
+    return [asdict(result) for result in results]
+
+
+def _from_cached(raw: list[dict[str, Any]]) -> _Point:
+    default, async_safe = (BenchmarkResult(**r) for r in raw)
+    return default, async_safe
+
+
+def collect(
+    *,
+    suite: BenchmarkTestSuite,
+    requests: int,
+    concurrency: list[int],
+    workers: Optional[int] = None,
+    cache: ResultsCache,
+    use_cache: bool = True,
+    cached_only: bool = False,
+) -> dict[int, _Point]:
+    results: dict[int, _Point] = {}
+    missing: list[int] = []
+
+    for c in concurrency:
+        cached = cache.get(suite=suite.value, requests=requests, concurrency=c) if use_cache else None
+
+        if cached is not None:
+            results[c] = _from_cached(cached)
+        elif not cached_only:
+            missing.append(c)
+
+    click.echo(f"{len(results)} points loaded from cache, {len(missing)} points to run", err=True)
+
+    if not missing:
+        return results
+
+    # spawn is used to make sure that each worker starts with clean interpreter state
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as executor:
+        futures = {executor.submit(_run_point, suite, requests, c): c for c in missing}
+
+        for future in as_completed(futures):
+            c = futures[future]
+            raw = future.result()
+
+            cache.set(raw, suite=suite.value, requests=requests, concurrency=c)
+            results[c] = _from_cached(raw)
+
+            click.echo(f"concurrency={c} done", err=True)
+
+    return results
+
+
+def plot(results: dict[int, _Point], path: Path) -> None:
+    concurrency = sorted(results)
+    points = [results[c] for c in concurrency]
 
-async def main() -> None:
     def _base_plt_format(subplt: plt.Subplot, y_label: str) -> None:
         subplt.set_ylabel(y_label)
         subplt.grid(which="major", linewidth=1)
@@ -18,26 +98,16 @@ async def main() -> None:
         subplt.minorticks_on()
         subplt.set_xlim(min(concurrency), max(concurrency))
 
-    concurrency = [
-        *range(1, 10),
-        *range(10, 50, 2),
-        *range(50, 100, 5),
-        *range(100, 200, 10),
-        *range(200, 501, 25),
-    ]
-
-    results = [await benchmark(requests=1000, concurrency=c) for c in concurrency]
-
     fig, (diff_plt, mean_plt, median_plt, max_plt, min_plt) = plt.subplots(5, figsize=(15, 30))
 
-    diff_plt.plot(concurrency, [a.mean / b.mean for a, b in results])
+    diff_plt.plot(concurrency, [a.mean / b.mean for a, b in points])
     _base_plt_format(diff_plt, y_label="Diff (times)")
 
     def _format_plat(subplt: plt.Subplot, key: str) -> None:
         getkey: Callable[[Any], float] = attrgetter(key)
 
-        subplt.plot(concurrency, [getkey(a) for a, _ in results], label="default")
-        subplt.plot(concurrency, [getkey(b) for _, b in results], label="async-safe")
+        subplt.plot(concurrency, [getkey(a) for a, _ in points], label="default")
+        subplt.plot(concurrency, [getkey(b) for _, b in points], label="async-safe")
         subplt.legend()
 
         _base_plt_format(subplt, y_label=f"{key.title()} (ms)")
@@ -49,8 +119,71 @@ async def main() -> None:
 
     median_plt.set_xlabel("Concurrency")
 
-    plt.savefig(ROOT / "benchmark.png")
+    plt.savefig(path)
+
+
+@click.command()
+@click.option(
+    "-n",
+    "--requests",
+    default=1000,
+    help="Number of requests to perform for each concurrency level",
+)
+@click.option(
+    "-s",
+    "--suite",
+    default=BenchmarkTestSuite.app,
+    type=click.Choice([v.value for v in BenchmarkTestSuite]),
+    help="Which test suite to run",
+)
+@click.option(
+    "-w",
+    "--workers",
+    default=os.cpu_count(),
+    help="Number of worker processes",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="Reuse results cached for the same suite, parameters and library version",
+)
+@click.option(
+    "--cached-only",
+    is_flag=True,
+    default=False,
+    help="Do not run anything, regenerate graph from cached results only",
+)
+@click.option(
+    "-o",
+    "--output",
+    default=ROOT / "benchmark.png",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Where to save the graph",
+)
+def main(
+    requests: int,
+    suite: BenchmarkTestSuite,
+    workers: int,
+    cache: bool,
+    cached_only: bool,
+    output: Path,
+) -> None:
+    results = collect(
+        suite=BenchmarkTestSuite(suite),
+        requests=requests,
+        concurrency=CONCURRENCY,
+        workers=workers,
+        cache=ResultsCache.for_namespace("graph"),
+        use_cache=cache,
+        cached_only=cached_only,
+    )
+
+    if not results:
+        click.echo("No results to plot", err=True)
+        return
+
+    plot(results, output)
 
 
 if __name__ == "__main__":
-    run(main())
+    main()
@@ -0,0 +1,200 @@
+import json
+import math
+import platform
+import statistics
+import subprocess
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Literal
+
+from benchmark.runner import BenchmarkResult
+
+ROOT = Path(__file__).parent
+HISTORY_FILE = ROOT / ".history" / "results.jsonl"
+
+Config = Literal["default", "async_safe"]
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],  # noqa: S607
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def python_version() -> str:
+    return f"{platform.python_implementation()}-{platform.python_version()}"
+
+
+@dataclass
+class HistoryRecord:
+    revision: str
+    python: str
+    suite: str
+    params: dict[str, Any]
+    config: Config
+    result: BenchmarkResult
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def group(self) -> tuple[str, str, str, Config]:
+        return self.python, self.suite, json.dumps(self.params, sort_keys=True), self.config
+
+    @classmethod
+    def from_json(cls, raw: dict[str, Any]) -> "HistoryRecord":
+        return cls(**{**raw, "result": BenchmarkResult(**raw["result"])})
+
+
+@dataclass
+class ResultsHistory:
+    path: Path = HISTORY_FILE
+
+    def append(self, records: Iterable[HistoryRecord]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self.path.open("a") as f:
+            for record in records:
+                f.write(json.dumps(asdict(record)) + "\n")
+
+    def load(self) -> list[HistoryRecord]:
+        try:
+            lines = self.path.read_text().splitlines()
+        except FileNotFoundError:
+            return []
+
+        return [HistoryRecord.from_json(json.loads(line)) for line in lines if line.strip()]
+
+
+def records_for(
+    results: Iterable[tuple[BenchmarkResult, BenchmarkResult]],
+    *,
+    suite: str,
+    params: dict[str, Any],
+) -> list[HistoryRecord]:
+    revision = git_revision()
+    python = python_version()
+
+    records: list[HistoryRecord] = []
+    for default, async_safe in results:
+        configs: tuple[tuple[Config, BenchmarkResult], ...] = (("default", default), ("async_safe", async_safe))
+
+        records.extend(
+            HistoryRecord(revision=revision, python=python, suite=suite, params=params, config=config, result=result)
+            for config, result in configs
+        )
+
+    return records
+
+
+# two-sided 95% critical values of t-distribution for 1..30 degrees of freedom
+_T_95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)  # fmt: skip
+_Z_95 = 1.96
+
+
+def _t_critical(df: float) -> float:
+    if df >= len(_T_95):
+        return _Z_95
+
+    return _T_95[max(int(df), 1) - 1]
+
+
+@dataclass
+class Comparison:
+    suite: str
+    params: str
+    config: Config
+    old: float
+    new: float
+    # 95% confidence interval of difference between new and old means
+    low: float
+    high: float
+
+    @property
+    def change(self) -> float:
+        return (self.new - self.old) / self.old
+
+    @property
+    def verdict(self) -> str:
+        # lower is better for all tracked metrics
+        if self.low > 0:
+            return "regression"
+        if self.high < 0:
+            return "improvement"
+
+        return "no change"
+
+
+def _welch_interval(old: list[float], new: list[float]) -> tuple[float, float]:
+    old_var = statistics.variance(old) / len(old)
+    new_var = statistics.variance(new) / len(new)
+    diff = statistics.mean(new) - statistics.mean(old)
+
+    se = math.sqrt(old_var + new_var)
+    if not se:
+        return diff, diff
+
+    # Welch-Satterthwaite approximation of degrees of freedom
+    df = (old_var + new_var) ** 2 / (old_var**2 / (len(old) - 1) + new_var**2 / (len(new) - 1))
+    margin = _t_critical(df) * se
+
+    return diff - margin, diff + margin
+
+
+def compare(
+    records: Iterable[HistoryRecord],
+    old_revision: str,
+    new_revision: str,
+    metric: str = "mean",
+) -> list[Comparison]:
+    samples: dict[tuple[str, str, str, Config], dict[str, list[float]]] = defaultdict(lambda: defaultdict(list))
+
+    for record in records:
+        value = getattr(record.result, metric)
+
+        if record.revision in (old_revision, new_revision) and value is not None:
+            samples[record.group][record.revision].append(value)
+
+    comparisons = []
+    for (_, suite, params, config), by_revision in sorted(samples.items()):
+        old, new = by_revision[old_revision], by_revision[new_revision]
+
+        # at least two runs of each revision are required to estimate variance
+        if len(old) < 2 or len(new) < 2:
+            continue
+
+        low, high = _welch_interval(old, new)
+        comparisons.append(
+            Comparison(
+                suite=suite,
+                params=params,
+                config=config,
+                old=statistics.mean(old),
+                new=statistics.mean(new),
+                low=low,
+                high=high,
+            ),
+        )
+
+    return comparisons
+
+
+__all__ = [
+    "Comparison",
+    "HistoryRecord",
+    "ResultsHistory",
+    "compare",
+    "git_revision",
+    "records_for",
+]
@@ -0,0 +1,351 @@
+import inspect
+import itertools
+import random
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from json import dumps
+from pathlib import Path
+from typing import Any, Callable, Literal, Optional, Sequence
+
+import click
+import matplotlib.pyplot as plt
+from dependency_injector import providers
+from fastapi import FastAPI
+
+from benchmark.run import _format_float, _format_time, _md_output_gen
+from benchmark.runner import BenchmarkResult, benchmark_app
+from benchmark.startup import _dependency, _endpoint, _signature
+from benchmark.utils import run
+from fastapi_async_safe import init_app
+from fastapi_async_safe.bench import RequestsSpan
+
+_SHARED_POOL_SIZE = 2
+
+Variant = Literal["native", "async_safe", "injector"]
+VARIANTS: tuple[Variant, ...] = ("native", "async_safe", "injector")
+
+
+@dataclass
+class OverheadParams:
+    depth: int
+    fanout: int
+    sharing: float  # probability that dependency is taken from a shared pool of its level
+    async_ratio: float  # probability that dependency is a coroutine function instead of sync class
+    seed: int = 0
+
+
+@dataclass(eq=False)
+class _Node:
+    name: str
+    is_async: bool
+    children: list["_Node"]
+
+
+class _GraphGenerator:
+    def __init__(self, params: OverheadParams) -> None:
+        self.params = params
+        self.random = random.Random(params.seed)  # noqa: S311
+        self.counter = 0
+
+        # shared dependencies are resolved once per request by FastAPI, but created for each usage by factories
+        self.shared: list[list[_Node]] = [[] for _ in range(params.depth)]
+        for level in reversed(range(params.depth)):
+            self.shared[level] = [self._new(level) for _ in range(_SHARED_POOL_SIZE)]
+
+    def _new(self, level: int) -> _Node:
+        self.counter += 1
+
+        children = [self._node(level + 1) for _ in range(self.params.fanout)] if level + 1 < self.params.depth else []
+        is_async = self.random.random() < self.params.async_ratio
+
+        return _Node(f"Dependency{self.counter}", is_async, children)
+
+    def _node(self, level: int) -> _Node:
+        if self.random.random() < self.params.sharing:
+            return self.random.choice(self.shared[level])
+
+        return self._new(level)
+
+    def roots(self) -> list[_Node]:
+        return [self._node(0) for _ in range(self.params.fanout)] if self.params.depth else []
+
+
+def generate_graph(params: OverheadParams) -> list[_Node]:
+    return _GraphGenerator(params).roots()
+
+
+def _walk(nodes: Sequence[_Node]) -> Iterator[_Node]:
+    for node in nodes:
+        yield node
+        yield from _walk(node.children)
+
+
+def _coroutine_dependency(name: str, children: Sequence[Any]) -> Callable[..., Any]:
+    async def dependency(**_: Any) -> None:
+        pass
+
+    dependency.__name__ = dependency.__qualname__ = name
+    dependency.__signature__ = _signature(children, self_param=False)  # type: ignore[attr-defined]
+
+    return dependency
+
+
+def _fastapi_calls(roots: Sequence[_Node]) -> dict[int, Any]:
+    calls: dict[int, Any] = {}
+
+    def _call(node: _Node) -> Any:
+        if id(node) not in calls:
+            children = [_call(child) for child in node.children]
+            factory = _coroutine_dependency if node.is_async else _dependency
+            calls[id(node)] = factory(node.name, children)
+
+        return calls[id(node)]
+
+    for root in roots:
+        _call(root)
+
+    return calls
+
+
+def _injector_providers(roots: Sequence[_Node], calls: dict[int, Any]) -> list[providers.Provider[Any]]:
+    by_node: dict[int, providers.Provider[Any]] = {}
+
+    # the same classes and functions are used, only the way they are resolved is different
+    def _provider(node: _Node) -> providers.Provider[Any]:
+        if id(node) not in by_node:
+            call = calls[id(node)]
+            kwargs = {f"dep_{i}": _provider(child) for i, child in enumerate(node.children)}
+
+            by_node[id(node)] = (
+                providers.Coroutine(call, **kwargs) if node.is_async else providers.Factory(call, **kwargs)
+            )
+
+        return by_node[id(node)]
+
+    return [_provider(root) for root in roots]
+
+
+def generate_app(params: OverheadParams, variant: Variant) -> FastAPI:
+    roots = generate_graph(params)
+    calls = _fastapi_calls(roots)
+
+    app = FastAPI()
+
+    if variant == "injector":
+        root_providers = _injector_providers(roots, calls)
+
+        # graph is generated, so providers are called directly instead of module wiring with `Provide` markers
+        async def endpoint() -> None:
+            for provider in root_providers:
+                result = provider()
+
+                if inspect.isawaitable(result):
+                    await result
+
+        app.add_api_route("/", endpoint, methods=["GET"])
+    else:
+        app.add_api_route("/", _endpoint("endpoint", [calls[id(root)] for root in roots]), methods=["GET"])
+
+    if variant == "async_safe":
+        init_app(app)
+
+    return app
+
+
+@dataclass
+class VariantResult:
+    result: BenchmarkResult
+    throughput: float  # requests per second
+    per_call: float  # ms, mean latency divided by number of dependency calls per request
+
+
+@dataclass
+class OverheadResult:
+    params: OverheadParams
+    nodes: int  # dependencies in the graph, each usage is counted
+    calls: int  # dependencies called by FastAPI per request, shared ones are called once
+    variants: dict[str, VariantResult]
+
+    @property
+    def gain_per_call(self) -> float:
+        # ms, time saved by the library on each dependency call
+        return (self.variants["native"].result.mean - self.variants["async_safe"].result.mean) / max(self.calls, 1)
+
+
+def benchmark_overhead(params: OverheadParams, *, requests: int, concurrency: int) -> OverheadResult:
+    roots = generate_graph(params)
+    nodes = list(_walk(roots))
+    calls = len({id(node) for node in nodes})
+
+    variants: dict[str, VariantResult] = {}
+    for variant in VARIANTS:
+        app = RequestsSpan(generate_app(params, variant))
+        result = run(benchmark_app(app, requests=requests, concurrency=concurrency))
+
+        # factories of dependency-injector create shared dependencies for each usage
+        variant_calls = len(nodes) if variant == "injector" else calls
+
+        variants[variant] = VariantResult(
+            result=result,
+            throughput=requests / app.elapsed,
+            per_call=result.mean / max(variant_calls, 1),
+        )
+
+    return OverheadResult(params=params, nodes=len(nodes), calls=calls, variants=variants)
+
+
+def plot(results: Sequence[OverheadResult], path: Path) -> None:
+    points = sorted(results, key=lambda r: r.nodes)
+    nodes = [result.nodes for result in points]
+
+    _, (mean_plt, throughput_plt, per_call_plt) = plt.subplots(3, figsize=(15, 18))
+
+    def _format_plt(subplt: plt.Subplot, y_label: str, value: Callable[[VariantResult], float]) -> None:
+        for variant in VARIANTS:
+            subplt.plot(nodes, [value(r.variants[variant]) for r in points], marker="o", label=variant)
+
+        subplt.set_ylabel(y_label)
+        subplt.grid(which="major", linewidth=1)
+        subplt.grid(which="minor", linewidth=0.2)
+        subplt.minorticks_on()
+        subplt.legend()
+
+    _format_plt(mean_plt, "Mean (ms)", lambda v: v.result.mean)
+    _format_plt(throughput_plt, "Throughput (rps)", lambda v: v.throughput)
+    _format_plt(per_call_plt, "Mean per dependency call (ms)", lambda v: v.per_call)
+
+    per_call_plt.set_xlabel("Dependencies in graph")
+
+    plt.savefig(path)
+
+
+_MD_HEADERS = [
+    "Depth",
+    "Fanout",
+    "Sharing",
+    "Async",
+    "Nodes",
+    "Calls",
+    *(f"{name} {variant}" for variant in VARIANTS for name in ("Mean", "RPS")),
+    "Gain per call",
+]
+
+
+def _md_output(results: Sequence[OverheadResult]) -> None:
+    rows = [
+        (
+            str(result.params.depth),
+            str(result.params.fanout),
+            _format_float(result.params.sharing),
+            _format_float(result.params.async_ratio),
+            str(result.nodes),
+            str(result.calls),
+            *(
+                value
+                for variant in VARIANTS
+                for value in (
+                    _format_time(result.variants[variant].result.mean),
+                    _format_float(result.variants[variant].throughput),
+                )
+            ),
+            _format_time(result.gain_per_call),
+        )
+        for result in results
+    ]
+
+    print("\n".join(_md_output_gen(rows, _MD_HEADERS, max(len(h) for h in _MD_HEADERS))))
+
+
+def _iter_params(
+    depth: Sequence[int],
+    fanout: Sequence[int],
+    sharing: Sequence[float],
+    async_ratio: Sequence[float],
+    seed: int,
+) -> Iterator[OverheadParams]:
+    for d, f, s, a in itertools.product(depth, fanout, sharing, async_ratio):
+        yield OverheadParams(depth=d, fanout=f, sharing=s, async_ratio=a, seed=seed)
+
+
+@click.command()
+@click.option("-n", "--requests", default=1000, help="Number of requests to perform for each graph and variant")
+@click.option("-c", "--concurrency", default=10, help="Number of concurrent requests")
+@click.option(
+    "-d",
+    "--depth",
+    default=(1, 2, 3, 4),
+    multiple=True,
+    type=int,
+    help="Depth of dependency graph, can be passed multiple times",
+)
+@click.option(
+    "-f",
+    "--fanout",
+    default=(2, 3),
+    multiple=True,
+    type=int,
+    help="Number of sub-dependencies of each dependency, can be passed multiple times",
+)
+@click.option(
+    "-s",
+    "--sharing",
+    default=(0.0, 0.5),
+    multiple=True,
+    type=float,
+    help="Probability that dependency is taken from a shared pool, can be passed multiple times",
+)
+@click.option(
+    "-a",
+    "--async-ratio",
+    default=(0.0, 0.5),
+    multiple=True,
+    type=float,
+    help="Probability that dependency is a coroutine function, can be passed multiple times",
+)
+@click.option("--seed", default=0, help="Random seed used to generate graphs")
+@click.option(
+    "-o",
+    "--output",
+    default="md",
+    type=click.Choice(["json", "md"]),
+    help="Output format (json or markdown)",
+)
+@click.option(
+    "--plot",
+    "plot_path",
+    default=None,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Where to save the graph of latency and throughput against graph size",
+)
+def main(
+    requests: int,
+    concurrency: int,
+    depth: tuple[int, ...],
+    fanout: tuple[int, ...],
+    sharing: tuple[float, ...],
+    async_ratio: tuple[float, ...],
+    seed: int,
+    output: Literal["json", "md"],
+    plot_path: Optional[Path],
+) -> None:
+    results = []
+    for params in _iter_params(depth, fanout, sharing, async_ratio, seed):
+        results.append(benchmark_overhead(params, requests=requests, concurrency=concurrency))
+        click.echo(f"{params} done", err=True)
+
+    if output == "json":
+        print(
+            dumps(
+                [{**asdict(result), "gain_per_call": result.gain_per_call} for result in results],
+                indent=4,
+            ),
+        )
+    else:
+        _md_output(results)
+
+    if plot_path is not None:
+        plot(results, plot_path)
+
+
+if __name__ == "__main__":
+    main()
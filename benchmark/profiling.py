@@ -0,0 +1,79 @@
+import pstats
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from fastapi_async_safe.bench import profiled
+
+ROOT = Path(__file__).parent
+PROFILES_DIR = ROOT / ".profiles"
+
+
+@dataclass
+class ProfileDiffRow:
+    function: str
+    default: float  # ms, own time of function (without sub-calls)
+    async_safe: float
+
+    @property
+    def diff(self) -> float:
+        return self.default - self.async_safe
+
+
+def profile_path(
+    directory: Path,
+    *,
+    suite: str,
+    concurrency: int,
+    limiter_tokens: Optional[int],
+    add_async_safe: bool,
+) -> Path:
+    config = "async_safe" if add_async_safe else "default"
+    limiter = "default" if limiter_tokens is None else limiter_tokens
+
+    return directory / f"{suite}-c{concurrency}-l{limiter}-{config}.prof"
+
+
+def _function_name(key: tuple[str, int, str]) -> str:
+    filename, line, name = key
+
+    # builtins are stored as `~` file
+    if filename == "~":
+        return name
+
+    return f"{Path(filename).name}:{line}({name})"
+
+
+def _own_times(path: Path) -> dict[str, float]:
+    stats = pstats.Stats(str(path))
+
+    return {
+        _function_name(key): tottime * 1_000
+        for key, (_, _, tottime, _, _) in stats.stats.items()  # type: ignore[attr-defined]
+    }
+
+
+def profile_diff(default: Path, async_safe: Path, top: int = 20) -> list[ProfileDiffRow]:
+    default_times = _own_times(default)
+    async_safe_times = _own_times(async_safe)
+
+    rows = [
+        ProfileDiffRow(
+            function=name,
+            default=default_times.get(name, 0.0),
+            async_safe=async_safe_times.get(name, 0.0),
+        )
+        for name in default_times.keys() | async_safe_times.keys()
+    ]
+
+    rows.sort(key=lambda row: abs(row.diff), reverse=True)
+    return rows[:top]
+
+
+__all__ = [
+    "PROFILES_DIR",
+    "ProfileDiffRow",
+    "profile_diff",
+    "profile_path",
+    "profiled",
+]
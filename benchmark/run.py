@@ -1,10 +1,13 @@
 from dataclasses import asdict, dataclass, fields, is_dataclass
 from json import dumps
-from typing import Any, Iterator, Literal
+from pathlib import Path
+from typing import Any, Callable, Iterator, Literal, Optional, Sequence
 
 import click
 
-from benchmark.runner import BenchmarkResult, BenchmarkTestSuite, benchmark
+from benchmark.history import HISTORY_FILE, ResultsHistory, records_for
+from benchmark.profiling import PROFILES_DIR, profile_diff, profile_path
+from benchmark.runner import BenchmarkResult, BenchmarkTestSuite, MatrixCell, benchmark, benchmark_matrix
 from benchmark.utils import run
 
 
@@ -42,43 +45,225 @@ _MD_COL_WIDTH = 15
 _MD_HEADERS = ["Type", "Default", "Async Safe", "Diff"]
 
 
-def _md_output_gen(rows: list[tuple[str, str, str, str]]) -> Iterator[str]:
+def _md_output_gen(
+    rows: Sequence[Sequence[str]],
+    headers: Sequence[str] = tuple(_MD_HEADERS),
+    width: int = _MD_COL_WIDTH,
+) -> Iterator[str]:
     def _pad(s: str) -> str:
-        return f"{s:<{_MD_COL_WIDTH}}"
+        return f"{s:<{width}}"
 
-    yield f"| {' | '.join(_pad(h) for h in _MD_HEADERS)} |"
-    yield f"|{'|'.join('-' * (_MD_COL_WIDTH + 2) for _ in _MD_HEADERS)}|"
+    yield f"| {' | '.join(_pad(h) for h in headers)} |"
+    yield f"|{'|'.join('-' * (width + 2) for _ in headers)}|"
 
     for row in rows:
         yield f"| {' | '.join(_pad(r) for r in row)} |"
 
 
+def _format_float(f: float) -> str:
+    return f"{f:.2f}"
+
+
+def _format_time(f: float) -> str:
+    return f"{_format_float(f)}ms"
+
+
+def _format_memory(value: float) -> str:
+    return f"{_format_float(value / 1024 / 1024)}MB"
+
+
+def _format_count(value: float) -> str:
+    return str(int(value))
+
+
+def _format_diff(diff: float, better: str = "faster", worse: str = "slower") -> str:
+    if diff > 1:
+        return f"x{_format_float(diff)} ({better})"
+    if diff < 1:
+        return f"x{_format_float(diff)} ({worse})"
+
+    return "x1 (same)"
+
+
+# lower is better for all values, only units are different
+_FIELD_FORMATS: dict[str, tuple[Callable[[float], str], str, str]] = {
+    "max_threads": (_format_count, "fewer", "more"),
+    "max_busy_threads": (_format_count, "fewer", "more"),
+    "peak_memory": (_format_memory, "less", "more"),
+    "memory_per_request": (_format_memory, "less", "more"),
+    "retained_memory": (_format_memory, "less", "more"),
+}
+_TIME_FORMAT = (_format_time, "faster", "slower")
+
+
+def _ratio(a: float, b: float) -> float:
+    if not b:
+        return 1.0 if not a else float("inf")
+
+    return a / b
+
+
 def _md_output(rows: list[ResultRow]) -> None:
-    def _format_float(f: float) -> str:
-        return f"{f:.2f}"
-
-    def _format_time(f: float) -> str:
-        return f"{_format_float(f)}ms"
-
-    def _format_diff(diff: float) -> str:
-        if diff > 1:
-            return f"x{_format_float(diff)} (faster)"
-        if diff < 1:
-            return f"x{_format_float(diff)} (slower)"
-
-        return "x1 (same)"
-
-    formatted_rows = [
-        (
-            row.type,
-            _format_time(row.default),
-            _format_time(row.async_safe),
-            _format_diff(row.diff),
+    def _format_row(row: ResultRow) -> tuple[str, ...]:
+        fmt, better, worse = _FIELD_FORMATS.get(row.type, _TIME_FORMAT)
+        return row.type, fmt(row.default), fmt(row.async_safe), _format_diff(row.diff, better, worse)
+
+    formatted_rows = [_format_row(row) for row in rows]
+    width = max(_MD_COL_WIDTH, *(len(v) for row in formatted_rows for v in row))
+
+    print("\n".join(_md_output_gen(formatted_rows, width=width)))
+
+
+def _md_matrix_output(cells: list[MatrixCell]) -> None:
+    limiters = sorted({cell.limiter for cell in cells})
+    concurrency = sorted({cell.concurrency for cell in cells})
+    by_key = {(cell.limiter, cell.concurrency): cell for cell in cells}
+
+    def _table(title: str, fmt: Any) -> None:
+        headers = ["Limiter", *(f"Concurrency {c}" for c in concurrency)]
+        rows = [[str(limiter), *(fmt(by_key[limiter, c]) for c in concurrency)] for limiter in limiters]
+
+        width = max(len(v) for v in [*headers, *(v for row in rows for v in row)])
+
+        print(f"\n### {title}\n")
+        print("\n".join(_md_output_gen(rows, headers, width)))
+
+    _table("Mean (default)", lambda cell: _format_time(cell.default.mean))
+    _table("Mean (async-safe)", lambda cell: _format_time(cell.async_safe.mean))
+    _table("Gap (default - async-safe)", lambda cell: _format_time(cell.gap))
+    _table("Diff", lambda cell: _format_diff(cell.diff))
+
+    # resource usage is tracked only when it's requested
+    for name in _FIELD_FORMATS:
+        if all(getattr(cell.default, name) is not None for cell in cells):
+            fmt, *_ = _FIELD_FORMATS[name]
+
+            _table(f"{name} (default)", lambda cell, n=name, f=fmt: f(getattr(cell.default, n)))
+            _table(f"{name} (async-safe)", lambda cell, n=name, f=fmt: f(getattr(cell.async_safe, n)))
+
+
+def _print_profile_diff(
+    profile_dir: Path,
+    *,
+    suite: BenchmarkTestSuite,
+    concurrency: int,
+    limiter_tokens: Optional[int],
+    top: int,
+) -> None:
+    default, async_safe = (
+        profile_path(
+            profile_dir,
+            suite=suite.value,
+            concurrency=concurrency,
+            limiter_tokens=limiter_tokens,
+            add_async_safe=add_async_safe,
+        )
+        for add_async_safe in (False, True)
+    )
+
+    rows = [
+        (row.function, _format_time(row.default), _format_time(row.async_safe), _format_time(row.diff))
+        for row in profile_diff(default, async_safe, top)
+    ]
+    headers = ["Function", "Default", "Async Safe", "Gap"]
+    width = max(len(v) for v in [*headers, *(v for row in rows for v in row)])
+
+    # profile is printed to stderr, so results output can still be piped as is
+    click.echo(f"\n### Profile (suite={suite}, concurrency={concurrency}, limiter={limiter_tokens})\n", err=True)
+    click.echo(f"Profiles: {default}, {async_safe}\n", err=True)
+    click.echo("\n".join(_md_output_gen(rows, headers, width)), err=True)
+
+
+def _history_params(
+    requests: int,
+    concurrency: int,
+    limiter_tokens: Optional[int],
+    profile_dir: Optional[Path],
+    track_memory: bool,
+) -> dict[str, Any]:
+    # profiling and memory tracking slow down requests, so such results are not comparable with regular ones
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "limiter": limiter_tokens,
+        "profile": profile_dir is not None,
+        "track_memory": track_memory,
+    }
+
+
+_DEFAULT_LIMITER = 40  # anyio default
+
+
+def matrix(
+    *,
+    requests: int,
+    concurrency: Sequence[int],
+    limiters: Sequence[int],
+    suite: BenchmarkTestSuite,
+    output: Literal["json", "md"],
+    profile_dir: Optional[Path] = None,
+    profile_top: int = 20,
+    track_memory: bool = False,
+    repeat: int = 1,
+    history: Optional[ResultsHistory] = None,
+) -> None:
+    runs = [
+        run(
+            benchmark_matrix(
+                requests=requests,
+                concurrency=concurrency,
+                limiters=limiters,
+                suite=suite,
+                profile_dir=profile_dir,
+                track_memory=track_memory,
+            )
         )
-        for row in rows
+        for _ in range(repeat)
     ]
 
-    print("\n".join(_md_output_gen(formatted_rows)))
+    # each cell of the matrix is stored separately, so it can be compared with single runs
+    if history is not None:
+        for repeated in zip(*runs):
+            params = _history_params(requests, repeated[0].concurrency, repeated[0].limiter, profile_dir, track_memory)
+
+            history.append(
+                records_for(
+                    [(c.default, c.async_safe) for c in repeated],
+                    suite=suite.value,
+                    params=params,
+                )
+            )
+
+    cells = [
+        MatrixCell(
+            limiter=repeated[0].limiter,
+            concurrency=repeated[0].concurrency,
+            default=BenchmarkResult.average([c.default for c in repeated]),
+            async_safe=BenchmarkResult.average([c.async_safe for c in repeated]),
+        )
+        for repeated in zip(*runs)
+    ]
+
+    if profile_dir is not None:
+        for cell in cells:
+            _print_profile_diff(
+                profile_dir,
+                suite=suite,
+                concurrency=cell.concurrency,
+                limiter_tokens=cell.limiter,
+                top=profile_top,
+            )
+
+    if output == "json":
+        print(
+            dumps(
+                [{**asdict(cell), "diff": cell.diff, "gap": cell.gap} for cell in cells],
+                default=_json_default,
+                indent=4,
+            ),
+        )
+    else:
+        _md_matrix_output(cells)
 
 
 @click.command()
@@ -91,8 +276,17 @@ def _md_output(rows: list[ResultRow]) -> None:
 @click.option(
     "-c",
     "--concurrency",
-    default=10,
-    help="Number of concurrent requests",
+    default=(10,),
+    multiple=True,
+    type=int,
+    help="Number of concurrent requests, can be passed multiple times to build a matrix",
+)
+@click.option(
+    "-l",
+    "--limiter",
+    multiple=True,
+    type=int,
+    help="Size of anyio thread limiter (40 by default), can be passed multiple times to build a matrix",
 )
 @click.option(
     "-s",
@@ -108,32 +302,109 @@ def _md_output(rows: list[ResultRow]) -> None:
     type=click.Choice(["json", "md"]),
     help="Output format (json or markdown)",
 )
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Profile each configuration and print top functions diff between default and async-safe runs",
+)
+@click.option(
+    "--profile-dir",
+    default=PROFILES_DIR,
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Directory where profiles are saved",
+)
+@click.option("--profile-top", default=20, help="Number of functions in profile diff")
+@click.option(
+    "--track-memory",
+    is_flag=True,
+    help="Track peak and retained memory with tracemalloc (it slows down requests, so times are not comparable)",
+)
+@click.option("-r", "--repeat", default=1, help="Number of runs of each configuration, averaged results are printed")
+@click.option("--save", is_flag=True, help="Store results of each run in history, keyed by git revision")
+@click.option(
+    "--history",
+    default=HISTORY_FILE,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="File where results are stored",
+)
 def main(
     requests: int,
-    concurrency: int,
+    concurrency: tuple[int, ...],
+    limiter: tuple[int, ...],
     suite: BenchmarkTestSuite,
     output: Literal["json", "md"],
+    profile: bool,
+    profile_dir: Path,
+    profile_top: int,
+    track_memory: bool,
+    repeat: int,
+    save: bool,
+    history: Path,
 ) -> None:
     suite = BenchmarkTestSuite(suite)
-    default_run, async_safe_run = run(
-        benchmark(
+    profile_to: Optional[Path] = profile_dir if profile else None
+    results_history = ResultsHistory(history) if save else None
+
+    if len(concurrency) > 1 or len(limiter) > 1:
+        matrix(
             requests=requests,
             concurrency=concurrency,
+            limiters=limiter or (_DEFAULT_LIMITER,),
             suite=suite,
+            output=output,
+            profile_dir=profile_to,
+            profile_top=profile_top,
+            track_memory=track_memory,
+            repeat=repeat,
+            history=results_history,
+        )
+        return
+
+    limiter_tokens: Optional[int] = limiter[0] if limiter else None
+    runs = [
+        run(
+            benchmark(
+                requests=requests,
+                concurrency=concurrency[0],
+                suite=suite,
+                limiter_tokens=limiter_tokens,
+                profile_dir=profile_to,
+                track_memory=track_memory,
+            )
+        )
+        for _ in range(repeat)
+    ]
+
+    if results_history is not None:
+        params = _history_params(requests, concurrency[0], limiter_tokens, profile_to, track_memory)
+        results_history.append(records_for(runs, suite=suite.value, params=params))
+
+    default_run, async_safe_run = (BenchmarkResult.average(results) for results in zip(*runs))
+
+    if profile_to is not None:
+        _print_profile_diff(
+            profile_to,
+            suite=suite,
+            concurrency=concurrency[0],
+            limiter_tokens=limiter_tokens,
+            top=profile_top,
         )
-    )
 
     rows: list[ResultRow] = []
     for field in fields(BenchmarkResult):
         default_val = getattr(default_run, field.name)
         async_safe_val = getattr(async_safe_run, field.name)
 
+        # value is not tracked
+        if default_val is None or async_safe_val is None:
+            continue
+
         rows.append(
             ResultRow(
                 type=field.name,
                 default=default_val,
                 async_safe=async_safe_val,
-                diff=default_val / async_safe_val,
+                diff=_ratio(default_val, async_safe_val),
             ),
         )
 
@@ -1,7 +1,7 @@
 #!/usr/bin/bash
 
 function run_benchmark() {
-    python -m benchmark.run --requests 10000 --concurrency "$1" --output md
+    python -m benchmark.run --requests 10000 --concurrency "$1" --output md --save
 }
 
 echo "
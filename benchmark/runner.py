@@ -1,34 +1,14 @@
-import time
-from asyncio import Semaphore, as_completed
 from dataclasses import dataclass
 from enum import Enum
-
-from asgi_lifespan import LifespanManager
-from httpx import AsyncClient
-from starlette.datastructures import MutableHeaders
-from starlette.types import ASGIApp, Message, Receive, Scope, Send
-from typing_extensions import Self
+from pathlib import Path
+from typing import Optional, Sequence
 
 from benchmark.apps.app import get_app as default_get_app
 from benchmark.apps.db_app import get_app as db_get_app
 from benchmark.apps.fastapi_example_app import get_app as fastapi_example_get_app
 from benchmark.apps.injector import get_app as injector_get_app
-
-
-@dataclass
-class XProcesTime:
-    app: ASGIApp
-
-    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
-        start = time.perf_counter()
-
-        async def send_wrapper(message: Message) -> None:
-            if message["type"] == "http.response.start":
-                MutableHeaders(scope=message)["x-process-time"] = str(time.perf_counter() - start)
-
-            return await send(message)
-
-        await self.app(scope, receive, send_wrapper)
+from benchmark.profiling import profile_path
+from fastapi_async_safe.bench import BenchmarkResult, ResourceTracker, ResourceUsage, benchmark_app
 
 
 class BenchmarkTestSuite(str, Enum):
@@ -49,68 +29,35 @@ _SUITE_TO_APP = {
 }
 
 
-@dataclass
-class BenchmarkResult:
-    min: float
-    max: float
-    mean: float
-    median: float
-
-    @classmethod
-    def from_times(cls, times: list[float]) -> Self:
-        def _convert(t: float) -> float:  # convert to milliseconds
-            return t * 1_000
-
-        return cls(
-            mean=_convert(sum(times) / len(times)),
-            median=_convert(times[len(times) // 2]),
-            min=_convert(min(times)),
-            max=_convert(max(times)),
-        )
-
-
-async def benchmark_app(
-    app: ASGIApp,
-    *,
-    requests: int,
-    concurrency: int,
-) -> BenchmarkResult:
-    app = XProcesTime(app)
-
-    semaphore = Semaphore(concurrency)
-
-    async with (
-        LifespanManager(app),
-        AsyncClient(app=app, base_url="http://test.test") as client,
-    ):
-        times: list[float] = []
-
-        async def _run() -> float:
-            async with semaphore:
-                response = await client.get("/")
-                response.raise_for_status()
-
-            return float(response.headers["x-process-time"])
-
-        for f in as_completed([_run() for _ in range(requests)]):
-            times.append(await f)
-
-    return BenchmarkResult.from_times(times)
-
-
 async def benchmark(
     *,
     requests: int,
     concurrency: int,
     suite: BenchmarkTestSuite = BenchmarkTestSuite.app,
+    limiter_tokens: Optional[int] = None,
+    profile_dir: Optional[Path] = None,
+    track_memory: bool = False,
 ) -> tuple[BenchmarkResult, BenchmarkResult]:
     async def _run(add_async_safe: bool) -> BenchmarkResult:
         factory = _SUITE_TO_APP[suite]
 
+        profile = None
+        if profile_dir is not None:
+            profile = profile_path(
+                profile_dir,
+                suite=suite.value,
+                concurrency=concurrency,
+                limiter_tokens=limiter_tokens,
+                add_async_safe=add_async_safe,
+            )
+
         return await benchmark_app(
             factory(add_async_safe=add_async_safe),
             requests=requests,
             concurrency=concurrency,
+            limiter_tokens=limiter_tokens,
+            profile=profile,
+            track_memory=track_memory,
         )
 
     default_run = await _run(False)
@@ -119,8 +66,62 @@ async def benchmark(
     return default_run, async_safe_run
 
 
+@dataclass
+class MatrixCell:
+    limiter: int
+    concurrency: int
+    default: BenchmarkResult
+    async_safe: BenchmarkResult
+
+    @property
+    def diff(self) -> float:
+        return self.default.mean / self.async_safe.mean
+
+    @property
+    def gap(self) -> float:
+        return self.default.mean - self.async_safe.mean
+
+
+async def benchmark_matrix(
+    *,
+    requests: int,
+    concurrency: Sequence[int],
+    limiters: Sequence[int],
+    suite: BenchmarkTestSuite = BenchmarkTestSuite.app,
+    profile_dir: Optional[Path] = None,
+    track_memory: bool = False,
+) -> list[MatrixCell]:
+    cells: list[MatrixCell] = []
+
+    for limiter in limiters:
+        for c in concurrency:
+            default_run, async_safe_run = await benchmark(
+                requests=requests,
+                concurrency=c,
+                suite=suite,
+                limiter_tokens=limiter,
+                profile_dir=profile_dir,
+                track_memory=track_memory,
+            )
+
+            cells.append(
+                MatrixCell(
+                    limiter=limiter,
+                    concurrency=c,
+                    default=default_run,
+                    async_safe=async_safe_run,
+                ),
+            )
+
+    return cells
+
+
 __all__ = [
     "BenchmarkTestSuite",
     "BenchmarkResult",
+    "ResourceTracker",
+    "ResourceUsage",
+    "MatrixCell",
     "benchmark",
+    "benchmark_matrix",
 ]
@@ -0,0 +1,285 @@
+import gc
+import inspect
+import random
+import tracemalloc
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from json import dumps
+from time import perf_counter
+from typing import Any, Callable, Literal, Sequence
+
+import click
+from fastapi import Depends, FastAPI
+from fastapi.dependencies.models import Dependant
+from fastapi.routing import APIRoute
+
+from benchmark.run import _format_float, _format_memory, _md_output_gen
+from fastapi_async_safe import async_safe
+from fastapi_async_safe.dependencies import _all_dependencies, wrap_dependant, wrap_dependencies
+from fastapi_async_safe.utils import WrappersCache
+
+_SHARED_POOL_SIZE = 10
+
+
+@dataclass
+class StartupParams:
+    routes: int
+    depth: int
+    fanout: int
+    sharing: float
+    seed: int = 0
+
+
+@dataclass
+class StartupResult:
+    routes: int
+    sharing: float
+    nodes: int
+    unique_calls: int
+    per_node_time: float  # ms
+    memoized_time: float  # ms
+    full_time: float  # ms, all passes of init_app including route handlers rebuild
+    per_node_memory: int  # bytes retained after wrapping
+    memoized_memory: int
+
+
+def _signature(children: Sequence[Any], *, self_param: bool) -> inspect.Signature:
+    params = [
+        inspect.Parameter(f"dep_{i}", inspect.Parameter.KEYWORD_ONLY, default=Depends(child))
+        for i, child in enumerate(children)
+    ]
+
+    if self_param:
+        params.insert(0, inspect.Parameter("self", inspect.Parameter.POSITIONAL_OR_KEYWORD))
+
+    return inspect.Signature(params)
+
+
+def _dependency(name: str, children: Sequence[Any]) -> Any:
+    def __init__(self: Any, **_: Any) -> None:
+        pass
+
+    __init__.__signature__ = _signature(children, self_param=True)  # type: ignore[attr-defined]
+
+    return async_safe(type(name, (), {"__init__": __init__}))
+
+
+def _endpoint(name: str, children: Sequence[Any]) -> Callable[..., Any]:
+    async def endpoint(**_: Any) -> Any:
+        return None
+
+    endpoint.__name__ = endpoint.__qualname__ = name
+    endpoint.__signature__ = _signature(children, self_param=False)  # type: ignore[attr-defined]
+
+    return endpoint
+
+
+class _AppGenerator:
+    def __init__(self, params: StartupParams) -> None:
+        self.params = params
+        self.random = random.Random(params.seed)  # noqa: S311
+        self.counter = 0
+
+        # each level has its own pool of shared dependencies that are used by many routes
+        self.shared: list[list[Any]] = [[] for _ in range(params.depth)]
+        for level in reversed(range(params.depth)):
+            self.shared[level] = [
+                self._new(level, lambda lvl: self.random.choice(self.shared[lvl])) for _ in range(_SHARED_POOL_SIZE)
+            ]
+
+    def _new(self, level: int, child: Callable[[int], Any]) -> Any:
+        self.counter += 1
+
+        children = [child(level + 1) for _ in range(self.params.fanout)] if level + 1 < self.params.depth else []
+        return _dependency(f"Dependency{self.counter}", children)
+
+    def _node(self, level: int) -> Any:
+        if self.random.random() < self.params.sharing:
+            return self.random.choice(self.shared[level])
+
+        return self._new(level, self._node)
+
+    def app(self) -> FastAPI:
+        app = FastAPI()
+
+        for i in range(self.params.routes):
+            children = [self._node(0) for _ in range(self.params.fanout)] if self.params.depth else []
+            app.add_api_route(f"/route-{i}", _endpoint(f"route_{i}", children), methods=["GET"])
+
+        return app
+
+
+def generate_app(params: StartupParams) -> FastAPI:
+    return _AppGenerator(params).app()
+
+
+def _app_dependencies(app: FastAPI) -> Iterator[Dependant]:
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            yield from _all_dependencies(route.dependant)
+
+
+def _wrap_per_node(app: FastAPI) -> None:
+    # each dependant gets its own wrapper, the way wrapping worked before wrappers were memoized
+    for dependant in _app_dependencies(app):
+        wrap_dependant(dependant)
+
+
+def _wrap_memoized(app: FastAPI) -> None:
+    # the same nodes are wrapped, only wrappers are shared between usages of the same call
+    wrappers: WrappersCache = {}
+
+    for dependant in _app_dependencies(app):
+        wrap_dependant(dependant, wrappers=wrappers)
+
+
+def _measure_time(params: StartupParams, wrap: Callable[[FastAPI], None], repeat: int) -> float:
+    times = []
+
+    for _ in range(repeat):
+        app = generate_app(params)
+        gc.collect()
+
+        # collection of previously generated apps can happen in the middle of measurement
+        gc.disable()
+
+        try:
+            start = perf_counter()
+            wrap(app)
+            times.append(perf_counter() - start)
+        finally:
+            gc.enable()
+
+    return min(times) * 1_000
+
+
+def _measure_memory(params: StartupParams, wrap: Callable[[FastAPI], None]) -> int:
+    app = generate_app(params)
+    gc.collect()
+
+    tracemalloc.start()
+
+    try:
+        wrap(app)
+        gc.collect()
+
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return retained
+
+
+def _graph_stats(params: StartupParams) -> tuple[int, int]:
+    nodes = list(_app_dependencies(generate_app(params)))
+
+    return len(nodes), len({id(node.call) for node in nodes})
+
+
+def benchmark_startup(params: StartupParams, repeat: int = 3) -> StartupResult:
+    nodes, unique_calls = _graph_stats(params)
+
+    return StartupResult(
+        routes=params.routes,
+        sharing=params.sharing,
+        nodes=nodes,
+        unique_calls=unique_calls,
+        per_node_time=_measure_time(params, _wrap_per_node, repeat),
+        memoized_time=_measure_time(params, _wrap_memoized, repeat),
+        full_time=_measure_time(params, wrap_dependencies, repeat),
+        per_node_memory=_measure_memory(params, _wrap_per_node),
+        memoized_memory=_measure_memory(params, _wrap_memoized),
+    )
+
+
+_MD_HEADERS = [
+    "Routes",
+    "Sharing",
+    "Nodes",
+    "Unique calls",
+    "Time (per node)",
+    "Time (memoized)",
+    "Time (wrap_dependencies)",
+    "Memory (per node)",
+    "Memory (memoized)",
+]
+
+
+def _md_output(results: Sequence[StartupResult]) -> None:
+    rows = [
+        (
+            str(result.routes),
+            _format_float(result.sharing),
+            str(result.nodes),
+            str(result.unique_calls),
+            f"{_format_float(result.per_node_time)}ms",
+            f"{_format_float(result.memoized_time)}ms",
+            f"{_format_float(result.full_time)}ms",
+            _format_memory(result.per_node_memory),
+            _format_memory(result.memoized_memory),
+        )
+        for result in results
+    ]
+
+    print("\n".join(_md_output_gen(rows, _MD_HEADERS, max(len(h) for h in _MD_HEADERS))))
+
+
+def _iter_params(
+    routes: Sequence[int],
+    depth: int,
+    fanout: int,
+    sharing: Sequence[float],
+    seed: int,
+) -> Iterator[StartupParams]:
+    for route_count in routes:
+        for ratio in sharing:
+            yield StartupParams(routes=route_count, depth=depth, fanout=fanout, sharing=ratio, seed=seed)
+
+
+@click.command()
+@click.option(
+    "-r",
+    "--routes",
+    default=(100, 1_000, 3_000),
+    multiple=True,
+    type=int,
+    help="Number of routes in generated app, can be passed multiple times",
+)
+@click.option("-d", "--depth", default=4, help="Depth of each route dependency tree")
+@click.option("-f", "--fanout", default=3, help="Number of sub-dependencies of each dependency")
+@click.option(
+    "-s",
+    "--sharing",
+    default=(0.0, 0.5, 0.9),
+    multiple=True,
+    type=float,
+    help="Probability that dependency is taken from a shared pool, can be passed multiple times",
+)
+@click.option("--repeat", default=3, help="Number of repeats for time measurement (min is reported)")
+@click.option("--seed", default=0, help="Random seed used to generate apps")
+@click.option(
+    "-o",
+    "--output",
+    default="md",
+    type=click.Choice(["json", "md"]),
+    help="Output format (json or markdown)",
+)
+def main(
+    routes: tuple[int, ...],
+    depth: int,
+    fanout: int,
+    sharing: tuple[float, ...],
+    repeat: int,
+    seed: int,
+    output: Literal["json", "md"],
+) -> None:
+    results = [benchmark_startup(params, repeat) for params in _iter_params(routes, depth, fanout, sharing, seed)]
+
+    if output == "json":
+        print(dumps([asdict(result) for result in results], indent=4))
+    else:
+        _md_output(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,25 @@
+from .bulkhead import Bulkhead, bulkhead
+from .coalescing import single_flight
 from .dependencies import init_app
-from .markers import AsyncSafeMixin, async_safe, async_unsafe
+from .lazy import Lazy, lazy_depends
+from .limiter import LimiterAutosizer
+from .markers import AsyncSafeMixin, async_safe, async_unsafe, cpu_bound
+from .serialization import offload_large_responses, serialization_policy
+from .timing import ServerTimingMiddleware
 
 __all__ = [
     "init_app",
     "async_safe",
     "async_unsafe",
+    "cpu_bound",
+    "Lazy",
+    "lazy_depends",
     "AsyncSafeMixin",
+    "serialization_policy",
+    "offload_large_responses",
+    "ServerTimingMiddleware",
+    "LimiterAutosizer",
+    "Bulkhead",
+    "bulkhead",
+    "single_flight",
 ]
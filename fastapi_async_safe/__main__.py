@@ -0,0 +1,137 @@
+import asyncio
+from dataclasses import asdict
+from json import dumps
+from pathlib import Path
+from typing import Literal, Optional, Sequence
+
+try:
+    import click
+
+    from .bench import RouteResult, bench_app, discover_requests, load_app, load_requests
+except ImportError as e:  # pragma: no cover
+    message = f"{e.name} is required to run benchmarks, install `fastapi-async-safe-dependencies[bench]`"
+    raise SystemExit(message) from e
+
+from .exceptions import BenchTargetError
+
+
+def _format_diff(diff: float) -> str:
+    if diff > 1:
+        return f"x{diff:.2f} (faster)"
+    if diff < 1:
+        return f"x{diff:.2f} (slower)"
+
+    return "x1 (same)"
+
+
+def _md_table(headers: Sequence[str], rows: Sequence[Sequence[str]]) -> str:
+    width = max(len(v) for v in [*headers, *(v for row in rows for v in row)])
+
+    def _line(values: Sequence[str]) -> str:
+        return f"| {' | '.join(f'{v:<{width}}' for v in values)} |"
+
+    return "\n".join([_line(headers), f"|{'|'.join('-' * (width + 2) for _ in headers)}|", *map(_line, rows)])
+
+
+def _md_output(results: Sequence[RouteResult]) -> None:
+    headers = ["Route", "Default", "Async Safe", "Diff", "RPS (default)", "RPS (async-safe)"]
+    rows = [
+        (
+            str(result.request),
+            f"{result.default.mean:.2f}ms",
+            f"{result.async_safe.mean:.2f}ms",
+            _format_diff(result.diff),
+            f"{result.default_throughput:.2f}",
+            f"{result.async_safe_throughput:.2f}",
+        )
+        for result in results
+    ]
+
+    click.echo(_md_table(headers, rows))
+
+    for result in results:
+        click.echo(f"\n### Wrap decisions ({result.request})\n")
+
+        if not result.decisions:
+            click.echo("Route has no dependencies")
+            continue
+
+        decisions = [(decision.dependency, decision.mode) for decision in result.decisions]
+        click.echo(_md_table(["Dependency", "Execution mode"], decisions))
+
+
+def _json_output(results: Sequence[RouteResult]) -> None:
+    click.echo(dumps([{**asdict(result), "diff": result.diff} for result in results], indent=4))
+
+
+@click.group()
+def cli() -> None:
+    pass
+
+
+@cli.command(help="Compare latency and throughput of application routes with and without `init_app`.")
+@click.argument("target")
+@click.option(
+    "--spec",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="JSON file with list of requests (path, method, params, headers, json), GET routes are discovered otherwise",
+)
+@click.option("-n", "--requests", default=1_000, help="Number of requests to perform for each route")
+@click.option("-c", "--concurrency", default=10, help="Number of concurrent requests")
+@click.option("-l", "--limiter", type=int, help="Size of anyio thread limiter (40 by default)")
+@click.option(
+    "-w",
+    "--warmup",
+    default=100,
+    help="Number of not measured requests sent to each route before the benchmark",
+)
+@click.option(
+    "-o",
+    "--output",
+    default="md",
+    type=click.Choice(["json", "md"]),
+    help="Output format (json or markdown)",
+)
+def bench(
+    target: str,
+    spec: Optional[Path],
+    requests: int,
+    concurrency: int,
+    limiter: Optional[int],
+    warmup: int,
+    output: Literal["json", "md"],
+) -> None:
+    try:
+        app = load_app(target)
+    except BenchTargetError as e:
+        raise click.BadParameter(str(e), param_hint="TARGET") from e
+
+    skipped: list[tuple[str, str]] = []
+    if spec is not None:
+        requests_specs = load_requests(spec)
+    else:
+        requests_specs, skipped = discover_requests(app)
+
+    results, failed = asyncio.run(
+        bench_app(
+            app,
+            requests_specs,
+            requests=requests,
+            concurrency=concurrency,
+            limiter_tokens=limiter,
+            warmup=warmup,
+        ),
+    )
+
+    # skipped routes are reported to stderr, so results output can still be piped as is
+    for route, reason in [*skipped, *failed]:
+        click.echo(f"Skipped {route}: {reason}", err=True)
+
+    if output == "json":
+        _json_output(results)
+    else:
+        _md_output(results)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    cli()
@@ -0,0 +1,60 @@
+from functools import wraps
+from typing import Any, Awaitable, Callable, Iterator
+
+from starlette.background import BackgroundTask, BackgroundTasks
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .types import DependantCallPredicate, RouteHandler
+
+
+def _async_task(func: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    # tasks are usually per-request closures, so wrapper is not cached and it doesn't need signature,
+    # task is always called with its own args
+    @wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _all_tasks(background: BackgroundTask) -> Iterator[BackgroundTask]:
+    if isinstance(background, BackgroundTasks):
+        for task in background.tasks:
+            yield from _all_tasks(task)
+    else:
+        yield background
+
+
+def wrap_background_task(task: BackgroundTask, predicate: DependantCallPredicate) -> bool:
+    if task.is_async or not predicate(task.func):
+        return False
+
+    task.func = _async_task(task.func)
+    task.is_async = True
+    return True
+
+
+def wrap_background_tasks(background: BackgroundTask, predicate: DependantCallPredicate) -> None:
+    for task in _all_tasks(background):
+        wrap_background_task(task, predicate)
+
+
+def background_tasks_handler(handler: RouteHandler, predicate: DependantCallPredicate) -> RouteHandler:
+    @wraps(handler)
+    async def wrapper(request: Request) -> Response:
+        response = await handler(request)
+
+        if response.background is not None:
+            wrap_background_tasks(response.background, predicate)
+
+        return response
+
+    return wrapper
+
+
+__all__ = [
+    "background_tasks_handler",
+    "wrap_background_task",
+    "wrap_background_tasks",
+]
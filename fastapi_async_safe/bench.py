@@ -0,0 +1,470 @@
+import cProfile
+import importlib
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from asyncio import Semaphore, as_completed
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, fields
+from functools import partial
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from anyio import to_thread
+from asgi_lifespan import LifespanManager
+from fastapi import FastAPI
+from fastapi.dependencies.utils import get_flat_dependant
+from fastapi.routing import APIRoute
+from httpx import ASGITransport, AsyncClient, HTTPStatusError
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing_extensions import Self
+
+from .dependencies import _all_dependencies, _lifespan_wrapper, init_app
+from .exceptions import BenchTargetError
+from .instrumentation import call_name, execution_mode
+from .types import ExecutionMode
+from .utils import get_original_call
+
+
+@dataclass
+class XProcesTime:
+    app: ASGIApp
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["x-process-time"] = str(time.perf_counter() - start)
+
+            return await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+@dataclass
+class RequestsSpan:
+    app: ASGIApp
+    warmup: int = 0  # number of first requests that are not included
+    start: Optional[float] = field(default=None, init=False)
+    end: float = field(default=0.0, init=False)
+    _requests: int = field(default=0, init=False, repr=False)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        # application startup is not included, only time between first measured request and last response
+        self._requests += 1
+        if self.start is None and self._requests > self.warmup:
+            self.start = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if self.start is not None:
+                self.end = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return self.end - (self.start or self.end)
+
+
+@contextmanager
+def profiled(path: Optional[Path]) -> Iterator[None]:
+    if path is None:
+        yield
+        return
+
+    # only event loop thread is profiled, time of thread-pool workers is not included
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    try:
+        yield
+    finally:
+        profiler.disable()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(path)
+
+
+@dataclass
+class ResourceUsage:
+    max_threads: int
+    max_busy_threads: int  # thread-pool workers that are executing calls at the same time
+    peak_memory: Optional[int] = None  # bytes, on top of memory used before first request
+    memory_per_request: Optional[float] = None  # bytes, peak memory divided by number of concurrent requests
+    retained_memory: Optional[int] = None  # bytes, still allocated after all requests are done
+
+
+@dataclass
+class ResourceTracker:
+    track_memory: bool = False
+    concurrency: int = 1
+    max_threads: int = 0
+    max_busy_threads: int = 0
+    _snapshot: Optional[tracemalloc.Snapshot] = field(default=None, repr=False)
+    _baseline: int = 0
+
+    def start(self) -> None:
+        self.max_threads = threading.active_count()
+        self.max_busy_threads = 0
+
+        if self.track_memory:
+            tracemalloc.start()
+
+            self._snapshot = tracemalloc.take_snapshot()
+            self._baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+
+    def sample(self) -> None:
+        # thread-pool workers are started lazily, so number of threads grows together with load
+        self.max_threads = max(self.max_threads, threading.active_count())
+
+        # idle workers of previous runs are kept alive, so busy workers are tracked separately
+        busy = to_thread.current_default_thread_limiter().borrowed_tokens
+        self.max_busy_threads = max(self.max_busy_threads, busy)
+
+    def stop(self) -> ResourceUsage:
+        self.sample()
+
+        if self._snapshot is None:
+            return ResourceUsage(max_threads=self.max_threads, max_busy_threads=self.max_busy_threads)
+
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        retained = sum(stat.size_diff for stat in snapshot.compare_to(self._snapshot, "filename"))
+        peak_memory = peak - self._baseline
+
+        return ResourceUsage(
+            max_threads=self.max_threads,
+            max_busy_threads=self.max_busy_threads,
+            peak_memory=peak_memory,
+            memory_per_request=peak_memory / self.concurrency,
+            retained_memory=retained,
+        )
+
+
+@dataclass
+class BenchmarkResult:
+    min: float
+    max: float
+    mean: float
+    median: float
+    max_threads: Optional[int] = None
+    max_busy_threads: Optional[int] = None
+    peak_memory: Optional[int] = None
+    memory_per_request: Optional[float] = None
+    retained_memory: Optional[int] = None
+
+    @classmethod
+    def from_times(cls, times: list[float], usage: Optional[ResourceUsage] = None) -> Self:
+        def _convert(t: float) -> float:  # convert to milliseconds
+            return t * 1_000
+
+        return cls(
+            mean=_convert(sum(times) / len(times)),
+            median=_convert(times[len(times) // 2]),
+            min=_convert(min(times)),
+            max=_convert(max(times)),
+            **(asdict(usage) if usage is not None else {}),
+        )
+
+    @classmethod
+    def average(cls, results: Sequence["BenchmarkResult"]) -> Self:
+        def _mean(name: str) -> Optional[float]:
+            values: list[Optional[float]] = [getattr(result, name) for result in results]
+
+            present = [value for value in values if value is not None]
+            if len(present) != len(values):
+                return None
+
+            return sum(present) / len(present)
+
+        return cls(**{f.name: _mean(f.name) for f in fields(cls)})  # type: ignore[arg-type]
+
+
+@dataclass
+class RequestSpec:
+    path: str = "/"
+    method: str = "GET"
+    params: dict[str, Any] = field(default_factory=dict)
+    headers: dict[str, str] = field(default_factory=dict)
+    json: Optional[Any] = None
+
+    def __str__(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+async def benchmark_app(
+    app: ASGIApp,
+    *,
+    requests: int,
+    concurrency: int,
+    limiter_tokens: Optional[int] = None,
+    profile: Optional[Path] = None,
+    track_memory: bool = False,
+    request: Optional[RequestSpec] = None,
+    warmup: int = 0,
+) -> BenchmarkResult:
+    app = XProcesTime(app)
+    request = request or RequestSpec()
+
+    # limiter is bound to the running event loop, so it should be configured from inside of it
+    if limiter_tokens is not None:
+        to_thread.current_default_thread_limiter().total_tokens = limiter_tokens
+
+    semaphore = Semaphore(concurrency)
+    tracker = ResourceTracker(track_memory=track_memory, concurrency=min(concurrency, requests))
+
+    async with (
+        LifespanManager(app),
+        AsyncClient(transport=ASGITransport(app=app), base_url="http://test.test") as client,
+    ):
+        times: list[float] = []
+
+        async def _run() -> float:
+            async with semaphore:
+                response = await client.request(
+                    request.method,
+                    request.path,
+                    params=request.params,
+                    headers=request.headers,
+                    json=request.json,
+                )
+                response.raise_for_status()
+
+            tracker.sample()
+            return float(response.headers["x-process-time"])
+
+        # first requests pay for lazy initialization (imports, thread-pool workers, caches), so they are not measured
+        for pending in as_completed([_run() for _ in range(warmup)]):
+            await pending
+
+        # application startup is not included into profile and memory usage
+        tracker.start()
+
+        with profiled(profile):
+            for f in as_completed([_run() for _ in range(requests)]):
+                times.append(await f)
+
+        usage = tracker.stop()
+
+    return BenchmarkResult.from_times(times, usage)
+
+
+def load_app(target: str) -> FastAPI:
+    module_name, _, attrs = target.partition(":")
+    if not module_name or not attrs:
+        raise BenchTargetError(target, "expected format is 'module:attribute'")
+
+    # the same way as uvicorn does, application module is looked up in the current directory
+    if "" not in sys.path:
+        sys.path.insert(0, "")
+
+    try:
+        obj: Any = importlib.import_module(module_name)
+    except ImportError as e:
+        raise BenchTargetError(target, f"module {module_name!r} can't be imported") from e
+
+    for attr in attrs.split("."):
+        try:
+            obj = getattr(obj, attr)
+        except AttributeError as e:
+            raise BenchTargetError(target, f"attribute {attr!r} not found") from e
+
+    if not isinstance(obj, FastAPI):
+        raise BenchTargetError(target, "it's not FastAPI application")
+
+    return obj
+
+
+def load_requests(path: Path) -> list[RequestSpec]:
+    return [RequestSpec(**raw) for raw in json.loads(path.read_text())]
+
+
+def discover_requests(app: FastAPI) -> tuple[list[RequestSpec], list[tuple[str, str]]]:
+    found: list[RequestSpec] = []
+    skipped: list[tuple[str, str]] = []
+
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or "GET" not in route.methods:
+            continue
+
+        # values of required params are unknown, such routes should be described in request spec file
+        flat = get_flat_dependant(route.dependant)
+        required = [
+            param.name
+            for param in (*flat.query_params, *flat.header_params, *flat.cookie_params)
+            if param.field_info.is_required()
+        ]
+
+        if flat.path_params:
+            skipped.append((route.path, "it has path params"))
+        elif required:
+            skipped.append((route.path, f"it has required params: {', '.join(required)}"))
+        else:
+            found.append(RequestSpec(path=route.path))
+
+    return found, skipped
+
+
+@dataclass
+class WrapDecision:
+    dependency: str
+    mode: ExecutionMode
+
+
+def _find_route(app: FastAPI, request: RequestSpec) -> Optional[APIRoute]:
+    scope = {"type": "http", "path": request.path, "method": request.method}
+
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            match, _ = route.matches(scope)
+
+            if match == Match.FULL:
+                return route
+
+    return None
+
+
+def wrap_decisions(app: FastAPI, request: RequestSpec) -> list[WrapDecision]:
+    route = _find_route(app, request)
+    if route is None:
+        return []
+
+    return [
+        WrapDecision(call_name(get_original_call(dependant.call)), execution_mode(dependant.call))
+        for dependant in _all_dependencies(route.dependant)
+        if dependant is not route.dependant and dependant.call is not None
+    ]
+
+
+@dataclass
+class RouteResult:
+    request: RequestSpec
+    default: BenchmarkResult
+    async_safe: BenchmarkResult
+    default_throughput: float  # requests per second
+    async_safe_throughput: float
+    decisions: list[WrapDecision]
+
+    @property
+    def diff(self) -> float:
+        return self.default.mean / self.async_safe.mean
+
+
+def _detach_init_app(app: FastAPI) -> dict[str, Any]:
+    # application can already be initialized, its options are reused, so the same configuration is compared
+    lifespan = app.router.lifespan_context
+
+    if isinstance(lifespan, partial) and lifespan.func is _lifespan_wrapper:
+        options = dict(lifespan.keywords)
+        app.router.lifespan_context = options.pop("base_lifespan")
+
+        # process pool is created by init_app itself
+        options["process_pool_workers"] = options.pop("process_pool").max_workers
+        return options
+
+    return {}
+
+
+async def _run_request(
+    app: FastAPI,
+    request: RequestSpec,
+    *,
+    requests: int,
+    concurrency: int,
+    limiter_tokens: Optional[int],
+    warmup: int,
+) -> tuple[BenchmarkResult, float]:
+    span = RequestsSpan(app, warmup=warmup)
+    result = await benchmark_app(
+        span,
+        requests=requests,
+        concurrency=concurrency,
+        limiter_tokens=limiter_tokens,
+        request=request,
+        warmup=warmup,
+    )
+
+    return result, requests / span.elapsed
+
+
+async def bench_app(
+    app: FastAPI,
+    requests_specs: Sequence[RequestSpec],
+    *,
+    requests: int,
+    concurrency: int,
+    limiter_tokens: Optional[int] = None,
+    warmup: int = 100,
+) -> tuple[list[RouteResult], list[tuple[str, str]]]:
+    options = _detach_init_app(app)
+    kwargs: dict[str, Any] = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "limiter_tokens": limiter_tokens,
+        # default configuration is run first, without warm-up it would pay for all cold-start costs
+        "warmup": warmup,
+    }
+
+    default: dict[int, tuple[BenchmarkResult, float]] = {}
+    failed: list[tuple[str, str]] = []
+
+    # dependencies are wrapped in place, so all default runs should be done before application is initialized
+    for i, request in enumerate(requests_specs):
+        try:
+            default[i] = await _run_request(app, request, **kwargs)
+        except HTTPStatusError as e:
+            failed.append((str(request), f"it responded with {e.response.status_code} status"))
+
+    init_app(app, **options)
+
+    results: list[RouteResult] = []
+    for i, request in enumerate(requests_specs):
+        if i not in default:
+            continue
+
+        async_safe, async_safe_throughput = await _run_request(app, request, **kwargs)
+        default_result, default_throughput = default[i]
+
+        results.append(
+            RouteResult(
+                request=request,
+                default=default_result,
+                async_safe=async_safe,
+                default_throughput=default_throughput,
+                async_safe_throughput=async_safe_throughput,
+                decisions=wrap_decisions(app, request),
+            ),
+        )
+
+    return results, failed
+
+
+__all__ = [
+    "BenchmarkResult",
+    "RequestSpec",
+    "RequestsSpan",
+    "ResourceTracker",
+    "ResourceUsage",
+    "RouteResult",
+    "WrapDecision",
+    "XProcesTime",
+    "bench_app",
+    "benchmark_app",
+    "discover_requests",
+    "load_app",
+    "load_requests",
+    "profiled",
+    "wrap_decisions",
+]
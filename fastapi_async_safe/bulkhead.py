@@ -0,0 +1,106 @@
+from dataclasses import dataclass, field
+from functools import partial, wraps
+from typing import Any, Awaitable, Callable, Mapping, Optional, TypeVar
+
+from anyio import CapacityLimiter, to_thread
+from fastapi import HTTPException, status
+from fastapi.dependencies.models import Dependant
+from fastapi.routing import APIRoute
+
+from .callables import is_generator_call
+from .exceptions import UnknownBulkheadError
+from .instrumentation import execution_mode
+from .types import DependantCall
+from .utils import mark_wrapper, wrap_dependant_call
+
+T = TypeVar("T")
+
+_BULKHEAD_ATTR = "__bulkhead__"
+_BULKHEAD_WRAPPER_ATTR = "__is_bulkhead_wrapper__"
+
+
+@dataclass
+class Bulkhead:
+    tokens: int
+    # max number of calls waiting for a free thread, `None` means unbounded queue
+    max_waiting: Optional[int] = None
+    retry_after: int = 1
+    limiter: Optional[CapacityLimiter] = field(default=None, init=False, repr=False)
+
+    def get_limiter(self) -> CapacityLimiter:
+        # limiter is bound to the running event loop, so it's created on first use
+        if self.limiter is None:
+            self.limiter = CapacityLimiter(self.tokens)
+
+        return self.limiter
+
+    def check_capacity(self, limiter: CapacityLimiter) -> None:
+        if self.max_waiting is None or limiter.available_tokens:
+            return
+
+        if limiter.statistics().tasks_waiting >= self.max_waiting:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+
+def bulkhead(name: str) -> Callable[[T], T]:
+    def decorator(endpoint: T) -> T:
+        setattr(endpoint, _BULKHEAD_ATTR, name)
+        return endpoint
+
+    return decorator
+
+
+def get_bulkhead_name(endpoint: Any) -> Optional[str]:
+    return getattr(endpoint, _BULKHEAD_ATTR, None)
+
+
+def route_bulkhead(route: APIRoute, bulkheads: Mapping[str, Bulkhead]) -> Optional[Bulkhead]:
+    name = get_bulkhead_name(route.endpoint)
+
+    if name is not None:
+        if name not in bulkheads:
+            raise UnknownBulkheadError(name)
+
+        return bulkheads[name]
+
+    # route without explicit bulkhead uses bulkhead of its first tag that has one
+    for tag in route.tags:
+        if isinstance(tag, str) and tag in bulkheads:
+            return bulkheads[tag]
+
+    return None
+
+
+def bulkhead_wrapper(call: DependantCall, group: Bulkhead) -> Callable[..., Awaitable[Any]]:
+    @wraps(call)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        limiter = group.get_limiter()
+        group.check_capacity(limiter)
+
+        return await to_thread.run_sync(partial(call, *args, **kwargs), limiter=limiter)
+
+    return mark_wrapper(wrapper, call, "threadpool", _BULKHEAD_WRAPPER_ATTR)
+
+
+def wrap_bulkhead(dependant: Dependant, group: Bulkhead) -> bool:
+    def _wrap(call: DependantCall) -> Optional[DependantCall]:
+        # only calls that are left in the thread-pool are moved to the bulkhead
+        if execution_mode(call) != "threadpool" or is_generator_call(call):
+            return None
+
+        return bulkhead_wrapper(call, group)
+
+    return wrap_dependant_call(dependant, _wrap, _BULKHEAD_WRAPPER_ATTR)
+
+
+__all__ = [
+    "Bulkhead",
+    "bulkhead",
+    "bulkhead_wrapper",
+    "get_bulkhead_name",
+    "route_bulkhead",
+    "wrap_bulkhead",
+]
@@ -0,0 +1,83 @@
+import asyncio
+import inspect
+from functools import _lru_cache_wrapper, partial
+from typing import Any, Callable, Iterator
+
+
+def unwrap_partial(call: Any) -> Any:
+    while isinstance(call, partial):
+        call = call.func
+
+    return call
+
+
+def iter_call_chain(call: Any) -> Iterator[Any]:
+    seen: set[int] = set()
+
+    # from outer call to inner one: partials, bound methods, `functools.wraps` wrappers and `__call__` of instances
+    while call is not None and id(call) not in seen:
+        seen.add(id(call))
+        yield call
+
+        if isinstance(call, partial):
+            call = call.func
+        elif inspect.ismethod(call):
+            call = call.__func__
+        elif inspect.isclass(call):
+            break
+        elif hasattr(call, "__wrapped__"):
+            call = call.__wrapped__
+        elif not inspect.isroutine(call):
+            call = getattr(type(call), "__call__", None)  # noqa: B004
+        else:
+            break
+
+
+def _matches(call: Any, predicate: Callable[[Any], bool]) -> bool:
+    # the same rules as FastAPI uses to decide how dependency should be called
+    impartial = unwrap_partial(call)
+    unwrapped = inspect.unwrap(impartial)
+
+    if predicate(impartial) or predicate(unwrapped):
+        return True
+
+    if inspect.isclass(unwrapped):
+        return False
+
+    dunder_call = getattr(impartial, "__call__", None)  # noqa: B004
+    if dunder_call is None:  # pragma: no cover
+        return False
+
+    dunder_call = unwrap_partial(dunder_call)
+    return predicate(dunder_call) or predicate(inspect.unwrap(dunder_call))
+
+
+def _is_generator_function(call: Any) -> bool:
+    return inspect.isgeneratorfunction(call) or inspect.isasyncgenfunction(call)
+
+
+def is_coroutine_call(call: Any) -> bool:
+    return _matches(call, asyncio.iscoroutinefunction)
+
+
+def is_generator_call(call: Any) -> bool:
+    return _matches(call, _is_generator_function)
+
+
+def is_class_call(call: Any) -> bool:
+    return inspect.isclass(unwrap_partial(call))
+
+
+def is_lru_cache_call(call: Any) -> bool:
+    # `functools.lru_cache` and `functools.cache` wrappers, including bound methods and partials of them
+    return any(isinstance(c, _lru_cache_wrapper) for c in iter_call_chain(call))
+
+
+__all__ = [
+    "is_class_call",
+    "is_coroutine_call",
+    "is_generator_call",
+    "is_lru_cache_call",
+    "iter_call_chain",
+    "unwrap_partial",
+]
@@ -0,0 +1,154 @@
+import asyncio
+from dataclasses import dataclass
+from functools import partial, wraps
+from typing import Any, Awaitable, Callable, Hashable, Optional, TypeVar, Union, overload
+
+from anyio import to_thread
+from fastapi.dependencies.models import Dependant
+
+from .callables import is_coroutine_call, is_generator_call, iter_call_chain
+from .instrumentation import execution_mode
+from .types import DependantCall
+from .utils import WrappersCache, mark_wrapper, wrap_dependant_call
+
+T = TypeVar("T")
+
+_SINGLE_FLIGHT_ATTR = "__single_flight__"
+_SINGLE_FLIGHT_WRAPPER_ATTR = "__is_single_flight_wrapper__"
+
+
+@dataclass(frozen=True)
+class SingleFlight:
+    # completed result is reused by calls with the same arguments for this number of seconds
+    ttl: float = 0.0
+
+
+@overload
+def single_flight(dep: T, /) -> T:
+    pass
+
+
+@overload
+def single_flight(*, ttl: float = 0.0) -> Callable[[T], T]:
+    pass
+
+
+def single_flight(dep: Optional[T] = None, /, *, ttl: float = 0.0) -> Union[T, Callable[[T], T]]:
+    def decorator(call: T) -> T:
+        setattr(call, _SINGLE_FLIGHT_ATTR, SingleFlight(ttl))
+        return call
+
+    if dep is None:
+        return decorator
+
+    return decorator(dep)
+
+
+def get_single_flight(dep: Any) -> Optional[SingleFlight]:
+    for call in iter_call_chain(dep):
+        config: Optional[SingleFlight] = getattr(call, _SINGLE_FLIGHT_ATTR, None)
+
+        if config is not None:
+            return config
+
+    return None
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Future[Any]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+def _call_key(args: tuple[Any, ...], kwargs: dict[str, Any]) -> Optional[Hashable]:
+    # arguments that can't be hashed can't be compared, so such calls are never shared
+    try:
+        key = (args, frozenset(kwargs.items()))
+        hash(key)
+    except TypeError:
+        return None
+
+    return key
+
+
+class _SingleFlightGroup:
+    __slots__ = ("call", "config", "flights")
+
+    def __init__(self, call: DependantCall, config: SingleFlight) -> None:
+        self.call = call
+        self.config = config
+        self.flights: dict[Hashable, _Flight] = {}
+
+    async def _run(self, *args: Any, **kwargs: Any) -> Any:
+        if is_coroutine_call(self.call):
+            return await self.call(*args, **kwargs)
+
+        return await to_thread.run_sync(partial(self.call, *args, **kwargs))
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self.flights.get(key) is flight:
+            del self.flights[key]
+
+    def _done(self, key: Hashable, flight: _Flight, task: "asyncio.Future[Any]") -> None:
+        # only successful results are reused, failed call will be retried by next caller
+        if self.config.ttl > 0 and not task.cancelled() and task.exception() is None:
+            asyncio.get_running_loop().call_later(self.config.ttl, self._forget, key, flight)
+        else:
+            self._forget(key, flight)
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        key = _call_key(args, kwargs)
+        if key is None:
+            return await self._run(*args, **kwargs)
+
+        flight = self.flights.get(key)
+        if flight is None:
+            flight = self.flights[key] = _Flight(asyncio.ensure_future(self._run(*args, **kwargs)))
+            flight.task.add_done_callback(partial(self._done, key, flight))
+
+        flight.waiters += 1
+        try:
+            # cancellation of one caller should not cancel call that is shared with other callers
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+
+            # nobody is waiting for result anymore
+            if not flight.waiters and not flight.task.done():
+                self._forget(key, flight)
+                flight.task.cancel()
+
+
+def single_flight_wrapper(call: DependantCall, config: SingleFlight) -> Callable[..., Awaitable[Any]]:
+    group = _SingleFlightGroup(call, config)
+
+    @wraps(call)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await group(*args, **kwargs)
+
+    return mark_wrapper(wrapper, call, execution_mode(call), _SINGLE_FLIGHT_WRAPPER_ATTR)
+
+
+def _wrap_single_flight_call(call: DependantCall) -> Optional[DependantCall]:
+    # generator result is bound to the caller, so it can't be shared
+    config = get_single_flight(call)
+    if config is None or is_generator_call(call):
+        return None
+
+    return single_flight_wrapper(call, config)
+
+
+def wrap_single_flight(dependant: Dependant, wrappers: Optional[WrappersCache] = None) -> bool:
+    # all usages of the call share the same wrapper, so they share in-flight calls as well
+    return wrap_dependant_call(dependant, _wrap_single_flight_call, _SINGLE_FLIGHT_WRAPPER_ATTR, wrappers)
+
+
+__all__ = [
+    "SingleFlight",
+    "get_single_flight",
+    "single_flight",
+    "single_flight_wrapper",
+    "wrap_single_flight",
+]
@@ -4,6 +4,8 @@ from typing import Awaitable, Callable, TypeVar
 
 from typing_extensions import ParamSpec
 
+from .pool import ProcessPool
+
 P = ParamSpec("P")
 T = TypeVar("T")
 
@@ -18,11 +20,33 @@ def safe_async_wrapper(func: Callable[P, T]) -> Callable[P, Awaitable[T]]:
     return wrapper
 
 
+def process_pool_wrapper(func: Callable[P, T], pool: ProcessPool) -> Callable[P, Awaitable[T]]:
+    @wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        return await pool.run(func, *args, **kwargs)
+
+    wrapper.__signature__ = inspect.signature(func)  # type: ignore[attr-defined]
+    wrapper.__is_async_safe_wrapper__ = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+def constant_wrapper(func: Callable[..., T], value: T) -> Callable[[], Awaitable[T]]:
+    @wraps(func)
+    async def wrapper() -> T:
+        return value
+
+    wrapper.__signature__ = inspect.Signature()  # type: ignore[attr-defined]
+    wrapper.__is_async_safe_wrapper__ = True  # type: ignore[attr-defined]
+    return wrapper
+
+
 def is_async_safe_wrapper(func: Callable[P, T]) -> bool:
     return getattr(func, "__is_async_safe_wrapper__", False)
 
 
 __all__ = [
     "safe_async_wrapper",
+    "process_pool_wrapper",
+    "constant_wrapper",
     "is_async_safe_wrapper",
 ]
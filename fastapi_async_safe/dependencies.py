@@ -1,25 +1,68 @@
-import asyncio
 import inspect
-from contextlib import asynccontextmanager
+import pickle
+from collections import OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager
 from functools import partial
-from typing import Any, AsyncIterator, Iterator, Optional, Sequence, TypeVar
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Iterator, Mapping, Optional, Sequence, TypeVar, Union
 
 from fastapi import FastAPI
 from fastapi.dependencies.models import Dependant
-from fastapi.routing import APIRoute, APIRouter
+from fastapi.routing import APIRoute, APIRouter, request_response
 from typing_extensions import TypeAlias
 
-from .decorators import is_async_safe_wrapper, safe_async_wrapper
+from .background import background_tasks_handler
+from .bulkhead import Bulkhead, route_bulkhead, wrap_bulkhead
+from .callables import is_class_call, is_coroutine_call, is_generator_call, is_lru_cache_call
+from .coalescing import wrap_single_flight
+from .decorators import constant_wrapper, is_async_safe_wrapper, process_pool_wrapper, safe_async_wrapper
+from .exceptions import CpuBoundDependencyError, DependencyTimeoutError
 from .ext import extensions_predicate
-from .markers import is_async_safe
-from .types import DependantCall, DependantCallPredicate
+from .instrumentation import cached_dependencies, instrument_dependant
+from .lazy import get_lazy_dependant
+from .limiter import LimiterAutosizer
+from .markers import is_async_safe, is_cpu_bound
+from .overrides import DependencyOverridesProvider, unwrap_overrides_provider
+from .parallel import parallel_handler, wrap_parallel
+from .params import compile_params_models
+from .pool import ProcessPool
+from .serialization import (
+    SerializationMode,
+    SerializationPolicy,
+    install_serialize_response,
+    route_serialization,
+    serialization_handler,
+)
+from .timeouts import wrap_timeout
+from .types import (
+    BackgroundTasksPolicy,
+    DependantCall,
+    DependantCallPredicate,
+    RouteHandlerDecorator,
+    TimeoutErrorFactory,
+)
+from .utils import WrappersCache, replace_dependant_call
+from .warmup import warmup_app
+
+if TYPE_CHECKING:
+    from opentelemetry.trace import Tracer
 
 _Predicates: TypeAlias = Optional[Sequence[DependantCallPredicate]]
 
+# id of override call -> override call and its wrapper, overrides can be changed at any time (e.g. in each test),
+# so their wrappers are kept in a separate bounded cache and not in the startup one
+_OverrideWrappers: TypeAlias = "OrderedDict[int, tuple[DependantCall, DependantCall]]"
+
+_MAX_OVERRIDE_WRAPPERS = 128
+
 
 def _all_dependencies(dependant: Dependant) -> Iterator[Dependant]:
     yield dependant
 
+    # lazy dependency sub-graph is resolved outside of route dependant, but it should be wrapped as well
+    lazy = get_lazy_dependant(dependant.call)
+    if lazy is not None:
+        yield from _all_dependencies(lazy)
+
     for dep in dependant.dependencies:
         yield from _all_dependencies(dep)
 
@@ -36,7 +79,11 @@ def _should_wrap_dependant_call(
         return False
 
     # call is coroutine function, no need to wrap it
-    if asyncio.iscoroutinefunction(call):
+    if is_coroutine_call(call):
+        return False
+
+    # generator is entered by FastAPI itself, so it can't be wrapped
+    if is_generator_call(call):
         return False
 
     # one of the predicates matched, so we will wrap it
@@ -50,7 +97,12 @@ def _should_wrap_dependant_call(
 
     # we treat all classes as async safe, this call is class, and it is not marked with `async_safe`/`async_unsafe`
     # so we can safely wrap it with `safe_async_wrapper`
-    if all_classes_safe and inspect.isclass(call) and is_async_safe(call) is None:
+    if all_classes_safe and is_class_call(call) and is_async_safe(call) is None:
+        return True
+
+    # cached value is returned without blocking, so `functools.lru_cache` wrappers are treated as async safe
+    # unless they are marked with `async_unsafe`
+    if is_lru_cache_call(call) and is_async_safe(call) is None:
         return True
 
     # call is not async safe, it not safe to wrap it with `safe_async_wrapper`
@@ -60,10 +112,105 @@ def _should_wrap_dependant_call(
     return True
 
 
+# values of these params are bound to current connection, so they can't be sent to another process
+_CONNECTION_PARAMS = (
+    "request_param_name",
+    "websocket_param_name",
+    "http_connection_param_name",
+    "response_param_name",
+    "background_tasks_param_name",
+    "security_scopes_param_name",
+)
+
+
+def _check_cpu_bound_dependant(dependant: Dependant, call: DependantCall) -> None:
+    if is_coroutine_call(call) or is_generator_call(call):
+        raise CpuBoundDependencyError(call, "only sync functions and classes can be executed in process-pool")
+
+    for param in _CONNECTION_PARAMS:
+        if getattr(dependant, param, None) is not None:
+            raise CpuBoundDependencyError(call, f"it depends on {param.removesuffix('_param_name')} object")
+
+    try:
+        pickle.dumps(call)
+    except (pickle.PicklingError, AttributeError, TypeError) as e:
+        raise CpuBoundDependencyError(call, "it can't be pickled (is it defined at module level?)") from e
+
+
+def _wrap_call(
+    call: DependantCall,
+    all_classes_safe: Optional[bool] = None,
+    predicates: _Predicates = None,
+    process_pool: Optional[ProcessPool] = None,
+    fold_cached: bool = False,
+) -> Optional[DependantCall]:
+    # without process-pool cpu bound dependencies are left as is
+    if process_pool is not None and is_cpu_bound(call) and not is_async_safe_wrapper(call):
+        return process_pool_wrapper(call, process_pool)
+
+    if _should_wrap_dependant_call(call, all_classes_safe, predicates):
+        # zero-argument cached call always returns the same value, so it's resolved once on startup
+        if fold_cached and is_lru_cache_call(call) and not inspect.signature(call).parameters:
+            return constant_wrapper(call, call())
+
+        return safe_async_wrapper(call)
+
+    return None
+
+
+# id of original call -> original call and its wrapper (or `None` if call should not be wrapped),
+# original call is kept alive, so its id will not be reused by another call
+def _wrap_cached(
+    call: DependantCall,
+    all_classes_safe: Optional[bool] = None,
+    predicates: _Predicates = None,
+    process_pool: Optional[ProcessPool] = None,
+    wrappers: Optional[WrappersCache] = None,
+    fold_cached: bool = False,
+) -> Optional[DependantCall]:
+    if wrappers is None:
+        return _wrap_call(call, all_classes_safe, predicates, process_pool, fold_cached)
+
+    if id(call) not in wrappers:
+        wrappers[id(call)] = (call, _wrap_call(call, all_classes_safe, predicates, process_pool, fold_cached))
+
+    _, wrapped = wrappers[id(call)]
+    return wrapped
+
+
+def _wrap_override(
+    call: DependantCall,
+    override_wrappers: _OverrideWrappers,
+    all_classes_safe: Optional[bool] = None,
+    predicates: _Predicates = None,
+    wrappers: Optional[WrappersCache] = None,
+) -> DependantCall:
+    # calls that are already used by routes reuse their wrappers
+    if wrappers is not None and id(call) in wrappers:
+        _, wrapped = wrappers[id(call)]
+        return wrapped or call
+
+    # overrides are read on each request, so the same override is not wrapped again,
+    # params of override are known only when request is solved, so new calls are never moved to process-pool
+    if id(call) in override_wrappers:
+        override_wrappers.move_to_end(id(call))
+    else:
+        override_wrappers[id(call)] = (call, _wrap_call(call, all_classes_safe, predicates) or call)
+
+        if len(override_wrappers) > _MAX_OVERRIDE_WRAPPERS:
+            override_wrappers.popitem(last=False)
+
+    _, wrapped_override = override_wrappers[id(call)]
+    return wrapped_override
+
+
 def wrap_dependant(
     dependant: Dependant,
     all_classes_safe: Optional[bool] = None,
     predicates: _Predicates = None,
+    process_pool: Optional[ProcessPool] = None,
+    wrappers: Optional[WrappersCache] = None,
+    fold_cached: bool = False,
 ) -> bool:
     call = dependant.call
 
@@ -71,13 +218,117 @@ def wrap_dependant(
     if call is None:  # pragma: no cover
         return False
 
-    if not _should_wrap_dependant_call(call, all_classes_safe, predicates):
+    # params of dependant should be checked for each usage of call
+    if process_pool is not None and is_cpu_bound(call) and not is_async_safe_wrapper(call):
+        _check_cpu_bound_dependant(dependant, call)
+
+    # the same call is usually used by many dependants, so it's wrapped only once,
+    # it also makes all usages of the call share the same dependency cache key
+    wrapped = _wrap_cached(call, all_classes_safe, predicates, process_pool, wrappers, fold_cached)
+    if wrapped is None:
         return False
 
-    wrapped = safe_async_wrapper(dependant.call)  # type: ignore[arg-type]
+    replace_dependant_call(dependant, wrapped)
+
+    return True
+
+
+def _all_background_tasks_predicate(_: DependantCall) -> bool:
+    return True
+
+
+def _route_handler_decorators(
+    route: APIRoute,
+    all_classes_safe: Optional[bool] = None,
+    predicates: _Predicates = None,
+    background_tasks: BackgroundTasksPolicy = "marked",
+    serialization: Optional[Union[SerializationMode, SerializationPolicy]] = None,
+    process_pool: Optional[ProcessPool] = None,
+) -> list[RouteHandlerDecorator]:
+
+    decorators: list[RouteHandlerDecorator] = []
+
+    if background_tasks == "all":
+        decorators.append(partial(background_tasks_handler, predicate=_all_background_tasks_predicate))
+    elif background_tasks == "marked":
+        predicate = partial(_should_wrap_dependant_call, all_classes_safe=all_classes_safe, predicates=predicates)
+        decorators.append(partial(background_tasks_handler, predicate=predicate))
+
+    serialization_config = route_serialization(
+        route.endpoint,
+        route.response_model,
+        serialization,
+        process_pool or ProcessPool(),
+    )
+    if serialization_config is not None:
+        install_serialize_response()
+        decorators.append(partial(serialization_handler, route=serialization_config))
 
-    dependant.call = wrapped
-    dependant.cache_key = (wrapped, dependant.cache_key[1])
+    return decorators
+
+
+def _get_route_handler(route: APIRoute, dependant: Optional[Dependant] = None) -> Callable[..., Any]:
+    if dependant is None or dependant is route.dependant:
+        return route.get_route_handler()
+
+    # handler can be built from its own dependant, route dependant is still used for OpenAPI schema
+    original, route.dependant = route.dependant, dependant
+    try:
+        return route.get_route_handler()
+    finally:
+        route.dependant = original
+
+
+def wrap_route_handler(
+    route: APIRoute,
+    decorators: Sequence[RouteHandlerDecorator],
+    dependant: Optional[Dependant] = None,
+) -> None:
+    # always rebuild handler from scratch, so calling it multiple times will not stack decorators,
+    # it also makes sure that handler will pick up changes made to route dependant
+    handler = _get_route_handler(route, dependant)
+
+    for decorator in decorators:
+        handler = decorator(handler)
+
+    route.app = request_response(handler)
+
+
+def _instrument_route(root: Dependant, timing: bool, tracer: Optional["Tracer"]) -> None:
+    cache_hits = cached_dependencies(root)
+
+    for dependant in _all_dependencies(root):
+        # sync endpoint is not instrumented, otherwise FastAPI will treat it as async one
+        if dependant is root and not is_coroutine_call(dependant.call):
+            continue
+
+        instrument_dependant(
+            dependant,
+            timing=timing,
+            tracer=tracer,
+            cache_hits=cache_hits.get(id(dependant), ()),
+        )
+
+
+def _wrap_overrides_provider(
+    route: APIRoute,
+    all_classes_safe: Optional[bool] = None,
+    predicates: _Predicates = None,
+    wrappers: Optional[WrappersCache] = None,
+    override_wrappers: Optional[_OverrideWrappers] = None,
+) -> bool:
+    provider = unwrap_overrides_provider(route.dependency_overrides_provider)
+    if provider is None:
+        return False
+
+    wrap = partial(
+        _wrap_override,
+        override_wrappers=OrderedDict() if override_wrappers is None else override_wrappers,
+        all_classes_safe=all_classes_safe,
+        predicates=predicates,
+        wrappers=wrappers,
+    )
+    route.dependency_overrides_provider = DependencyOverridesProvider(provider, wrap)
 
     return True
 
@@ -96,15 +347,77 @@ def wrap_dependencies(
     holder: THasRoutes,
     all_classes_safe: Optional[bool] = None,
     predicates: _Predicates = None,
+    background_tasks: BackgroundTasksPolicy = "marked",
+    serialization: Optional[Union[SerializationMode, SerializationPolicy]] = None,
+    process_pool: Optional[ProcessPool] = None,
+    parallel: bool = False,
+    server_timing: bool = False,
+    tracer: Optional["Tracer"] = None,
+    bulkheads: Optional[Mapping[str, Bulkhead]] = None,
+    fold_cached: bool = False,
+    timeout: Optional[float] = None,
+    timeout_error: TimeoutErrorFactory = DependencyTimeoutError,
 ) -> None:
     router = _get_router(holder)
+    process_pool = process_pool or ProcessPool()
+    wrappers: WrappersCache = {}
+    single_flight_wrappers: WrappersCache = {}
+    timeout_wrappers: WrappersCache = {}
+    override_wrappers: _OverrideWrappers = OrderedDict()
+    params_factories: dict[int, tuple[DependantCall, DependantCall, Dependant]] = {}
 
     for route in router.routes:
         if not isinstance(route, APIRoute):
             continue
 
+        # first dependant is route endpoint itself
+        endpoint_wrapped, *_ = [
+            wrap_dependant(dependant, all_classes_safe, predicates, process_pool, wrappers, fold_cached)
+            for dependant in _all_dependencies(route.dependant)
+        ]
+
+        decorators = _route_handler_decorators(
+            route,
+            all_classes_safe,
+            predicates,
+            background_tasks,
+            serialization,
+            process_pool,
+        )
+
+        group = route_bulkhead(route, bulkheads or {})
+        if group is not None:
+            for dependant in _all_dependencies(route.dependant):
+                wrap_bulkhead(dependant, group)
+
         for dependant in _all_dependencies(route.dependant):
-            wrap_dependant(dependant, all_classes_safe, predicates)
+            wrap_single_flight(dependant, single_flight_wrappers)
+
+            # endpoint itself is not limited, only its dependencies
+            if dependant is not route.dependant:
+                wrap_timeout(dependant, timeout, timeout_error, timeout_wrappers)
+
+        # compiled dependencies are used only by route handler, so OpenAPI schema stays the same
+        handler_dependant = compile_params_models(route.dependant, params_factories)
+
+        if server_timing or tracer is not None:
+            _instrument_route(handler_dependant, server_timing, tracer)
+
+        # should be done after all dependencies are wrapped, so all inline calls will be known
+        if parallel and wrap_parallel(handler_dependant):
+            decorators.append(parallel_handler)
+
+        overrides_wrapped = _wrap_overrides_provider(
+            route,
+            all_classes_safe,
+            predicates,
+            wrappers,
+            override_wrappers,
+        )
+        params_compiled = handler_dependant is not route.dependant
+
+        if decorators or endpoint_wrapped or overrides_wrapped or params_compiled:
+            wrap_route_handler(route, decorators, handler_dependant)
 
 
 @asynccontextmanager
@@ -114,12 +427,55 @@ async def _lifespan_wrapper(
     base_lifespan: Any,
     all_classes_safe: Optional[bool] = None,
     predicates: _Predicates = None,
+    background_tasks: BackgroundTasksPolicy = "marked",
+    serialization: Optional[Union[SerializationMode, SerializationPolicy]] = None,
+    process_pool: Optional[ProcessPool] = None,
+    parallel: bool = False,
+    server_timing: bool = False,
+    tracer: Optional["Tracer"] = None,
+    autosize_limiter: Union[bool, LimiterAutosizer] = False,
+    bulkheads: Optional[Mapping[str, Bulkhead]] = None,
+    warmup: bool = False,
+    fold_cached: bool = False,
+    timeout: Optional[float] = None,
+    timeout_error: TimeoutErrorFactory = DependencyTimeoutError,
 ) -> AsyncIterator[Any]:
     router = _get_router(app)
-    wrap_dependencies(router, all_classes_safe, predicates)
+    process_pool = process_pool or ProcessPool()
+
+    if autosize_limiter is True:
+        autosize_limiter = LimiterAutosizer()
+
+    wrap_dependencies(
+        router,
+        all_classes_safe,
+        predicates,
+        background_tasks,
+        serialization,
+        process_pool,
+        parallel,
+        server_timing,
+        tracer,
+        bulkheads,
+        fold_cached,
+        timeout,
+        timeout_error,
+    )
+
+    try:
+        async with AsyncExitStack() as stack:
+            if autosize_limiter:
+                await stack.enter_async_context(autosize_limiter.running())
+
+            state = await stack.enter_async_context(base_lifespan(app))
 
-    async with base_lifespan(app) as state:
-        yield state
+            # application is fully started, so dependencies can use its state
+            if warmup:
+                await warmup_app(app, router)
+
+            yield state
+    finally:
+        process_pool.shutdown()
 
 
 def init_app(
@@ -127,14 +483,42 @@ def init_app(
     *,
     all_classes_safe: Optional[bool] = None,
     predicates: _Predicates = None,
+    background_tasks: BackgroundTasksPolicy = "marked",
+    serialization: Optional[Union[SerializationMode, SerializationPolicy]] = None,
+    process_pool_workers: Optional[int] = None,
+    parallel: bool = False,
+    server_timing: bool = False,
+    tracer: Optional["Tracer"] = None,
+    autosize_limiter: Union[bool, LimiterAutosizer] = False,
+    bulkheads: Optional[Mapping[str, Bulkhead]] = None,
+    warmup: bool = False,
+    fold_cached: bool = False,
+    timeout: Optional[float] = None,
+    timeout_error: TimeoutErrorFactory = DependencyTimeoutError,
 ) -> THasRoutes:
     router = _get_router(root)
 
+    # calls are wrapped only once, so all lifespan runs should share the same pool,
+    # it's started lazily and shut down at each lifespan exit
+    process_pool = ProcessPool(max_workers=process_pool_workers)
+
     router.lifespan_context = partial(
         _lifespan_wrapper,
         base_lifespan=router.lifespan_context,
         all_classes_safe=all_classes_safe,
         predicates=predicates,
+        background_tasks=background_tasks,
+        serialization=serialization,
+        process_pool=process_pool,
+        parallel=parallel,
+        server_timing=server_timing,
+        tracer=tracer,
+        autosize_limiter=autosize_limiter,
+        bulkheads=bulkheads,
+        warmup=warmup,
+        fold_cached=fold_cached,
+        timeout=timeout,
+        timeout_error=timeout_error,
     )
 
     return root
@@ -144,4 +528,5 @@ __all__ = [
     "init_app",
     "wrap_dependant",
     "wrap_dependencies",
+    "wrap_route_handler",
 ]
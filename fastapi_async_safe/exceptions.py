@@ -0,0 +1,73 @@
+from typing import Any
+
+from fastapi import HTTPException, status
+
+
+class CpuBoundDependencyError(TypeError):
+    def __init__(self, call: Any, reason: str) -> None:
+        super().__init__(f"{call!r} is marked as cpu bound, but {reason}")
+        self.call = call
+        self.reason = reason
+
+
+class LazyDependencyError(TypeError):
+    def __init__(self, call: Any, reason: str) -> None:
+        super().__init__(f"{call!r} can't be used as lazy dependency, {reason}")
+        self.call = call
+        self.reason = reason
+
+
+class ThreadpoolOffloadError(AssertionError):
+    def __init__(self, call: Any, name: str) -> None:
+        super().__init__(f"{name} was offloaded to the thread-pool")
+        self.call = call
+        self.name = name
+
+
+class LimiterBoundsError(ValueError):
+    def __init__(self, min_tokens: int, max_tokens: int) -> None:
+        super().__init__(f"Invalid limiter bounds: min_tokens={min_tokens}, max_tokens={max_tokens}")
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+
+
+class UnknownBulkheadError(KeyError):
+    def __init__(self, name: str) -> None:
+        super().__init__(f"Bulkhead {name!r} is not configured")
+        self.name = name
+
+
+class ParamsModelError(TypeError):
+    def __init__(self, call: Any, reason: str) -> None:
+        super().__init__(f"{call!r} can't be compiled into params model, {reason}")
+        self.call = call
+        self.reason = reason
+
+
+class DependencyTimeoutError(HTTPException):
+    def __init__(self, call: Any, timeout: float) -> None:
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Dependency timed out after {timeout} seconds",
+        )
+        self.call = call
+        self.timeout = timeout
+
+
+class BenchTargetError(ValueError):
+    def __init__(self, target: str, reason: str) -> None:
+        super().__init__(f"Can't load application from {target!r}, {reason}")
+        self.target = target
+        self.reason = reason
+
+
+__all__ = [
+    "BenchTargetError",
+    "CpuBoundDependencyError",
+    "DependencyTimeoutError",
+    "LazyDependencyError",
+    "LimiterBoundsError",
+    "ParamsModelError",
+    "ThreadpoolOffloadError",
+    "UnknownBulkheadError",
+]
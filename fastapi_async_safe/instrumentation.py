@@ -0,0 +1,168 @@
+from contextlib import nullcontext
+from functools import wraps
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional, Sequence
+
+from fastapi.dependencies.models import Dependant
+from starlette.concurrency import run_in_threadpool
+
+from .callables import is_coroutine_call, is_generator_call
+from .decorators import is_async_safe_wrapper
+from .markers import is_cpu_bound
+from .timing import DependencyTiming, current_timings
+from .types import DependantCall, ExecutionMode
+from .utils import EXECUTION_MODE_ATTR, mark_wrapper, wrap_dependant_call
+
+if TYPE_CHECKING:
+    from opentelemetry.trace import Tracer
+
+_INSTRUMENTED_WRAPPER_ATTR = "__is_instrumented_wrapper__"
+
+EXECUTION_MODE_ATTRIBUTE = "fastapi_async_safe.execution_mode"
+LIMITER_WAIT_ATTRIBUTE = "fastapi_async_safe.limiter_wait"
+CACHE_HIT_ATTRIBUTE = "fastapi_async_safe.cache_hit"
+
+CacheHit = tuple[str, ExecutionMode]
+
+
+def call_name(call: DependantCall) -> str:
+    return getattr(call, "__qualname__", None) or type(call).__qualname__
+
+
+def is_instrumented(call: DependantCall) -> bool:
+    return getattr(call, _INSTRUMENTED_WRAPPER_ATTR, False)
+
+
+def execution_mode(call: DependantCall) -> ExecutionMode:
+    # call is already instrumented, so it's executed in the same way as original call
+    mode: Optional[ExecutionMode] = getattr(call, EXECUTION_MODE_ATTR, None)
+    if mode is not None:
+        return mode
+
+    if is_async_safe_wrapper(call):
+        return "process" if is_cpu_bound(call) else "inline"
+
+    if is_coroutine_call(call):
+        return "coroutine"
+
+    return "threadpool"
+
+
+async def _run_in_threadpool(call: DependantCall, *args: Any, **kwargs: Any) -> tuple[Any, float]:
+    submitted = perf_counter()
+    started = submitted
+
+    def _run() -> Any:
+        nonlocal started
+        started = perf_counter()
+
+        return call(*args, **kwargs)
+
+    _run.__wrapped__ = call  # type: ignore[attr-defined]
+
+    result = await run_in_threadpool(_run)
+    return result, started - submitted
+
+
+def _record_cache_hits(tracer: "Tracer", cache_hits: Sequence[CacheHit]) -> None:
+    # cached dependency is not called at all, so its span is recorded when dependant that uses it is called
+    for name, mode in cache_hits:
+        span = tracer.start_span(name, attributes={EXECUTION_MODE_ATTRIBUTE: mode, CACHE_HIT_ATTRIBUTE: True})
+        span.end()
+
+
+def instrumented_wrapper(
+    call: DependantCall,
+    *,
+    timing: bool = False,
+    tracer: Optional["Tracer"] = None,
+    cache_hits: Sequence[CacheHit] = (),
+) -> Callable[..., Awaitable[Any]]:
+    name = call_name(call)
+    mode = execution_mode(call)
+
+    # call can be already wrapped to be executed in the thread-pool (e.g. by bulkhead)
+    offload = mode == "threadpool" and not is_coroutine_call(call)
+
+    @wraps(call)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        timings = current_timings() if timing else None
+
+        if tracer is not None:
+            _record_cache_hits(tracer, cache_hits)
+            span_ctx: Any = tracer.start_as_current_span(
+                name,
+                attributes={EXECUTION_MODE_ATTRIBUTE: mode, CACHE_HIT_ATTRIBUTE: False},
+            )
+        else:
+            span_ctx = nullcontext()
+
+        start = perf_counter()
+
+        try:
+            with span_ctx as span:
+                # FastAPI delegates sync calls to the thread-pool in the same way
+                if not offload:
+                    return await call(*args, **kwargs)
+
+                result, wait = await _run_in_threadpool(call, *args, **kwargs)
+
+                if span is not None:
+                    span.set_attribute(LIMITER_WAIT_ATTRIBUTE, wait)
+
+                return result
+        finally:
+            # request is not sampled, nobody will read the timing
+            if timings is not None:
+                timings.append(DependencyTiming(name, mode, perf_counter() - start))
+
+    return mark_wrapper(wrapper, call, mode, _INSTRUMENTED_WRAPPER_ATTR)
+
+
+def cached_dependencies(root: Dependant) -> dict[int, list[CacheHit]]:
+    seen: set[Any] = set()
+    hits: dict[int, list[CacheHit]] = {}
+
+    # mimics FastAPI resolution order, dependency result is taken from the cache if the same dependency
+    # was already resolved before
+    def _visit(dependant: Dependant) -> None:
+        for dep in dependant.dependencies:
+            _visit(dep)
+
+            if dep.call is not None and dep.use_cache and dep.cache_key in seen:
+                hits.setdefault(id(dependant), []).append((call_name(dep.call), execution_mode(dep.call)))
+
+            seen.add(dep.cache_key)
+
+    _visit(root)
+    return hits
+
+
+def instrument_dependant(
+    dependant: Dependant,
+    *,
+    timing: bool = False,
+    tracer: Optional["Tracer"] = None,
+    cache_hits: Sequence[CacheHit] = (),
+) -> bool:
+    def _wrap(call: DependantCall) -> Optional[DependantCall]:
+        # generator dependencies are entered by FastAPI itself, there is no single call to measure
+        if is_generator_call(call):
+            return None
+
+        return instrumented_wrapper(call, timing=timing, tracer=tracer, cache_hits=cache_hits)
+
+    return wrap_dependant_call(dependant, _wrap, _INSTRUMENTED_WRAPPER_ATTR)
+
+
+__all__ = [
+    "CACHE_HIT_ATTRIBUTE",
+    "EXECUTION_MODE_ATTRIBUTE",
+    "LIMITER_WAIT_ATTRIBUTE",
+    "cached_dependencies",
+    "call_name",
+    "execution_mode",
+    "instrument_dependant",
+    "instrumented_wrapper",
+    "is_instrumented",
+]
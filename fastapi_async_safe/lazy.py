@@ -0,0 +1,110 @@
+import asyncio
+import inspect
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator, Awaitable, Callable, Generator, Generic, Optional, TypeVar
+
+from fastapi import Depends, Request
+from fastapi.dependencies.models import Dependant
+from fastapi.dependencies.utils import get_dependant, get_flat_dependant
+
+from .exceptions import LazyDependencyError
+from .types import DependantCall
+from .utils import solve_dependant
+
+T = TypeVar("T")
+
+_LAZY_DEPENDANT_ATTR = "__lazy_dependant__"
+_LAZY_NAME = "value"
+
+
+class LazyDependency(Generic[T]):
+    __slots__ = ("_future", "_resolver")
+
+    def __init__(self, resolver: Callable[[], Awaitable[T]]) -> None:
+        self._resolver = resolver
+        self._future: Optional[asyncio.Future[T]] = None
+
+    @property
+    def resolved(self) -> bool:
+        return self._future is not None and self._future.done()
+
+    async def resolve(self) -> T:
+        # concurrent resolutions will share the same future, so sub-graph will be built only once
+        if self._future is None:
+            self._future = asyncio.ensure_future(self._resolver())
+
+        return await self._future
+
+    def __await__(self) -> Generator[Any, None, T]:
+        return self.resolve().__await__()
+
+    def __getattr__(self, name: str) -> "_LazyAttribute":
+        return _LazyAttribute(self, name)
+
+
+class _LazyAttribute:
+    __slots__ = ("_lazy", "_name")
+
+    def __init__(self, lazy: LazyDependency[Any], name: str) -> None:
+        self._lazy = lazy
+        self._name = name
+
+    async def _get(self) -> Any:
+        return getattr(await self._lazy.resolve(), self._name)
+
+    def __await__(self) -> Generator[Any, None, Any]:
+        return self._get().__await__()
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        result = (await self._get())(*args, **kwargs)
+
+        if inspect.isawaitable(result):
+            result = await result
+
+        return result
+
+
+Lazy = LazyDependency
+
+
+async def _resolve(request: Request, dependant: Dependant, stack: AsyncExitStack) -> Any:
+    # route provider knows about wrapped calls, so overrides of original calls will be found
+    route = request.scope.get("route")
+    provider = getattr(route, "dependency_overrides_provider", None) or request.app
+
+    values = await solve_dependant(
+        request=request,
+        dependant=Dependant(dependencies=[dependant]),
+        dependency_overrides_provider=provider,
+        async_exit_stack=stack,
+    )
+
+    return values[_LAZY_NAME]
+
+
+def lazy_depends(dependency: DependantCall, *, use_cache: bool = True) -> Any:
+    dependant = get_dependant(path="", call=dependency, name=_LAZY_NAME)
+
+    # request body is already consumed when lazy dependency is resolved
+    if get_flat_dependant(dependant).body_params:
+        raise LazyDependencyError(dependency, "it depends on request body")
+
+    # generator dependencies of sub-graph will be closed together with lazy dependency itself
+    async def factory(request: Request) -> AsyncIterator[LazyDependency[Any]]:
+        async with AsyncExitStack() as stack:
+            yield LazyDependency(lambda: _resolve(request, dependant, stack))
+
+    setattr(factory, _LAZY_DEPENDANT_ATTR, dependant)
+    return Depends(factory, use_cache=use_cache)
+
+
+def get_lazy_dependant(call: Any) -> Optional[Dependant]:
+    return getattr(call, _LAZY_DEPENDANT_ATTR, None)
+
+
+__all__ = [
+    "Lazy",
+    "LazyDependency",
+    "get_lazy_dependant",
+    "lazy_depends",
+]
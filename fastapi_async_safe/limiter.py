@@ -0,0 +1,116 @@
+import asyncio
+import math
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+
+from anyio import CapacityLimiter, to_thread
+
+from .exceptions import LimiterBoundsError
+
+
+@dataclass(frozen=True)
+class LimiterMetrics:
+    min_tokens: int
+    max_tokens: int
+    total_tokens: float
+    borrowed_tokens: int
+    tasks_waiting: int
+
+
+@dataclass
+class LimiterAutosizer:
+    # by default limiter is never shrunk below its starting size, otherwise next burst after idle period
+    # would be queued until limiter grows back
+    min_tokens: Optional[int] = None
+    max_tokens: int = 200
+    step: int = 5
+    interval: float = 1.0
+    # limiter is shrunk only when less than this part of tokens is borrowed
+    shrink_threshold: float = 0.5
+    limiter: Optional[CapacityLimiter] = field(default=None, repr=False)
+    _start_tokens: Optional[int] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        min_tokens = 1 if self.min_tokens is None else self.min_tokens
+
+        if not 1 <= min_tokens <= self.max_tokens:
+            raise LimiterBoundsError(min_tokens, self.max_tokens)
+
+    def _get_limiter(self) -> CapacityLimiter:
+        # default limiter is bound to the running event loop, so it can't be resolved in advance
+        if self.limiter is not None:
+            return self.limiter
+
+        return to_thread.current_default_thread_limiter()
+
+    def _min_tokens(self, limiter: CapacityLimiter) -> int:
+        if self.min_tokens is not None:
+            return self.min_tokens
+
+        if self._start_tokens is None:
+            total = limiter.total_tokens
+            self._start_tokens = self.max_tokens if math.isinf(total) else int(min(self.max_tokens, max(1, total)))
+
+        return self._start_tokens
+
+    def metrics(self) -> LimiterMetrics:
+        limiter = self._get_limiter()
+        stats = limiter.statistics()
+
+        return LimiterMetrics(
+            min_tokens=self._min_tokens(limiter),
+            max_tokens=self.max_tokens,
+            total_tokens=stats.total_tokens,
+            borrowed_tokens=stats.borrowed_tokens,
+            tasks_waiting=stats.tasks_waiting,
+        )
+
+    def _clamp(self, limiter: CapacityLimiter, tokens: float) -> int:
+        return int(min(self.max_tokens, max(self._min_tokens(limiter), tokens)))
+
+    def adjust(self) -> float:
+        limiter = self._get_limiter()
+        stats = limiter.statistics()
+        total = stats.total_tokens
+
+        if stats.tasks_waiting:
+            # grow fast, otherwise requests will keep queueing until next adjustment
+            total += max(self.step, stats.tasks_waiting)
+        elif stats.borrowed_tokens <= total * self.shrink_threshold:
+            total -= self.step
+
+        limiter.total_tokens = self._clamp(limiter, total)
+        return limiter.total_tokens
+
+    async def _run(self) -> None:
+        while True:
+            self.adjust()
+            await asyncio.sleep(self.interval)
+
+    @asynccontextmanager
+    async def running(self) -> AsyncIterator["LimiterAutosizer"]:
+        limiter = self._get_limiter()
+        initial_tokens = limiter.total_tokens
+
+        # starting size is resolved again for each run, as limiter can be changed between them
+        self._start_tokens = None
+        limiter.total_tokens = self._clamp(limiter, self.max_tokens if math.isinf(initial_tokens) else initial_tokens)
+        task = asyncio.create_task(self._run())
+
+        try:
+            yield self
+        finally:
+            task.cancel()
+
+            with suppress(asyncio.CancelledError):
+                await task
+
+            limiter.total_tokens = initial_tokens
+            self._start_tokens = None
+
+
+__all__ = [
+    "LimiterAutosizer",
+    "LimiterMetrics",
+]
@@ -1,22 +1,107 @@
-from typing import Optional, TypeVar
+from typing import Any, Callable, Optional, TypeVar, Union, overload
+
+from .callables import iter_call_chain, unwrap_partial
 
 T = TypeVar("T")
 
 _MARKER_ATTR = "__is_async_safe__"
+_CPU_BOUND_MARKER_ATTR = "__is_cpu_bound__"
+_PARAMS_MODEL_MARKER_ATTR = "__is_params_model__"
+_TIMEOUT_ATTR = "__dependency_timeout__"
 
 
-def async_safe(dep: T) -> T:
-    setattr(dep, _MARKER_ATTR, True)
-    return dep
+@overload
+def async_safe(dep: T, /) -> T:
+    pass
 
 
-def async_unsafe(dep: T) -> T:
-    setattr(dep, _MARKER_ATTR, False)
-    return dep
+@overload
+def async_safe(*, params_model: bool = False, timeout: Optional[float] = None) -> Callable[[T], T]:
+    pass
+
+
+def async_safe(
+    dep: Optional[T] = None,
+    /,
+    *,
+    params_model: bool = False,
+    timeout: Optional[float] = None,
+) -> Union[T, Callable[[T], T]]:
+    def decorator(call: T) -> T:
+        setattr(call, _MARKER_ATTR, True)
+
+        if params_model:
+            setattr(call, _PARAMS_MODEL_MARKER_ATTR, True)
+        if timeout is not None:
+            setattr(call, _TIMEOUT_ATTR, timeout)
+
+        return call
+
+    if dep is None:
+        return decorator
+
+    return decorator(dep)
+
+
+@overload
+def async_unsafe(dep: T, /) -> T:
+    pass
+
+
+@overload
+def async_unsafe(*, timeout: Optional[float] = None) -> Callable[[T], T]:
+    pass
+
+
+def async_unsafe(dep: Optional[T] = None, /, *, timeout: Optional[float] = None) -> Union[T, Callable[[T], T]]:
+    def decorator(call: T) -> T:
+        setattr(call, _MARKER_ATTR, False)
+
+        if timeout is not None:
+            setattr(call, _TIMEOUT_ATTR, timeout)
+
+        return call
+
+    if dep is None:
+        return decorator
+
+    return decorator(dep)
 
 
 def is_async_safe(dep: T) -> Optional[bool]:
-    return getattr(dep, _MARKER_ATTR, None)
+    # marker of partial, bound method or wrapper is taken from the function it wraps
+    for call in iter_call_chain(dep):
+        marker: Optional[bool] = getattr(call, _MARKER_ATTR, None)
+
+        if marker is not None:
+            return marker
+
+    return None
+
+
+def cpu_bound(dep: T) -> T:
+    setattr(dep, _CPU_BOUND_MARKER_ATTR, True)
+    return dep
+
+
+def is_cpu_bound(dep: T) -> bool:
+    return any(getattr(call, _CPU_BOUND_MARKER_ATTR, False) for call in iter_call_chain(dep))
+
+
+def get_timeout(dep: Any) -> Optional[float]:
+    for call in iter_call_chain(dep):
+        timeout: Optional[float] = getattr(call, _TIMEOUT_ATTR, None)
+
+        if timeout is not None:
+            return timeout
+
+    return None
+
+
+def is_params_model(dep: Any) -> bool:
+    # unlike `async_safe` marker it's not inherited, subclasses can have other dependencies
+    own_attrs = getattr(unwrap_partial(dep), "__dict__", {})
+    return bool(own_attrs.get(_PARAMS_MODEL_MARKER_ATTR, False))
 
 
 # TODO: Not sure if need this, maybe just remove it and force users to use `async_safe` decorator?
@@ -29,5 +114,9 @@ __all__ = [
     "async_safe",
     "async_unsafe",
     "is_async_safe",
+    "cpu_bound",
+    "is_cpu_bound",
+    "is_params_model",
+    "get_timeout",
     "AsyncSafeMixin",
 ]
@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Mapping
+
+from .types import DependantCall
+from .utils import get_original_call
+
+
+class DependencyOverrides(Mapping[Any, Any]):
+    __slots__ = ("_overrides", "_wrap")
+
+    def __init__(self, overrides: Mapping[Any, Any], wrap: Callable[[DependantCall], DependantCall]) -> None:
+        self._overrides = overrides
+        self._wrap = wrap
+
+    def __getitem__(self, call: Any) -> Any:
+        if call in self._overrides:
+            return self._wrap(self._overrides[call])
+
+        # dependant call can be replaced with wrapper, but overrides are set for original call
+        original = get_original_call(call)
+        if original is not call and original in self._overrides:
+            return self._wrap(self._overrides[original])
+
+        raise KeyError(call)
+
+    def get(self, call: Any, default: Any = None) -> Any:
+        try:
+            return self[call]
+        except KeyError:
+            pass
+
+        # FastAPI rebuilds dependant of each call when overrides are set, so sub-dependencies
+        # of rebuilt dependants are original calls and safety policy should be applied to them again
+        return default if default is None else self._wrap(default)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._overrides)
+
+    def __len__(self) -> int:
+        return len(self._overrides)
+
+
+@dataclass
+class DependencyOverridesProvider:
+    provider: Any
+    wrap: Callable[[DependantCall], DependantCall]
+
+    @property
+    def dependency_overrides(self) -> Mapping[Any, Any]:
+        # overrides are read on each request, so overrides set or changed after startup are picked up
+        overrides = getattr(self.provider, "dependency_overrides", None)
+
+        if not overrides:
+            return {}
+
+        return DependencyOverrides(overrides, self.wrap)
+
+
+def unwrap_overrides_provider(provider: Any) -> Any:
+    if isinstance(provider, DependencyOverridesProvider):
+        return provider.provider
+
+    return provider
+
+
+__all__ = [
+    "DependencyOverrides",
+    "DependencyOverridesProvider",
+    "unwrap_overrides_provider",
+]
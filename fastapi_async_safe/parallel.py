@@ -0,0 +1,176 @@
+import asyncio
+import inspect
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+from fastapi.dependencies.models import Dependant
+from fastapi.exceptions import RequestValidationError
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .callables import is_coroutine_call
+from .decorators import is_async_safe_wrapper
+from .markers import is_cpu_bound
+from .types import DependantCall, RouteHandler
+from .utils import replace_dependant_call
+
+_PARALLEL_WRAPPER_ATTR = "__is_parallel_wrapper__"
+
+_pending_tasks: ContextVar[Optional[list["asyncio.Future[Any]"]]] = ContextVar("_pending_tasks", default=None)
+
+
+@dataclass(frozen=True)
+class _Pending:
+    task: "asyncio.Future[Any]"
+
+
+def _is_parallel_wrapper(call: DependantCall) -> bool:
+    return getattr(call, _PARALLEL_WRAPPER_ATTR, False)
+
+
+def _mark_parallel_wrapper(wrapper: Callable[..., Awaitable[Any]], call: DependantCall) -> None:
+    wrapper.__signature__ = inspect.signature(call)  # type: ignore[attr-defined]
+    setattr(wrapper, _PARALLEL_WRAPPER_ATTR, True)
+
+
+def deferred_wrapper(call: DependantCall) -> Callable[..., Awaitable[Any]]:
+    @wraps(call)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        tasks = _pending_tasks.get()
+
+        # called outside of parallel route handler, nobody will await pending result
+        if tasks is None:
+            return await call(*args, **kwargs)
+
+        task = asyncio.ensure_future(call(*args, **kwargs))
+        tasks.append(task)
+
+        return _Pending(task)
+
+    _mark_parallel_wrapper(wrapper, call)
+    return wrapper
+
+
+def resolving_wrapper(call: DependantCall) -> Callable[..., Awaitable[Any]]:
+    @wraps(call)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        # all pending tasks are already running concurrently, awaiting them in declaration order
+        # makes sure that errors are raised in the same order as FastAPI would raise them
+        for name, value in kwargs.items():
+            if isinstance(value, _Pending):
+                kwargs[name] = await value.task
+
+        return await call(*args, **kwargs)
+
+    _mark_parallel_wrapper(wrapper, call)
+    return wrapper
+
+
+def _walk(dependant: Dependant) -> Iterator[tuple[Dependant, Dependant]]:
+    for dep in dependant.dependencies:
+        yield dependant, dep
+        yield from _walk(dep)
+
+
+def _can_resolve(dependant: Dependant) -> bool:
+    return dependant.call is not None and is_coroutine_call(dependant.call)
+
+
+def _can_defer(dependant: Dependant) -> bool:
+    call = dependant.call
+
+    if call is None or not is_coroutine_call(call):
+        return False
+
+    # call is executed inline without any await, there is nothing to run concurrently
+    return not (is_async_safe_wrapper(call) and not is_cpu_bound(call))
+
+
+def _deferred_keys(root: Dependant) -> set[Any]:
+    keys: set[Any] = set()
+
+    for parent in [root, *(dep for _, dep in _walk(root))]:
+        if not _can_resolve(parent):
+            continue
+
+        branches = [dep for dep in parent.dependencies if dep.name is not None and _can_defer(dep)]
+
+        # single branch will be awaited right away, so it makes no sense to defer it
+        if len(branches) > 1:
+            keys.update(dep.cache_key for dep in branches)
+
+    # dependency result can be shared using dependency cache, so each place where it can be used
+    # should be able to await pending result, otherwise it's not safe to defer it
+    for parent, dep in _walk(root):
+        if dep.cache_key in keys and (dep.name is None or not _can_resolve(parent)):
+            keys.discard(dep.cache_key)
+
+    return keys
+
+
+def _replace_call(dependant: Dependant, call: DependantCall) -> None:
+    # cache key should stay the same, so all usages of dependency will share the same pending result
+    replace_dependant_call(dependant, call, dependant.cache_key)
+
+
+def wrap_parallel(root: Dependant) -> bool:
+    keys = _deferred_keys(root)
+
+    if not keys:
+        return False
+
+    nodes = [root, *(dep for _, dep in _walk(root))]
+
+    for node in nodes:
+        if node.call is None or _is_parallel_wrapper(node.call):
+            continue
+
+        if any(dep.cache_key in keys for dep in node.dependencies):
+            _replace_call(node, resolving_wrapper(node.call))
+
+        if node.cache_key in keys:
+            _replace_call(node, deferred_wrapper(node.call))
+
+    return True
+
+
+def parallel_handler(handler: RouteHandler) -> RouteHandler:
+    @wraps(handler)
+    async def wrapper(request: Request) -> Response:
+        tasks: list[asyncio.Future[Any]] = []
+        token = _pending_tasks.set(tasks)
+
+        try:
+            return await handler(request)
+        except RequestValidationError:
+            # FastAPI reports validation errors after all dependencies are called, so without parallel
+            # resolution failure of a branch that is still pending would be raised first
+            for task in tasks:
+                await asyncio.wait([task])
+
+                error = None if task.cancelled() else task.exception()
+                if error is not None:
+                    raise error from None
+
+            raise
+        finally:
+            _pending_tasks.reset(token)
+
+            # some branch failed before others were awaited
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # mark exception as retrieved
+
+    return wrapper
+
+
+__all__ = [
+    "deferred_wrapper",
+    "parallel_handler",
+    "resolving_wrapper",
+    "wrap_parallel",
+]
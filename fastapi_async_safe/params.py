@@ -0,0 +1,136 @@
+import inspect
+from copy import copy
+from typing import Any, Callable, Optional
+
+import fastapi
+from fastapi import Query
+from fastapi.dependencies.models import Dependant
+from fastapi.dependencies.utils import get_dependant
+from pydantic import BaseModel, create_model
+from typing_extensions import Annotated, TypeAlias
+
+from .callables import is_coroutine_call, is_generator_call
+from .exceptions import ParamsModelError
+from .instrumentation import call_name
+from .markers import is_params_model
+from .types import DependantCall
+from .utils import get_original_call, mark_wrapper, replace_dependant_wrapper
+
+_PARAMS_NAME = "params"
+
+# older FastAPI versions treat pydantic model as a single query param
+_QUERY_MODELS_SUPPORTED = tuple(int(part) for part in fastapi.__version__.split(".")[:2]) >= (0, 115)
+
+# params of these kinds are validated separately, so dependency that uses them can't be compiled
+_NOT_QUERY_PARAMS = (
+    "path_params",
+    "header_params",
+    "cookie_params",
+    "body_params",
+)
+_SPECIAL_PARAMS = (
+    "request_param_name",
+    "websocket_param_name",
+    "http_connection_param_name",
+    "response_param_name",
+    "background_tasks_param_name",
+    "security_scopes_param_name",
+)
+
+
+def _check_params_dependant(dependant: Dependant, call: DependantCall) -> None:
+    if not _QUERY_MODELS_SUPPORTED:
+        raise ParamsModelError(call, "query params models require FastAPI 0.115 or newer")
+
+    if is_generator_call(call):
+        raise ParamsModelError(call, "generator dependencies are not supported")
+
+    if dependant.dependencies:
+        raise ParamsModelError(call, "it has sub-dependencies")
+
+    for kind in _NOT_QUERY_PARAMS:
+        if getattr(dependant, kind):
+            raise ParamsModelError(call, f"it has {kind.replace('_', ' ')}")
+
+    for param in _SPECIAL_PARAMS:
+        if getattr(dependant, param, None) is not None:
+            raise ParamsModelError(call, f"it depends on {param.removesuffix('_param_name')} object")
+
+    if not dependant.query_params:
+        raise ParamsModelError(call, "it has no query params")
+
+
+def params_model(call: DependantCall, dependant: Dependant) -> type[BaseModel]:
+    # FastAPI params are pydantic fields, so they keep the same constraints, aliases and schema
+    fields: dict[str, Any] = {
+        field.name: (field.field_info.annotation, field.field_info) for field in dependant.query_params
+    }
+
+    return create_model(f"{call_name(call)}Params", **fields)
+
+
+def params_model_factory(call: DependantCall, model: type[BaseModel]) -> Callable[..., Any]:
+    async def factory(params: BaseModel) -> Any:
+        if is_coroutine_call(call):
+            return await call(**params.__dict__)
+
+        return call(**params.__dict__)
+
+    # when query param is pydantic model, FastAPI validates all its fields in a single pass
+    signature = inspect.Signature(
+        [
+            inspect.Parameter(
+                _PARAMS_NAME,
+                inspect.Parameter.KEYWORD_ONLY,
+                annotation=Annotated[model, Query()],
+            ),
+        ],
+    )
+    return mark_wrapper(factory, call, "inline", signature=signature)
+
+
+# id of original call -> original call, its factory and factory dependant
+_ParamsFactories: TypeAlias = dict[int, tuple[DependantCall, DependantCall, Dependant]]
+
+
+def _compile_dependant(dependant: Dependant, factories: _ParamsFactories) -> Optional[Dependant]:
+    call = get_original_call(dependant.call)
+    if call is None or not is_params_model(call):
+        return None
+
+    _check_params_dependant(dependant, call)
+
+    if id(call) not in factories:
+        factory = params_model_factory(call, params_model(call, dependant))
+        factories[id(call)] = (call, factory, get_dependant(path=dependant.path or "", call=factory))
+
+    _, factory, factory_dependant = factories[id(call)]
+
+    compiled = copy(dependant)
+    compiled.query_params = factory_dependant.query_params
+
+    replace_dependant_wrapper(compiled, factory)
+    return compiled
+
+
+def compile_params_models(dependant: Dependant, factories: Optional[_ParamsFactories] = None) -> Dependant:
+    factories = {} if factories is None else factories
+
+    # original dependant is left as is, it's used to generate OpenAPI schema with separate query params
+    compiled = _compile_dependant(dependant, factories)
+    dependencies = [compile_params_models(dep, factories) for dep in dependant.dependencies]
+
+    if compiled is None and all(new is old for new, old in zip(dependencies, dependant.dependencies)):
+        return dependant
+
+    compiled = copy(compiled or dependant)
+    compiled.dependencies = dependencies
+
+    return compiled
+
+
+__all__ = [
+    "compile_params_models",
+    "params_model",
+    "params_model_factory",
+]
@@ -0,0 +1,36 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class ProcessPool:
+    max_workers: Optional[int] = None
+    executor: Optional[ProcessPoolExecutor] = field(default=None, init=False, repr=False)
+
+    def start(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+        return self.executor
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        # pool is started lazily, so applications that never use it will not spawn any processes
+        executor = self.start()
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+
+__all__ = [
+    "ProcessPool",
+]
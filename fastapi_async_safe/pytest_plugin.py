@@ -0,0 +1,79 @@
+import inspect
+from contextlib import _GeneratorContextManager, contextmanager
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Iterator
+
+import pytest
+from anyio import to_thread
+
+from .exceptions import ThreadpoolOffloadError
+
+_MARKER = "no_threadpool"
+
+
+def _unwrap_call(func: Callable[..., Any]) -> Any:
+    while isinstance(func, partial):
+        func = func.func
+
+    # sync generator dependencies are entered/exited using context manager methods
+    owner = getattr(func, "__self__", None)
+    if isinstance(owner, _GeneratorContextManager):
+        return owner.func
+
+    return inspect.unwrap(func)
+
+
+def _call_name(call: Any) -> str:
+    module = getattr(call, "__module__", None)
+    name = getattr(call, "__qualname__", None) or repr(call)
+
+    return f"{module}.{name}" if module else name
+
+
+@dataclass
+class ThreadpoolGuard:
+    calls: list[Any] = field(default_factory=list)
+
+    async def _run_sync(self, func: Callable[..., Any], *_: Any, **__: Any) -> Any:
+        call = _unwrap_call(func)
+        self.calls.append(call)
+
+        raise ThreadpoolOffloadError(call, _call_name(call))
+
+    @contextmanager
+    def activate(self) -> Iterator["ThreadpoolGuard"]:
+        original = to_thread.run_sync
+        to_thread.run_sync = self._run_sync  # type: ignore[assignment]
+
+        try:
+            yield self
+        finally:
+            to_thread.run_sync = original
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line("markers", f"{_MARKER}: fail test if anything is offloaded to the thread-pool")
+
+
+@pytest.fixture
+def no_threadpool() -> Iterator[ThreadpoolGuard]:
+    with ThreadpoolGuard().activate() as guard:
+        yield guard
+
+    # error raised inside of the app can be swallowed (e.g. by error handler or test client)
+    if guard.calls:
+        names = ", ".join(_call_name(call) for call in guard.calls)
+        pytest.fail(f"Calls were offloaded to the thread-pool: {names}", pytrace=False)
+
+
+@pytest.fixture(autouse=True)
+def _no_threadpool_marker(request: pytest.FixtureRequest) -> None:
+    if request.node.get_closest_marker(_MARKER) is not None:
+        request.getfixturevalue("no_threadpool")
+
+
+__all__ = [
+    "ThreadpoolGuard",
+    "no_threadpool",
+]
@@ -0,0 +1,207 @@
+from collections.abc import Sized
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache, wraps
+from pickle import PicklingError
+from typing import Any, Callable, Optional, TypeVar, Union
+
+from fastapi import routing
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+from typing_extensions import Literal, TypeAlias
+
+from .pool import ProcessPool
+from .types import RouteHandler
+
+try:
+    from pydantic import TypeAdapter, ValidationError
+except ImportError:  # pragma: no cover
+    TypeAdapter = None  # type: ignore
+
+T = TypeVar("T")
+
+_POLICY_ATTR = "__response_serialization_policy__"
+
+# - "inline" - validate and serialize response in the event loop
+# - "thread" - validate and serialize response in the thread-pool
+# - "process" - validate and serialize response in the process-pool (response model and content should be picklable)
+SerializationMode: TypeAlias = Literal["inline", "thread", "process"]
+SerializationPolicy: TypeAlias = Callable[[Any], SerializationMode]
+
+_SERIALIZE_OPTIONS = (
+    "include",
+    "exclude",
+    "by_alias",
+    "exclude_unset",
+    "exclude_defaults",
+    "exclude_none",
+)
+
+
+def serialization_policy(policy: Union[SerializationMode, SerializationPolicy]) -> Callable[[T], T]:
+    def decorator(endpoint: T) -> T:
+        setattr(endpoint, _POLICY_ATTR, policy)
+        return endpoint
+
+    return decorator
+
+
+def get_serialization_policy(endpoint: Any) -> Optional[Union[SerializationMode, SerializationPolicy]]:
+    return getattr(endpoint, _POLICY_ATTR, None)
+
+
+def offload_large_responses(threshold: int = 1_000, mode: SerializationMode = "thread") -> SerializationPolicy:
+    def policy(content: Any) -> SerializationMode:
+        if isinstance(content, Sized) and not isinstance(content, (str, bytes)) and len(content) >= threshold:
+            return mode
+
+        return "inline"
+
+    return policy
+
+
+def _as_policy(policy: Union[SerializationMode, SerializationPolicy]) -> SerializationPolicy:
+    if callable(policy):
+        return policy
+
+    return lambda _: policy
+
+
+@dataclass
+class RouteSerialization:
+    policy: SerializationPolicy
+    annotation: Any
+    pool: ProcessPool
+
+
+_current_route: ContextVar[Optional[RouteSerialization]] = ContextVar("_current_route", default=None)
+
+
+def _validate_and_serialize(field: Any, content: Any, options: dict[str, Any]) -> tuple[bool, Any]:
+    value, errors = field.validate(content, {}, loc=("response",))
+    if errors:
+        return False, None
+
+    return True, field.serialize(value, **options)
+
+
+# executed in worker process, so coverage is not able to track it
+@lru_cache(maxsize=None)
+def _type_adapter(annotation: Any) -> Any:  # pragma: no cover
+    return TypeAdapter(annotation)
+
+
+def _validate_and_serialize_in_process(
+    annotation: Any,
+    content: Any,
+    options: dict[str, Any],
+) -> tuple[bool, Any]:  # pragma: no cover
+    adapter = _type_adapter(annotation)
+
+    try:
+        value = adapter.validate_python(content, from_attributes=True)
+    except ValidationError:
+        return False, None
+
+    return True, adapter.dump_python(value, mode="json", **options)
+
+
+_original_serialize_response = routing.serialize_response
+
+
+async def serialize_response(
+    *,
+    field: Optional[Any] = None,
+    response_content: Any,
+    is_coroutine: bool = True,
+    **kwargs: Any,
+) -> Any:
+    route = _current_route.get()
+
+    if route is None or field is None:
+        return await _original_serialize_response(
+            field=field,
+            response_content=response_content,
+            is_coroutine=is_coroutine,
+            **kwargs,
+        )
+
+    mode = route.policy(response_content)
+    options = {key: kwargs[key] for key in _SERIALIZE_OPTIONS if key in kwargs}
+
+    if mode == "process" and TypeAdapter is not None:
+        try:
+            ok, result = await route.pool.run(
+                _validate_and_serialize_in_process,
+                route.annotation,
+                response_content,
+                options,
+            )
+        except (PicklingError, AttributeError, TypeError):
+            # response model or content can't be sent to another process, thread-pool is the best we can do
+            ok, result = await run_in_threadpool(_validate_and_serialize, field, response_content, options)
+    elif mode != "inline":
+        ok, result = await run_in_threadpool(_validate_and_serialize, field, response_content, options)
+    else:
+        ok, result = False, None
+
+    if ok:
+        return result
+
+    # inline mode or response is invalid, FastAPI will validate it inline and raise proper validation error
+    return await _original_serialize_response(
+        field=field,
+        response_content=response_content,
+        is_coroutine=True,
+        **kwargs,
+    )
+
+
+def install_serialize_response() -> None:
+    # request handler looks up `serialize_response` in module globals on each call
+    routing.serialize_response = serialize_response
+
+
+def serialization_handler(handler: RouteHandler, route: RouteSerialization) -> RouteHandler:
+    @wraps(handler)
+    async def wrapper(request: Request) -> Response:
+        token = _current_route.set(route)
+        try:
+            return await handler(request)
+        finally:
+            _current_route.reset(token)
+
+    return wrapper
+
+
+def route_serialization(
+    endpoint: Any,
+    annotation: Any,
+    default: Optional[Union[SerializationMode, SerializationPolicy]],
+    pool: ProcessPool,
+) -> Optional[RouteSerialization]:
+    policy = get_serialization_policy(endpoint) or default
+
+    if policy is None:
+        return None
+
+    return RouteSerialization(
+        policy=_as_policy(policy),
+        annotation=annotation,
+        pool=pool,
+    )
+
+
+__all__ = [
+    "RouteSerialization",
+    "SerializationMode",
+    "SerializationPolicy",
+    "get_serialization_policy",
+    "install_serialize_response",
+    "offload_large_responses",
+    "route_serialization",
+    "serialization_handler",
+    "serialization_policy",
+    "serialize_response",
+]
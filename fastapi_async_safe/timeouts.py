@@ -0,0 +1,100 @@
+import asyncio
+from functools import partial, wraps
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi.dependencies.models import Dependant
+from starlette.concurrency import run_in_threadpool
+
+from .callables import is_coroutine_call, is_generator_call
+from .exceptions import DependencyTimeoutError
+from .instrumentation import execution_mode
+from .markers import get_timeout
+from .types import DependantCall, TimeoutErrorFactory
+from .utils import WrappersCache, mark_wrapper, wrap_dependant_call
+
+_TIMEOUT_WRAPPER_ATTR = "__is_timeout_wrapper__"
+
+
+def _discard_result(task: "asyncio.Future[Any]") -> None:
+    # late result of abandoned call is not needed anymore, but its error should be retrieved
+    if not task.cancelled():
+        task.exception()
+
+
+async def _wait_abandoning(awaitable: Awaitable[Any], timeout: float, expired: Callable[[], Exception]) -> Any:
+    task = asyncio.ensure_future(awaitable)
+
+    try:
+        await asyncio.wait((task,), timeout=timeout)
+    finally:
+        if not task.done():
+            # coroutine is cancelled, but thread can't be interrupted, so the call is left to complete in background
+            # and its result is discarded, thread-pool token is still held until the thread is finished
+            task.cancel()
+            task.add_done_callback(_discard_result)
+
+    # only expired deadline is reported as timeout, errors of the call itself (even `TimeoutError`) are kept as is
+    if not task.done():
+        raise expired()
+
+    return task.result()
+
+
+def timeout_wrapper(
+    call: DependantCall,
+    timeout: float,
+    error: TimeoutErrorFactory = DependencyTimeoutError,
+) -> Callable[..., Awaitable[Any]]:
+    mode = execution_mode(call)
+
+    def _start(*args: Any, **kwargs: Any) -> Awaitable[Any]:
+        # call can be already wrapped to be executed in the thread-pool (e.g. by bulkhead)
+        if mode == "threadpool" and not is_coroutine_call(call):
+            return run_in_threadpool(call, *args, **kwargs)
+
+        awaitable: Awaitable[Any] = call(*args, **kwargs)
+        return awaitable
+
+    @wraps(call)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await _wait_abandoning(_start(*args, **kwargs), timeout, partial(error, call, timeout))
+
+    return mark_wrapper(wrapper, call, mode, _TIMEOUT_WRAPPER_ATTR)
+
+
+def _call_timeout(call: DependantCall, default: Optional[float]) -> Optional[float]:
+    timeout = get_timeout(call)
+    if timeout is None:
+        timeout = default
+
+    if timeout is None:
+        return None
+
+    # generators are entered by FastAPI itself
+    if is_generator_call(call):
+        return None
+
+    # sync call executed inline blocks the event loop, so it can't be interrupted
+    if execution_mode(call) == "inline":
+        return None
+
+    return timeout
+
+
+def wrap_timeout(
+    dependant: Dependant,
+    default: Optional[float] = None,
+    error: TimeoutErrorFactory = DependencyTimeoutError,
+    wrappers: Optional[WrappersCache] = None,
+) -> bool:
+    def _wrap(call: DependantCall) -> Optional[DependantCall]:
+        timeout = _call_timeout(call, default)
+        return None if timeout is None else timeout_wrapper(call, timeout, error)
+
+    return wrap_dependant_call(dependant, _wrap, _TIMEOUT_WRAPPER_ATTR, wrappers)
+
+
+__all__ = [
+    "timeout_wrapper",
+    "wrap_timeout",
+]
@@ -0,0 +1,72 @@
+import random
+import re
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .types import ExecutionMode
+
+_timings: ContextVar[Optional[list["DependencyTiming"]]] = ContextVar("_timings", default=None)
+
+
+@dataclass(frozen=True)
+class DependencyTiming:
+    name: str
+    mode: ExecutionMode
+    duration: float
+
+
+def current_timings() -> Optional[list[DependencyTiming]]:
+    return _timings.get()
+
+
+_INVALID_TOKEN_CHARS = re.compile(r"[^A-Za-z0-9_.\-]")
+
+
+def format_server_timing(timings: list[DependencyTiming], total: float) -> str:
+    metrics = [
+        f'{_INVALID_TOKEN_CHARS.sub("_", timing.name)};desc="{timing.mode}";dur={timing.duration * 1000:.3f}'
+        for timing in timings
+    ]
+    metrics.append(f"total;dur={total * 1000:.3f}")
+
+    return ", ".join(metrics)
+
+
+@dataclass
+class ServerTimingMiddleware:
+    app: ASGIApp
+    sample_rate: float = 1.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or random.random() >= self.sample_rate:  # noqa: S311
+            await self.app(scope, receive, send)
+            return
+
+        timings: list[DependencyTiming] = []
+        token = _timings.set(timings)
+        start = perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", format_server_timing(timings, perf_counter() - start))
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _timings.reset(token)
+
+
+__all__ = [
+    "DependencyTiming",
+    "ServerTimingMiddleware",
+    "current_timings",
+    "format_server_timing",
+]
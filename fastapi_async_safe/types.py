@@ -1,11 +1,35 @@
-from typing import Any, Callable
+from typing import Any, Callable, Coroutine
 
-from typing_extensions import TypeAlias
+from starlette.requests import Request
+from starlette.responses import Response
+from typing_extensions import Literal, TypeAlias
 
 DependantCall: TypeAlias = Callable[..., Any]
 DependantCallPredicate: TypeAlias = Callable[[DependantCall], bool]
 
+# builds exception that is raised when dependency is not completed in time, receives call and its timeout
+TimeoutErrorFactory: TypeAlias = Callable[[DependantCall, float], Exception]
+
+RouteHandler: TypeAlias = Callable[[Request], Coroutine[Any, Any, Response]]
+RouteHandlerDecorator: TypeAlias = Callable[[RouteHandler], RouteHandler]
+
+# - "marked" - run inline sync background tasks that are marked as async safe (or matched by predicates)
+# - "all" - run inline all sync background tasks
+# - "none" - leave background tasks as is, all sync tasks will be delegated to the thread-pool
+BackgroundTasksPolicy: TypeAlias = Literal["marked", "all", "none"]
+
+# - "inline" - sync call executed directly in the event loop
+# - "threadpool" - sync call delegated to the thread-pool
+# - "coroutine" - native async call
+# - "process" - sync call executed in the process-pool
+ExecutionMode: TypeAlias = Literal["inline", "threadpool", "coroutine", "process"]
+
 __all__ = [
+    "BackgroundTasksPolicy",
     "DependantCall",
     "DependantCallPredicate",
+    "ExecutionMode",
+    "RouteHandler",
+    "RouteHandlerDecorator",
+    "TimeoutErrorFactory",
 ]
@@ -0,0 +1,137 @@
+import inspect
+from contextlib import AsyncExitStack
+from typing import Any, Callable, Optional, TypeVar
+
+from fastapi.dependencies.models import Dependant
+from fastapi.dependencies.utils import solve_dependencies
+from fastapi.exceptions import RequestValidationError
+from starlette.requests import Request
+from typing_extensions import TypeAlias
+
+from .types import DependantCall, ExecutionMode
+
+TCall = TypeVar("TCall", bound=DependantCall)
+
+# newer FastAPI versions cache call kind on dependant, so it should be recalculated when call is replaced
+_CALL_CACHED_PROPERTIES = (
+    "is_gen_callable",
+    "is_async_gen_callable",
+    "is_coroutine_callable",
+    "computed_scope",
+)
+
+_ORIGINAL_CALL_ATTR = "__original_call__"
+EXECUTION_MODE_ATTR = "__execution_mode__"
+
+# id of original call -> original call and its wrapper (or `None` if call is left as is),
+# so all usages of the call share the same wrapper
+WrappersCache: TypeAlias = dict[int, tuple[DependantCall, Optional[DependantCall]]]
+
+# older FastAPI versions don't embed body fields and return tuple instead of `SolvedDependency`
+_SOLVE_EXTRA_KWARGS: dict[str, Any] = (
+    {"embed_body_fields": False} if "embed_body_fields" in inspect.signature(solve_dependencies).parameters else {}
+)
+
+
+def get_original_call(call: Any) -> Any:
+    return getattr(call, _ORIGINAL_CALL_ATTR, call)
+
+
+def replace_dependant_call(dependant: Dependant, call: DependantCall, cache_key: Optional[Any] = None) -> None:
+    if cache_key is None:
+        cache_key = (call, *dependant.cache_key[1:])
+
+    # FastAPI looks up dependency overrides by original call, so it should be known for each wrapper
+    original = get_original_call(dependant.call)
+    if call is not original:
+        setattr(call, _ORIGINAL_CALL_ATTR, original)
+
+    dependant.call = call
+    dependant.cache_key = cache_key
+
+    for name in _CALL_CACHED_PROPERTIES:
+        vars(dependant).pop(name, None)
+
+
+def mark_wrapper(
+    wrapper: TCall,
+    call: DependantCall,
+    mode: ExecutionMode,
+    marker: Optional[str] = None,
+    signature: Optional[inspect.Signature] = None,
+) -> TCall:
+    wrapper.__signature__ = inspect.signature(call) if signature is None else signature  # type: ignore[attr-defined]
+    setattr(wrapper, EXECUTION_MODE_ATTR, mode)
+
+    if marker is not None:
+        setattr(wrapper, marker, True)
+
+    return wrapper
+
+
+def replace_dependant_wrapper(dependant: Dependant, wrapper: DependantCall) -> None:
+    # cache key should stay the same, so dependency cache will work as before
+    replace_dependant_call(dependant, wrapper, dependant.cache_key)
+
+
+def wrap_dependant_call(
+    dependant: Dependant,
+    wrap: Callable[[DependantCall], Optional[DependantCall]],
+    marker: str,
+    wrappers: Optional[WrappersCache] = None,
+) -> bool:
+    call = dependant.call
+
+    if call is None or getattr(call, marker, False):
+        return False
+
+    wrappers = {} if wrappers is None else wrappers
+    if id(call) not in wrappers:
+        wrappers[id(call)] = (call, wrap(call))
+
+    _, wrapped = wrappers[id(call)]
+    if wrapped is None:
+        return False
+
+    replace_dependant_wrapper(dependant, wrapped)
+    return True
+
+
+async def solve_dependant(
+    request: Request,
+    dependant: Dependant,
+    dependency_overrides_provider: Optional[Any],
+    async_exit_stack: AsyncExitStack,
+) -> dict[str, Any]:
+    solved = await solve_dependencies(
+        request=request,
+        dependant=dependant,
+        dependency_overrides_provider=dependency_overrides_provider,
+        async_exit_stack=async_exit_stack,
+        **_SOLVE_EXTRA_KWARGS,
+    )
+
+    values: dict[str, Any]
+    errors: list[Any]
+
+    if isinstance(solved, tuple):  # pragma: no cover
+        values, errors, *_ = solved
+    else:
+        values, errors = solved.values, solved.errors
+
+    if errors:
+        raise RequestValidationError(errors)
+
+    return values
+
+
+__all__ = [
+    "EXECUTION_MODE_ATTR",
+    "WrappersCache",
+    "get_original_call",
+    "mark_wrapper",
+    "replace_dependant_call",
+    "replace_dependant_wrapper",
+    "solve_dependant",
+    "wrap_dependant_call",
+]
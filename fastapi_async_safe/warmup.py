@@ -0,0 +1,128 @@
+import logging
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Iterator
+
+from anyio import to_thread
+from fastapi import FastAPI
+from fastapi.dependencies.models import Dependant
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute, APIRouter
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+
+from .decorators import is_async_safe_wrapper
+from .markers import is_cpu_bound
+from .utils import solve_dependant
+
+logger = logging.getLogger(__name__)
+
+# these properties are calculated on first request, so they are calculated in advance
+_DEPENDANT_CACHED_PROPERTIES = (
+    "cache_key",
+    "oauth_scopes",
+    "is_gen_callable",
+    "is_async_gen_callable",
+    "is_coroutine_callable",
+    "computed_scope",
+)
+
+
+@dataclass(frozen=True)
+class WarmupReport:
+    routes: int
+    exercised: int
+    duration: float
+
+
+def _walk(dependant: Dependant) -> Iterator[Dependant]:
+    yield dependant
+
+    for dep in dependant.dependencies:
+        yield from _walk(dep)
+
+
+def _prebuild(root: Dependant) -> None:
+    for dependant in _walk(root):
+        for name in _DEPENDANT_CACHED_PROPERTIES:
+            getattr(dependant, name, None)
+
+
+def _can_exercise(route: APIRoute) -> bool:
+    if "GET" not in route.methods or route.dependant.body_params:
+        return False
+
+    # only dependencies that are executed inline are considered to be free of side effects
+    return all(
+        dependant.call is not None and is_async_safe_wrapper(dependant.call) and not is_cpu_bound(dependant.call)
+        for dependant in _walk(route.dependant)
+        if dependant is not route.dependant
+    )
+
+
+async def _exercise(app: Any, route: APIRoute) -> bool:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": route.path,
+        "query_string": b"",
+        "headers": [],
+        "path_params": {},
+        "app": app,
+    }
+
+    # endpoint itself is not called, only its dependencies and params are resolved
+    try:
+        async with AsyncExitStack() as stack:
+            scope["fastapi_inner_astack"] = scope["fastapi_function_astack"] = stack
+
+            await solve_dependant(
+                request=Request(scope),
+                dependant=route.dependant,
+                dependency_overrides_provider=route.dependency_overrides_provider,
+                async_exit_stack=stack,
+            )
+    except (RequestValidationError, HTTPException) as e:
+        # params and headers of real requests are not available (e.g. auth dependency fails),
+        # but dependencies are still resolved
+        logger.debug("Warm-up of %s route stopped by %r", route.path, e)
+    except Exception:
+        logger.warning("Warm-up of %s route failed", route.path, exc_info=True)
+        return False
+
+    return True
+
+
+async def warmup_app(app: Any, router: APIRouter) -> WarmupReport:
+    start = perf_counter()
+    routes = [route for route in router.routes if isinstance(route, APIRoute)]
+    exercised = 0
+
+    for route in routes:
+        _prebuild(route.dependant)
+
+        if _can_exercise(route) and await _exercise(app, route):
+            exercised += 1
+
+    # thread-pool and OpenAPI schema are initialized lazily on first use
+    await to_thread.run_sync(int)
+
+    if isinstance(app, FastAPI) and app.openapi_url:
+        app.openapi()
+
+    report = WarmupReport(routes=len(routes), exercised=exercised, duration=perf_counter() - start)
+    logger.info(
+        "Warm-up of %d routes (%d exercised) took %.3fs",
+        report.routes,
+        report.exercised,
+        report.duration,
+    )
+
+    return report
+
+
+__all__ = [
+    "WarmupReport",
+    "warmup_app",
+]
@@ -0,0 +1,149 @@
+import gc
+import threading
+import weakref
+from typing import Any
+
+from fastapi import BackgroundTasks, FastAPI
+from pytest import mark
+from starlette.background import BackgroundTask
+from starlette.background import BackgroundTasks as StarletteBackgroundTasks
+from starlette.responses import Response
+
+from fastapi_async_safe import async_safe, init_app
+from fastapi_async_safe.background import wrap_background_tasks
+
+from .utils import app_ctx
+
+
+async def test_marked_background_task():
+    app = FastAPI()
+    init_app(app)
+
+    indent = threading.get_ident()
+    calls = []
+
+    @async_safe
+    def safe_task(value: int) -> None:
+        calls.append(("safe", threading.get_ident() == indent, value))
+
+    def unsafe_task(value: int) -> None:
+        calls.append(("unsafe", threading.get_ident() == indent, value))
+
+    async def async_task(value: int) -> None:
+        calls.append(("async", threading.get_ident() == indent, value))
+
+    @app.get("/")
+    async def route(tasks: BackgroundTasks) -> Any:
+        tasks.add_task(safe_task, 1)
+        tasks.add_task(unsafe_task, 2)
+        tasks.add_task(async_task, value=3)
+        return {}
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        response.raise_for_status()
+
+    assert calls == [
+        ("safe", True, 1),
+        ("unsafe", False, 2),
+        ("async", True, 3),
+    ]
+
+
+@mark.parametrize(
+    ("policy", "expected"),
+    [
+        ("all", {"safe": True, "unsafe": True}),
+        ("none", {"safe": False, "unsafe": False}),
+    ],
+)
+async def test_background_tasks_policy(policy, expected):
+    app = FastAPI()
+    init_app(app, background_tasks=policy)
+
+    indent = threading.get_ident()
+    calls = {}
+
+    @async_safe
+    def safe_task() -> None:
+        calls["safe"] = threading.get_ident() == indent
+
+    def unsafe_task() -> None:
+        calls["unsafe"] = threading.get_ident() == indent
+
+    @app.get("/")
+    def route() -> Response:
+        return Response(
+            background=StarletteBackgroundTasks(
+                [
+                    BackgroundTask(safe_task),
+                    BackgroundTask(unsafe_task),
+                ],
+            ),
+        )
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        response.raise_for_status()
+
+    assert calls == expected
+
+
+async def test_background_tasks_predicates():
+    app = FastAPI()
+    init_app(app, predicates=[lambda f: f is sync_task])
+
+    indent = threading.get_ident()
+    calls = []
+
+    def sync_task() -> None:
+        calls.append(threading.get_ident() == indent)
+
+    @app.get("/")
+    async def route(tasks: BackgroundTasks) -> Any:
+        tasks.add_task(sync_task)
+        return {}
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        response.raise_for_status()
+
+    assert calls == [True]
+
+
+def test_wrap_unhashable_task():
+    @async_safe
+    class UnhashableTask:
+        __hash__ = None
+
+        def __call__(self) -> None:
+            pass
+
+    task = BackgroundTask(UnhashableTask())
+    wrap_background_tasks(task, lambda _: True)
+
+    assert task.is_async
+
+
+def test_task_not_kept_alive():
+    class Task:
+        @async_safe
+        def run(self) -> None:
+            pass
+
+    def closure(value: Any) -> Any:
+        return async_safe(lambda: value)
+
+    obj = Task()
+    ref = weakref.ref(obj)
+
+    # bound methods and closures usually hold per-request objects
+    tasks = [BackgroundTask(obj.run), BackgroundTask(closure(obj))]
+    for task in tasks:
+        wrap_background_tasks(task, lambda _: True)
+        assert task.is_async
+
+    del obj, task, tasks
+    gc.collect()
+
+    assert ref() is None
@@ -0,0 +1,201 @@
+import json
+import time
+from pathlib import Path
+
+from click.testing import CliRunner
+from fastapi import Depends, FastAPI, HTTPException
+from pytest import fixture, mark, raises
+
+from fastapi_async_safe import async_safe, init_app
+from fastapi_async_safe.__main__ import _format_diff, cli
+from fastapi_async_safe.bench import (
+    BenchmarkResult,
+    RequestSpec,
+    RequestsSpan,
+    WrapDecision,
+    bench_app,
+    benchmark_app,
+    discover_requests,
+    load_app,
+    load_requests,
+    wrap_decisions,
+)
+from fastapi_async_safe.exceptions import BenchTargetError
+
+
+@async_safe
+class Service:
+    pass
+
+
+def unsafe() -> int:
+    return 1
+
+
+def get_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/")
+    async def index(service: Service = Depends(), value: int = Depends(unsafe)) -> None:
+        pass
+
+    @app.get("/plain")
+    async def plain() -> None:
+        pass
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int) -> None:
+        pass
+
+    @app.get("/search")
+    async def search(q: str) -> None:
+        pass
+
+    @app.get("/broken")
+    async def broken() -> None:
+        raise HTTPException(status_code=500)
+
+    @app.post("/items")
+    async def create() -> None:
+        pass
+
+    return app
+
+
+app = get_app()
+initialized_app = init_app(get_app(), all_classes_safe=True)
+
+
+@fixture
+def spec_file(tmp_path: Path) -> Path:
+    path = tmp_path / "spec.json"
+    path.write_text(json.dumps([{"path": "/items/1"}, {"path": "/search", "params": {"q": "abc"}}]))
+
+    return path
+
+
+async def test_benchmark_app(tmp_path: Path):
+    profile = tmp_path / "app.prof"
+
+    result = await benchmark_app(
+        get_app(),
+        requests=10,
+        concurrency=2,
+        limiter_tokens=10,
+        profile=profile,
+        track_memory=True,
+    )
+
+    assert profile.exists()
+    assert result.peak_memory is not None
+    assert result.memory_per_request is not None
+
+    average = BenchmarkResult.average([result, BenchmarkResult.from_times([1.0])])
+    assert average.mean == (result.mean + 1_000) / 2
+    assert average.peak_memory is None
+
+
+async def test_bench_app():
+    bench_target = get_app()
+    requests, skipped = discover_requests(bench_target)
+
+    assert [str(r) for r in requests] == ["GET /", "GET /plain", "GET /broken"]
+    assert skipped == [
+        ("/items/{item_id}", "it has path params"),
+        ("/search", "it has required params: q"),
+    ]
+
+    results, failed = await bench_app(bench_target, requests, requests=5, concurrency=2, warmup=3)
+
+    assert [str(result.request) for result in results] == ["GET /", "GET /plain"]
+    assert failed == [("GET /broken", "it responded with 500 status")]
+
+    index, plain = results
+    assert index.diff == index.default.mean / index.async_safe.mean
+    assert index.default_throughput > 0
+    assert index.decisions == [WrapDecision("Service", "inline"), WrapDecision("unsafe", "threadpool")]
+    assert plain.decisions == []
+
+
+async def test_warmup_not_measured():
+    warmup_app = FastAPI()
+    calls: list[float] = []
+
+    @warmup_app.get("/")
+    async def index() -> None:
+        calls.append(time.perf_counter())
+
+    span = RequestsSpan(warmup_app, warmup=10)
+    await benchmark_app(span, requests=5, concurrency=1, warmup=10)
+
+    # measured span starts with the first request after warm-up
+    assert len(calls) == 15
+    assert span.start is not None
+    assert span.start > calls[9]
+
+
+async def test_bench_initialized_app():
+    results, _ = await bench_app(initialized_app, [RequestSpec()], requests=5, concurrency=2)
+
+    # options of already initialized application are reused
+    assert results[0].decisions == [WrapDecision("Service", "inline"), WrapDecision("unsafe", "threadpool")]
+    assert wrap_decisions(initialized_app, RequestSpec(path="/unknown")) == []
+
+
+def test_load_requests(spec_file: Path):
+    assert load_requests(spec_file) == [
+        RequestSpec(path="/items/1"),
+        RequestSpec(path="/search", params={"q": "abc"}),
+    ]
+
+
+@mark.parametrize(
+    ("target", "reason"),
+    [
+        ("tests.test_bench", "expected format"),
+        ("tests.unknown_module:app", "can't be imported"),
+        ("tests.test_bench:unknown", "attribute 'unknown' not found"),
+        ("tests.test_bench:get_app", "not FastAPI application"),
+    ],
+)
+def test_load_app_errors(target: str, reason: str):
+    with raises(BenchTargetError, match=reason):
+        load_app(target)
+
+
+def test_load_app():
+    assert load_app("tests.test_bench:app") is app
+
+
+def test_bench_command(spec_file: Path):
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["bench", "tests.test_bench:get_app.__call__", "-n", "5"])
+    assert result.exit_code == 2
+    assert "not FastAPI application" in result.output
+
+    result = runner.invoke(cli, ["bench", "tests.test_bench:initialized_app", "-n", "5", "-c", "2", "-w", "5"])
+    assert result.exit_code == 0, result.output
+    assert "| GET /plain" in result.output
+    assert "### Wrap decisions (GET /)" in result.output
+    assert "Route has no dependencies" in result.output
+    assert "Skipped /search: it has required params: q" in result.output
+
+    result = runner.invoke(
+        cli,
+        ["bench", "tests.test_bench:initialized_app", "-n", "5", "--spec", str(spec_file), "-o", "json"],
+    )
+    assert result.exit_code == 0, result.output
+    assert [item["request"]["path"] for item in json.loads(result.stdout)] == ["/items/1", "/search"]
+
+
+@mark.parametrize(
+    ("diff", "expected"),
+    [
+        (2, "x2.00 (faster)"),
+        (0.5, "x0.50 (slower)"),
+        (1, "x1 (same)"),
+    ],
+)
+def test_format_diff(diff: float, expected: str):
+    assert _format_diff(diff) == expected
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+from typing import Any
+
+from anyio import to_thread
+from fastapi import APIRouter, Depends, FastAPI
+from pytest import raises
+
+from fastapi_async_safe import Bulkhead, ServerTimingMiddleware, bulkhead, init_app
+from fastapi_async_safe.exceptions import UnknownBulkheadError
+
+from .utils import app_ctx
+
+
+def _blocking_dep() -> tuple[Any, threading.Event, threading.Event]:
+    entered = threading.Event()
+    release = threading.Event()
+
+    def dep() -> int:
+        entered.set()
+        release.wait(timeout=5)
+        return 1
+
+    return dep, entered, release
+
+
+async def test_load_shedding():
+    dep, entered, release = _blocking_dep()
+
+    app = FastAPI()
+    init_app(app, bulkheads={"reports": Bulkhead(tokens=1, max_waiting=0, retry_after=5)})
+
+    @app.get("/", tags=["reports"])
+    async def route(value: int = Depends(dep)) -> Any:
+        return value
+
+    async with app_ctx(app) as client:
+        task = asyncio.create_task(client.get("/"))
+        await to_thread.run_sync(entered.wait, 5)
+
+        response = await client.get("/")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
+
+        release.set()
+
+        response = await task
+        response.raise_for_status()
+        assert response.json() == 1
+
+
+async def test_priority_lane():
+    dep, entered, release = _blocking_dep()
+
+    def cheap_dep() -> str:
+        return "ok"
+
+    app = FastAPI()
+    init_app(app, bulkheads={"priority": Bulkhead(tokens=1)})
+
+    @app.get("/slow")
+    async def slow(value: int = Depends(dep)) -> Any:
+        return value
+
+    @app.get("/health")
+    @bulkhead("priority")
+    async def health(value: str = Depends(cheap_dep)) -> Any:
+        return value
+
+    limiter = to_thread.current_default_thread_limiter()
+    limiter.total_tokens = 1
+
+    try:
+        async with app_ctx(app) as client:
+            task = asyncio.create_task(client.get("/slow"))
+            while not entered.is_set():  # default thread-pool is busy, so event is polled
+                await asyncio.sleep(0.01)
+
+            # default thread-pool is saturated, but health check has its own lane
+            response = await asyncio.wait_for(client.get("/health"), timeout=1)
+            response.raise_for_status()
+            assert response.json() == "ok"
+
+            release.set()
+            (await task).raise_for_status()
+    finally:
+        limiter.total_tokens = 40
+
+
+async def test_instrumented():
+    def dep() -> int:
+        return 1
+
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware)
+    router = APIRouter(tags=["api"])
+    init_app(app, bulkheads={"api": Bulkhead(tokens=2, max_waiting=10)}, server_timing=True)
+
+    @router.get("/")
+    async def route(value: int = Depends(dep)) -> Any:
+        return value
+
+    app.include_router(router)
+
+    for _ in range(2):  # lifespan restart should not wrap dependencies twice
+        async with app_ctx(app) as client:
+            response = await client.get("/")
+            response.raise_for_status()
+
+        assert response.json() == 1
+        assert 'test_instrumented._locals_.dep;desc="threadpool"' in response.headers["server-timing"]
+
+
+async def test_unknown_bulkhead():
+    app = FastAPI()
+    init_app(app, bulkheads={})
+
+    @app.get("/")
+    @bulkhead("unknown")
+    async def route() -> Any:
+        pass  # pragma: no cover
+
+    with raises(UnknownBulkheadError):
+        async with app_ctx(app):
+            pass  # pragma: no cover
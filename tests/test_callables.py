@@ -0,0 +1,157 @@
+import threading
+from collections.abc import Iterator
+from functools import lru_cache, partial, wraps
+from typing import Any
+
+from fastapi import Depends, FastAPI
+from pytest import mark
+
+from fastapi_async_safe import async_safe, async_unsafe, init_app
+from fastapi_async_safe.callables import is_coroutine_call, is_generator_call, is_lru_cache_call
+from fastapi_async_safe.dependencies import _should_wrap_dependant_call
+from fastapi_async_safe.markers import is_async_safe
+
+from .utils import app_ctx
+
+
+@async_safe
+def marked(prefix: str, value: str = "") -> str:
+    return f"{prefix}-{value}-{threading.get_ident()}"
+
+
+async def coroutine() -> None:
+    pass
+
+
+def generator() -> Iterator[None]:
+    yield
+
+
+def decorator(func: Any) -> Any:
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+class Service:
+    @async_safe
+    def method(self, value: str = "") -> str:
+        return f"method-{value}-{threading.get_ident()}"
+
+
+class AsyncCallable:
+    async def __call__(self) -> str:
+        return "async-callable"
+
+
+class SafeCallable:
+    @async_safe
+    def __call__(self) -> str:
+        return f"safe-callable-{threading.get_ident()}"
+
+
+@async_safe
+class SafeClass:
+    pass
+
+
+@mark.parametrize(
+    ("call", "expected"),
+    [
+        (partial(marked, "prefix"), True),
+        (partial(partial(marked, "prefix"), value="value"), True),
+        (Service().method, True),
+        (decorator(marked), True),
+        (SafeCallable(), True),
+        (partial(SafeClass), True),
+        (async_unsafe(partial(marked, "prefix")), False),
+        (lambda: None, None),
+    ],
+    ids=[
+        "partial",
+        "nested-partial",
+        "bound-method",
+        "wraps",
+        "callable-instance",
+        "partial-class",
+        "unsafe-partial",
+        "not-marked",
+    ],
+)
+def test_is_async_safe(call, expected):
+    assert is_async_safe(call) is expected
+
+
+def test_call_kinds():
+    assert is_coroutine_call(partial(coroutine))
+    assert is_coroutine_call(AsyncCallable())
+    assert is_coroutine_call(decorator(coroutine))
+    assert not is_coroutine_call(SafeCallable())
+    assert not is_coroutine_call(SafeClass)
+
+    assert is_generator_call(partial(generator))
+    assert not is_generator_call(marked)
+
+
+@mark.parametrize(
+    "call",
+    [
+        AsyncCallable(),
+        async_safe(AsyncCallable()),
+        async_safe(generator),
+        partial(async_safe(generator)),
+    ],
+    ids=[
+        "async-callable",
+        "marked-async-callable",
+        "marked-generator",
+        "marked-generator-partial",
+    ],
+)
+def test_not_wrapped(call):
+    assert not _should_wrap_dependant_call(call, all_classes_safe=True)
+
+
+async def test_dependencies():
+    app = FastAPI()
+    init_app(app)
+
+    main_thread = threading.get_ident()
+
+    @app.get("/")
+    async def route(
+        a: str = Depends(partial(marked, "partial")),
+        b: str = Depends(Service().method),
+        c: str = Depends(SafeCallable()),
+        d: str = Depends(async_safe(AsyncCallable())),
+        e: Any = Depends(async_safe(generator)),
+    ) -> Any:
+        return [a, b, c, d, e]
+
+    async with app_ctx(app) as client:
+        response = await client.get("/", params={"value": "value"})
+        response.raise_for_status()
+
+    assert response.json() == [
+        f"partial-value-{main_thread}",
+        f"method-value-{main_thread}",
+        f"safe-callable-{main_thread}",
+        "async-callable",
+        None,
+    ]
+
+
+def test_lru_cache_calls():
+    class Service:
+        @lru_cache  # noqa: B019
+        def get(self) -> None:
+            pass
+
+    cached = lru_cache(maxsize=None)(marked)
+
+    assert is_lru_cache_call(cached)
+    assert is_lru_cache_call(partial(cached, "prefix"))
+    assert is_lru_cache_call(Service().get)
+    assert not is_lru_cache_call(marked)
@@ -0,0 +1,201 @@
+import asyncio
+from functools import partial
+
+from fastapi import Depends, FastAPI
+from fastapi.dependencies.utils import get_dependant
+from pytest import raises
+
+from fastapi_async_safe import async_safe, init_app, single_flight
+from fastapi_async_safe.coalescing import SingleFlight, get_single_flight, single_flight_wrapper, wrap_single_flight
+
+from .utils import app_ctx
+
+
+async def test_concurrent_requests_coalesced():
+    app = FastAPI()
+    init_app(app)
+
+    calls = []
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    @single_flight
+    async def load_tenant(tenant: str) -> dict[str, str]:
+        calls.append(tenant)
+        started.set()
+        await release.wait()
+        return {"tenant": tenant}
+
+    @app.get("/")
+    async def route(tenant: dict[str, str] = Depends(load_tenant)) -> dict[str, str]:
+        return tenant
+
+    async with app_ctx(app) as client:
+        requests = [asyncio.ensure_future(client.get("/", params={"tenant": "a"})) for _ in range(5)]
+        other = asyncio.ensure_future(client.get("/", params={"tenant": "b"}))
+
+        await started.wait()
+        await asyncio.sleep(0.01)
+        release.set()
+
+        responses = await asyncio.gather(*requests, other)
+
+    assert [r.json() for r in responses] == [{"tenant": "a"}] * 5 + [{"tenant": "b"}]
+    assert sorted(calls) == ["a", "b"]
+
+
+async def test_sync_dependency_coalesced():
+    app = FastAPI()
+    init_app(app)
+
+    calls = []
+
+    @single_flight
+    @async_safe
+    def get_config() -> str:
+        calls.append(1)
+        return "config"
+
+    @single_flight
+    def get_unsafe() -> str:
+        return "unsafe"
+
+    @app.get("/")
+    async def route(config: str = Depends(get_config), unsafe: str = Depends(get_unsafe)) -> list[str]:
+        return [config, unsafe]
+
+    async with app_ctx(app) as client:
+        assert (await client.get("/")).json() == ["config", "unsafe"]
+
+    assert calls == [1]
+
+
+async def test_error_propagated_to_all_waiters():
+    calls = []
+
+    async def dep(key: str) -> None:
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        raise ValueError(key)
+
+    wrapper = single_flight_wrapper(dep, SingleFlight())
+    results = await asyncio.gather(*(wrapper(key="a") for _ in range(3)), return_exceptions=True)
+
+    assert calls == ["a"]
+    assert all(isinstance(result, ValueError) for result in results)
+
+    # failed call is not reused
+    with raises(ValueError, match="a"):
+        await wrapper(key="a")
+
+    assert calls == ["a", "a"]
+
+
+async def test_cancellation_of_one_waiter():
+    release = asyncio.Event()
+
+    async def dep() -> str:
+        await release.wait()
+        return "done"
+
+    wrapper = single_flight_wrapper(dep, SingleFlight())
+
+    first = asyncio.ensure_future(wrapper())
+    second = asyncio.ensure_future(wrapper())
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "done"
+    assert first.cancelled()
+
+
+async def test_cancellation_of_all_waiters():
+    cancelled = asyncio.Event()
+
+    async def dep() -> None:
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    wrapper = single_flight_wrapper(dep, SingleFlight())
+
+    task = asyncio.ensure_future(wrapper())
+    await asyncio.sleep(0)
+    task.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+
+async def test_result_reused_within_ttl():
+    calls = []
+
+    async def dep() -> int:
+        calls.append(1)
+        return len(calls)
+
+    wrapper = single_flight_wrapper(dep, SingleFlight(ttl=0.05))
+
+    assert await wrapper() == 1
+    assert await wrapper() == 1
+
+    await asyncio.sleep(0.1)
+    assert await wrapper() == 2
+
+    no_ttl = single_flight_wrapper(dep, SingleFlight())
+    assert await no_ttl() == 3
+    assert await no_ttl() == 4
+
+
+async def test_unhashable_arguments_not_coalesced():
+    calls = []
+
+    async def dep(items: list[int]) -> int:
+        calls.append(items)
+        return len(items)
+
+    wrapper = single_flight_wrapper(dep, SingleFlight())
+    assert await asyncio.gather(wrapper(items=[1]), wrapper(items=[1])) == [1, 1]
+    assert len(calls) == 2
+
+
+def test_single_flight_marker():
+    @single_flight(ttl=1)
+    def dep(a: int) -> int:
+        return a
+
+    def unmarked() -> None:
+        pass
+
+    assert get_single_flight(dep) == SingleFlight(ttl=1)
+    assert get_single_flight(partial(dep, 1)) == SingleFlight(ttl=1)
+    assert get_single_flight(unmarked) is None
+
+
+def test_wrap_single_flight():
+    @single_flight
+    async def dep() -> None:
+        pass
+
+    @single_flight
+    def gen_dep():
+        yield
+
+    async def unmarked() -> None:
+        pass
+
+    dependant = get_dependant(path="/", call=dep)
+    cache_key = dependant.cache_key
+
+    assert wrap_single_flight(dependant)
+    assert dependant.call is not dep
+    assert dependant.cache_key == cache_key
+
+    # already wrapped calls are skipped
+    assert not wrap_single_flight(dependant)
+    assert not wrap_single_flight(get_dependant(path="/", call=gen_dep))
+    assert not wrap_single_flight(get_dependant(path="/", call=unmarked))
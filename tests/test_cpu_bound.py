@@ -0,0 +1,116 @@
+import multiprocessing
+import os
+from typing import Any
+
+from fastapi import Depends, FastAPI, Request
+from pytest import mark, raises
+
+from fastapi_async_safe import cpu_bound, init_app
+from fastapi_async_safe.dependencies import wrap_dependant
+from fastapi_async_safe.exceptions import CpuBoundDependencyError
+from fastapi_async_safe.markers import is_cpu_bound
+from fastapi_async_safe.pool import ProcessPool
+
+from .utils import app_ctx
+
+
+@cpu_bound
+def heavy(value: int) -> dict[str, int]:
+    return {"value": value * 2, "pid": os.getpid()}
+
+
+@cpu_bound
+async def async_heavy() -> None:
+    pass
+
+
+@cpu_bound
+def request_heavy(request: Request) -> None:
+    pass
+
+
+def test_is_cpu_bound():
+    assert is_cpu_bound(heavy)
+    assert not is_cpu_bound(lambda: None)
+
+
+async def test_cpu_bound_dependency():
+    app = FastAPI()
+    init_app(app, process_pool_workers=1)
+
+    @app.get("/")
+    async def route(result: Any = Depends(heavy)) -> Any:
+        return result
+
+    async with app_ctx(app) as client:
+        response = await client.get("/", params={"value": 21})
+        response.raise_for_status()
+
+    result = response.json()
+    assert result["value"] == 42
+    assert result["pid"] != os.getpid()
+
+
+async def test_process_pool_shutdown_after_lifespan_restart():
+    app = FastAPI()
+    init_app(app, process_pool_workers=1)
+
+    @app.get("/")
+    async def route(result: Any = Depends(heavy)) -> Any:
+        return result
+
+    for _ in range(2):
+        async with app_ctx(app) as client:
+            response = await client.get("/", params={"value": 21})
+            response.raise_for_status()
+
+        assert not multiprocessing.active_children()
+
+
+def test_cpu_bound_without_pool():
+    app = FastAPI()
+
+    @app.get("/")
+    def _route(a: Any = Depends(heavy)) -> Any:
+        pass
+
+    *_, route = app.routes
+    (dependant,) = route.dependant.dependencies
+
+    assert not wrap_dependant(dependant)
+
+
+@cpu_bound
+def _local_heavy_factory() -> Any:
+    @cpu_bound
+    def local_heavy() -> None:
+        pass
+
+    return local_heavy
+
+
+@mark.parametrize(
+    "call",
+    [
+        async_heavy,
+        request_heavy,
+        _local_heavy_factory(),
+    ],
+    ids=[
+        "async",
+        "request",
+        "not-picklable",
+    ],
+)
+def test_invalid_cpu_bound(call):
+    app = FastAPI()
+
+    @app.get("/")
+    def _route(a: Any = Depends(call)) -> Any:
+        pass
+
+    *_, route = app.routes
+    (dependant,) = route.dependant.dependencies
+
+    with raises(CpuBoundDependencyError):
+        wrap_dependant(dependant, process_pool=ProcessPool())
@@ -1,4 +1,5 @@
 import threading
+from functools import cache, lru_cache
 from typing import Any
 
 from fastapi import Depends, FastAPI
@@ -146,3 +147,109 @@ def test_double_wrapped():
 
     assert wrap_dependant(dependant)
     assert not wrap_dependant(dependant)
+
+
+async def test_shared_dependency_wrapped_once():
+    app = FastAPI()
+    init_app(app)
+
+    calls = []
+
+    @async_safe
+    class Shared:
+        def __init__(self) -> None:
+            calls.append(1)
+
+    async def first(shared: Shared = Depends()) -> None:
+        pass
+
+    @app.get("/")
+    async def route(a: Any = Depends(first), b: Shared = Depends()) -> Any:
+        pass
+
+    @app.get("/other")
+    async def other(b: Shared = Depends()) -> Any:
+        pass
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        response.raise_for_status()
+
+    # dependency cache works in the same way as without wrapping
+    assert calls == [1]
+
+    *_, route_a, route_b = app.routes
+    assert route_a.dependant.dependencies[1].call is route_b.dependant.dependencies[0].call
+
+
+async def test_lru_cache_dependency_wrapped():
+    app = FastAPI()
+    init_app(app)
+
+    indent = threading.get_ident()
+    calls = {}
+
+    @lru_cache
+    def get_settings() -> str:
+        calls["settings"] = threading.get_ident()
+        return "settings"
+
+    @cache
+    def get_client(name: str) -> str:
+        calls["client"] = threading.get_ident()
+        return name
+
+    @async_unsafe
+    @lru_cache
+    def get_unsafe() -> str:
+        calls["unsafe"] = threading.get_ident()
+        return "unsafe"
+
+    @app.get("/")
+    async def route(
+        a: str = Depends(get_settings),
+        b: str = Depends(get_client),
+        c: str = Depends(get_unsafe),
+    ) -> list[str]:
+        return [a, b, c]
+
+    async with app_ctx(app) as client:
+        response = await client.get("/", params={"name": "client"})
+        assert response.json() == ["settings", "client", "unsafe"]
+
+    assert calls["settings"] == indent
+    assert calls["client"] == indent
+    assert calls["unsafe"] != indent
+
+
+async def test_lru_cache_dependency_folded():
+    app = FastAPI()
+    init_app(app, fold_cached=True)
+
+    calls = []
+
+    @lru_cache
+    def get_settings() -> dict[str, int]:
+        calls.append("settings")
+        return {"value": len(calls)}
+
+    @lru_cache
+    def get_client(name: str) -> str:
+        calls.append(name)
+        return name
+
+    @app.get("/")
+    async def route(settings: Any = Depends(get_settings), client: str = Depends(get_client)) -> list[Any]:
+        return [settings, client]
+
+    async with app_ctx(app) as client:
+        # zero-argument dependency is resolved on startup
+        assert calls == ["settings"]
+
+        get_settings.cache_clear()
+
+        for _ in range(2):
+            response = await client.get("/", params={"name": "client"})
+            assert response.json() == [{"value": 1}, "client"]
+
+    assert calls == ["settings", "client"]
@@ -0,0 +1,127 @@
+import threading
+from collections.abc import Iterator
+from typing import Any
+
+from fastapi import Body, FastAPI
+from pytest import raises
+
+from fastapi_async_safe import Lazy, async_safe, init_app, lazy_depends
+from fastapi_async_safe.exceptions import LazyDependencyError
+
+from .utils import app_ctx
+
+
+async def test_not_resolved_if_not_used():
+    app = FastAPI()
+    init_app(app)
+
+    calls = []
+
+    def dep() -> int:
+        calls.append(1)
+        return 1
+
+    @app.get("/")
+    async def route(flag: bool, value: Lazy[int] = lazy_depends(dep)) -> Any:
+        return await value if flag else None
+
+    async with app_ctx(app) as client:
+        response = await client.get("/", params={"flag": False})
+        response.raise_for_status()
+        assert response.json() is None
+        assert not calls
+
+        response = await client.get("/", params={"flag": True})
+        response.raise_for_status()
+        assert response.json() == 1
+        assert calls == [1]
+
+
+async def test_resolved_once():
+    app = FastAPI()
+    init_app(app)
+
+    calls = []
+
+    async def dep() -> int:
+        calls.append(1)
+        return len(calls)
+
+    @app.get("/")
+    async def route(value: Lazy[int] = lazy_depends(dep)) -> Any:
+        return [await value, await value.resolve(), value.resolved]
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        response.raise_for_status()
+
+    assert response.json() == [1, 1, True]
+
+
+async def test_attribute_access():
+    app = FastAPI()
+    init_app(app)
+
+    main_thread = threading.get_ident()
+
+    @async_safe
+    class Service:
+        def __init__(self, q: str) -> None:
+            self.q = q
+            self.thread = threading.get_ident()
+
+        def upper(self) -> str:
+            return self.q.upper()
+
+        async def lower(self) -> str:
+            return self.q.lower()
+
+    @app.get("/")
+    async def route(service: Lazy[Service] = lazy_depends(Service)) -> Any:
+        return {
+            "q": await service.q,
+            "upper": await service.upper(),
+            "lower": await service.lower(),
+            "inline": await service.thread == main_thread,
+        }
+
+    async with app_ctx(app) as client:
+        response = await client.get("/", params={"q": "Value"})
+        response.raise_for_status()
+
+        assert response.json() == {"q": "Value", "upper": "VALUE", "lower": "value", "inline": True}
+
+        response = await client.get("/")
+        assert response.status_code == 422
+
+
+async def test_generator_closed_after_request():
+    app = FastAPI()
+    init_app(app)
+
+    events = []
+
+    def dep() -> Iterator[str]:
+        events.append("enter")
+        yield "value"
+        events.append("exit")
+
+    @app.get("/")
+    async def route(value: Lazy[str] = lazy_depends(dep)) -> Any:
+        result = await value
+        events.append("endpoint")
+        return result
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        response.raise_for_status()
+
+    assert events == ["enter", "endpoint", "exit"]
+
+
+def test_body_dependency():
+    def dep(body: dict[str, Any] = Body()) -> None:
+        pass
+
+    with raises(LazyDependencyError):
+        lazy_depends(dep)
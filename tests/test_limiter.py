@@ -0,0 +1,102 @@
+import asyncio
+
+from anyio import CapacityLimiter, to_thread
+from fastapi import FastAPI
+from pytest import raises
+
+from fastapi_async_safe import LimiterAutosizer, init_app
+from fastapi_async_safe.exceptions import LimiterBoundsError
+from fastapi_async_safe.limiter import LimiterMetrics
+
+from .utils import app_ctx
+
+
+async def test_adjust():
+    limiter = CapacityLimiter(2)
+    autosizer = LimiterAutosizer(min_tokens=1, max_tokens=4, step=1, limiter=limiter)
+
+    release = asyncio.Event()
+
+    async def borrow() -> None:
+        async with limiter:
+            await release.wait()
+
+    tasks = [asyncio.create_task(borrow()) for _ in range(5)]
+    await asyncio.sleep(0)
+
+    assert autosizer.metrics() == LimiterMetrics(
+        min_tokens=1,
+        max_tokens=4,
+        total_tokens=2,
+        borrowed_tokens=2,
+        tasks_waiting=3,
+    )
+
+    # grows by number of waiting tasks, but not more than max_tokens
+    assert autosizer.adjust() == 4
+
+    # all tokens are used, nothing to change
+    await asyncio.sleep(0)
+    assert autosizer.adjust() == 4
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    # shrinks step by step, but not less than min_tokens
+    assert [autosizer.adjust() for _ in range(4)] == [3, 2, 1, 1]
+
+
+def test_invalid_bounds():
+    with raises(LimiterBoundsError):
+        LimiterAutosizer(min_tokens=10, max_tokens=5)
+
+
+async def test_init_app():
+    app = FastAPI()
+    autosizer = LimiterAutosizer(min_tokens=5, max_tokens=10, interval=0.01)
+    init_app(app, autosize_limiter=autosizer)
+
+    limiter = to_thread.current_default_thread_limiter()
+    initial_tokens = limiter.total_tokens
+
+    async with app_ctx(app):
+        await asyncio.sleep(0.05)
+
+        # limiter is idle, so it's shrunk to min_tokens
+        assert autosizer.metrics().total_tokens == 5
+
+    assert limiter.total_tokens == initial_tokens
+
+
+async def test_default_min_tokens():
+    limiter = CapacityLimiter(4)
+    autosizer = LimiterAutosizer(max_tokens=8, step=1, limiter=limiter)
+
+    async with autosizer.running():
+        # idle limiter is not shrunk below its starting size
+        assert autosizer.adjust() == 4
+        assert autosizer.metrics().min_tokens == 4
+
+        limiter.total_tokens = 6
+        assert [autosizer.adjust() for _ in range(3)] == [5, 4, 4]
+
+    limiter.total_tokens = 2
+
+    async with autosizer.running():
+        assert autosizer.metrics().min_tokens == 2
+
+    assert limiter.total_tokens == 2
+
+
+async def test_init_app_default():
+    app = FastAPI()
+    init_app(app, autosize_limiter=True)
+
+    limiter = to_thread.current_default_thread_limiter()
+    limiter.total_tokens = float("inf")
+
+    async with app_ctx(app):
+        assert limiter.total_tokens <= 200
+
+    assert limiter.total_tokens == float("inf")
+    limiter.total_tokens = 40
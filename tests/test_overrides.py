@@ -0,0 +1,160 @@
+import threading
+from typing import Any
+
+from fastapi import APIRouter, Depends, FastAPI
+
+from fastapi_async_safe import async_safe, init_app, lazy_depends
+from fastapi_async_safe.dependencies import wrap_dependencies
+from fastapi_async_safe.overrides import DependencyOverrides, DependencyOverridesProvider
+
+from .utils import app_ctx
+
+
+@async_safe
+def get_value() -> str:
+    return "original"
+
+
+async def test_override_of_wrapped_dependency():
+    app = FastAPI()
+    init_app(app)
+
+    @app.get("/")
+    async def route(value: str = Depends(get_value)) -> str:
+        return value
+
+    async with app_ctx(app) as client:
+        assert (await client.get("/")).json() == "original"
+
+        # overrides are set after startup, when dependency is already wrapped
+        app.dependency_overrides[get_value] = lambda: "first"
+        assert (await client.get("/")).json() == "first"
+
+        app.dependency_overrides[get_value] = lambda: "second"
+        assert (await client.get("/")).json() == "second"
+
+        app.dependency_overrides = {}
+        assert (await client.get("/")).json() == "original"
+
+
+async def test_override_wrappers_bounded(monkeypatch):
+    monkeypatch.setattr("fastapi_async_safe.dependencies._MAX_OVERRIDE_WRAPPERS", 2)
+
+    app = FastAPI()
+    init_app(app)
+
+    def make_override(value: str) -> Any:
+        return async_safe(lambda: value)
+
+    @app.get("/")
+    async def route(value: str = Depends(get_value)) -> str:
+        return value
+
+    async with app_ctx(app) as client:
+        # e.g. each test of a suite sets its own override on module-level app
+        for i in range(5):
+            app.dependency_overrides[get_value] = make_override(str(i))
+            assert (await client.get("/")).json() == str(i)
+
+            # wrapper of the same override is reused
+            assert (await client.get("/")).json() == str(i)
+
+    (api_route,) = app.routes[-1:]
+    assert len(api_route.dependency_overrides_provider.wrap.keywords["override_wrappers"]) == 2
+
+
+async def test_override_follows_safety_policy():
+    app = FastAPI()
+    init_app(app)
+
+    ident = threading.get_ident()
+    calls = {}
+
+    def get_other() -> str:
+        return "other"
+
+    @async_safe
+    def safe_override() -> str:
+        calls["safe"] = threading.get_ident()
+        return "safe"
+
+    @async_safe
+    def safe_sub_dependency() -> str:
+        calls["sub"] = threading.get_ident()
+        return "sub"
+
+    def unsafe_override(sub: str = Depends(safe_sub_dependency)) -> str:
+        calls["unsafe"] = threading.get_ident()
+        return sub
+
+    @app.get("/")
+    async def route(value: str = Depends(get_value), other: str = Depends(get_other)) -> list[str]:
+        return [value, other]
+
+    app.dependency_overrides[get_value] = safe_override
+    app.dependency_overrides[get_other] = unsafe_override
+
+    async with app_ctx(app) as client:
+        assert (await client.get("/")).json() == ["safe", "sub"]
+
+    assert calls["safe"] == ident
+    assert calls["sub"] == ident
+    assert calls["unsafe"] != ident
+
+
+async def test_override_of_lazy_dependency():
+    app = FastAPI()
+    init_app(app)
+
+    @app.get("/")
+    async def route(value: Any = lazy_depends(get_value)) -> str:
+        return await value
+
+    app.dependency_overrides[get_value] = lambda: "overridden"
+
+    async with app_ctx(app) as client:
+        assert (await client.get("/")).json() == "overridden"
+
+
+async def test_overrides_provider_not_nested():
+    app = FastAPI()
+
+    @app.get("/")
+    async def route(value: str = Depends(get_value)) -> str:
+        return value
+
+    wrap_dependencies(app)
+    wrap_dependencies(app)
+
+    (route_obj,) = [r for r in app.routes if getattr(r, "endpoint", None) is route]
+    provider = route_obj.dependency_overrides_provider
+
+    assert isinstance(provider, DependencyOverridesProvider)
+    assert provider.provider is app
+
+
+def test_router_without_overrides_provider():
+    router = APIRouter()
+
+    @router.get("/")
+    async def route(value: str = Depends(get_value)) -> str:
+        return value
+
+    wrap_dependencies(router)
+
+    assert all(r.dependency_overrides_provider is None for r in router.routes)
+
+
+def test_dependency_overrides_mapping():
+    def original():
+        pass
+
+    def override():
+        pass
+
+    overrides = DependencyOverrides({original: override}, lambda call: call)
+
+    assert overrides[original] is override
+    assert overrides.get(override) is None
+    assert list(overrides) == [original]
+    assert len(overrides) == 1
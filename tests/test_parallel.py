@@ -0,0 +1,242 @@
+import asyncio
+from typing import Any
+
+from fastapi import Depends, FastAPI, HTTPException, Query
+
+from fastapi_async_safe import async_safe, init_app
+from fastapi_async_safe.parallel import deferred_wrapper
+
+from .utils import app_ctx
+
+
+async def test_independent_branches_run_concurrently():
+    app = FastAPI()
+    init_app(app, parallel=True)
+
+    event = asyncio.Event()
+
+    async def first() -> str:
+        # would time out if branches are resolved one after another
+        await asyncio.wait_for(event.wait(), timeout=1)
+        return "first"
+
+    async def second() -> str:
+        event.set()
+        return "second"
+
+    @app.get("/")
+    async def route(a: str = Depends(first), b: str = Depends(second)) -> Any:
+        return [a, b]
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        response.raise_for_status()
+
+    assert response.json() == ["first", "second"]
+
+
+async def test_nested_branches():
+    app = FastAPI()
+    init_app(app, parallel=True)
+
+    event = asyncio.Event()
+
+    async def first() -> str:
+        await asyncio.wait_for(event.wait(), timeout=1)
+        return "first"
+
+    async def second() -> str:
+        event.set()
+        return "second"
+
+    @async_safe
+    class Service:
+        def __init__(self, a: str = Depends(first), b: str = Depends(second)) -> None:
+            self.values = [a, b]
+
+    async def current(service: Service = Depends()) -> list[str]:
+        return service.values
+
+    async def other() -> str:
+        return "other"
+
+    @app.get("/")
+    async def route(values: list[str] = Depends(current), o: str = Depends(other)) -> Any:
+        return [*values, o]
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        response.raise_for_status()
+
+    assert response.json() == ["first", "second", "other"]
+
+
+async def test_dependency_cache_preserved():
+    app = FastAPI()
+    init_app(app, parallel=True)
+
+    calls = []
+
+    async def shared() -> int:
+        calls.append(1)
+        value = len(calls)
+
+        await asyncio.sleep(0)
+        return value
+
+    async def first(value: int = Depends(shared)) -> int:
+        return value
+
+    async def second(value: int = Depends(shared)) -> int:
+        return value
+
+    @app.get("/")
+    async def route(
+        a: int = Depends(first),
+        b: int = Depends(second),
+        c: int = Depends(shared),
+        d: int = Depends(shared, use_cache=False),
+    ) -> Any:
+        return [a, b, c, d]
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        response.raise_for_status()
+
+    assert response.json() == [1, 1, 1, 2]
+    assert len(calls) == 2
+
+
+async def test_errors_order_preserved():
+    app = FastAPI()
+    init_app(app, parallel=True)
+
+    cancelled = asyncio.Event()
+
+    async def first() -> None:
+        await asyncio.sleep(0.01)
+        raise HTTPException(401)
+
+    async def second() -> None:
+        raise HTTPException(403)
+
+    async def third() -> None:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    @app.get("/")
+    async def route(
+        a: Any = Depends(first),
+        b: Any = Depends(second),
+        c: Any = Depends(third),
+    ) -> Any:
+        pass  # pragma: no cover
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+
+    assert response.status_code == 401
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+async def test_errors_order_preserved_with_invalid_params():
+    app = FastAPI()
+    init_app(app, parallel=True)
+
+    async def auth() -> None:
+        await asyncio.sleep(0.01)
+        raise HTTPException(401)
+
+    async def other() -> str:
+        return "other"
+
+    @app.get("/")
+    async def route(
+        a: Any = Depends(auth),
+        b: str = Depends(other),
+        q: int = Query(),
+    ) -> Any:
+        pass  # pragma: no cover
+
+    @app.get("/valid")
+    async def valid_route(
+        b: str = Depends(other),
+        c: str = Depends(other, use_cache=False),
+        q: int = Query(),
+    ) -> Any:
+        pass  # pragma: no cover
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        assert response.status_code == 401
+
+        response = await client.get("/valid")
+        assert response.status_code == 422
+
+
+async def test_sync_parent_not_parallel():
+    app = FastAPI()
+    init_app(app, parallel=True)
+
+    async def shared() -> str:
+        return "shared"
+
+    async def other() -> str:
+        return "other"
+
+    def sync_parent(value: str = Depends(shared)) -> str:
+        return value
+
+    @app.get("/")
+    async def route(
+        a: str = Depends(shared),
+        b: str = Depends(other),
+        c: str = Depends(sync_parent),
+    ) -> Any:
+        return [a, b, c]
+
+    @app.get("/sync")
+    def sync_route(a: str = Depends(shared), b: str = Depends(other)) -> Any:
+        return [a, b]
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        response.raise_for_status()
+        assert response.json() == ["shared", "other", "shared"]
+
+        response = await client.get("/sync")
+        response.raise_for_status()
+        assert response.json() == ["shared", "other"]
+
+
+async def test_deferred_outside_of_route():
+    async def call() -> int:
+        return 1
+
+    assert await deferred_wrapper(call)() == 1
+
+
+async def test_lifespan_restart():
+    app = FastAPI()
+    init_app(app, parallel=True)
+
+    async def first() -> str:
+        return "first"
+
+    async def second() -> str:
+        return "second"
+
+    @app.get("/")
+    async def route(a: str = Depends(first), b: str = Depends(second)) -> Any:
+        return [a, b]
+
+    for _ in range(2):
+        async with app_ctx(app) as client:
+            response = await client.get("/")
+            response.raise_for_status()
+
+        assert response.json() == ["first", "second"]
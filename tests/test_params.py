@@ -0,0 +1,196 @@
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+from fastapi import Depends, FastAPI, Header, Query, Request
+from fastapi.dependencies.utils import get_dependant
+from pytest import mark, raises
+from typing_extensions import Annotated
+
+from fastapi_async_safe import async_safe, init_app
+from fastapi_async_safe.exceptions import ParamsModelError
+from fastapi_async_safe.markers import is_params_model
+from fastapi_async_safe.params import _QUERY_MODELS_SUPPORTED, compile_params_models
+
+from .utils import app_ctx
+
+requires_query_models = mark.skipif(not _QUERY_MODELS_SUPPORTED, reason="query params models require FastAPI 0.115+")
+
+
+@async_safe(params_model=True)
+@dataclass
+class Pagination:
+    page: Annotated[int, Query(ge=1)] = 1
+    size: Annotated[int, Query(alias="per-page", le=100)] = 20
+    search: Optional[str] = None
+
+
+@async_safe(params_model=True)
+@dataclass
+class Sorting:
+    sort_by: str
+    desc: bool = False
+
+
+def _create_app(compile_params: bool) -> FastAPI:
+    app = FastAPI()
+
+    if compile_params:
+        init_app(app)
+
+    @app.get("/")
+    async def route(
+        pagination: Pagination = Depends(),
+        sorting: Sorting = Depends(),
+        limit: int = 10,
+    ) -> dict[str, Any]:
+        return {"pagination": pagination, "sorting": sorting, "limit": limit}
+
+    return app
+
+
+@requires_query_models
+@mark.parametrize(
+    "params",
+    [
+        {"sort_by": "name"},
+        {"sort_by": "name", "desc": "yes", "page": "3", "per-page": "50", "search": "abc", "limit": "5"},
+        {},
+        {"sort_by": "name", "page": "0", "per-page": "abc"},
+        {"sort_by": "name", "size": "1000", "page": "x", "limit": "y"},
+    ],
+)
+async def test_same_result_as_fastapi(params: dict[str, str]):
+    async with app_ctx(_create_app(False)) as client:
+        expected = await client.get("/", params=params)
+
+    async with app_ctx(_create_app(True)) as client:
+        response = await client.get("/", params=params)
+
+    assert response.status_code == expected.status_code
+
+    # only difference is input of missing errors, compiled model receives all query params at once
+    def _strip_input(body: Any) -> Any:
+        if "detail" not in body:
+            return body
+
+        return [{**err, "input": None} if err["type"] == "missing" else err for err in body["detail"]]
+
+    assert _strip_input(response.json()) == _strip_input(expected.json())
+
+
+@requires_query_models
+async def test_openapi_not_changed():
+    async with app_ctx(_create_app(False)) as client:
+        expected = (await client.get("/openapi.json")).json()
+
+    async with app_ctx(_create_app(True)) as client:
+        assert (await client.get("/openapi.json")).json() == expected
+
+
+@requires_query_models
+async def test_compiled_dependency_cache_and_overrides():
+    app = FastAPI()
+    init_app(app)
+
+    calls = []
+
+    @async_safe(params_model=True)
+    class Filters:
+        def __init__(self, name: str = "") -> None:
+            calls.append(name)
+            self.name = name
+
+    def get_name(filters: Filters = Depends()) -> str:
+        return filters.name
+
+    @app.get("/")
+    async def route(filters: Filters = Depends(), name: str = Depends(get_name)) -> list[str]:
+        return [filters.name, name]
+
+    async with app_ctx(app) as client:
+        assert (await client.get("/", params={"name": "a"})).json() == ["a", "a"]
+        assert calls == ["a"]
+
+        app.dependency_overrides[Filters] = lambda: Filters(name="overridden")
+        assert (await client.get("/", params={"name": "a"})).json() == ["overridden", "overridden"]
+
+
+@requires_query_models
+async def test_coroutine_params_model():
+    app = FastAPI()
+    init_app(app)
+
+    @async_safe(params_model=True)
+    async def get_range(start: int = 0, end: int = 10) -> list[int]:
+        return [start, end]
+
+    @app.get("/")
+    async def route(value: list[int] = Depends(get_range)) -> list[int]:
+        return value
+
+    async with app_ctx(app) as client:
+        assert (await client.get("/", params={"start": "5"})).json() == [5, 10]
+
+
+def _sub() -> None:
+    pass
+
+
+def _with_sub(a: None = Depends(_sub), b: int = 1) -> None:
+    pass
+
+
+def _without_params() -> None:
+    pass
+
+
+def _with_header(a: str = Header(), b: int = 1) -> None:
+    pass
+
+
+def _with_request(request: Request, b: int = 1) -> None:
+    pass
+
+
+def _generator(b: int = 1) -> Iterator[None]:
+    yield
+
+
+@requires_query_models
+@mark.parametrize(
+    ("dep", "reason"),
+    [
+        (_with_sub, "sub-dependencies"),
+        (_without_params, "no query params"),
+        (_with_header, "header params"),
+        (_with_request, "request object"),
+        (_generator, "generator"),
+    ],
+)
+def test_not_compilable_dependency(dep: Any, reason: str):
+    async_safe(params_model=True)(dep)
+
+    with raises(ParamsModelError, match=reason):
+        compile_params_models(get_dependant(path="/", call=lambda value=Depends(dep): None))
+
+
+def test_old_fastapi_version(monkeypatch):
+    monkeypatch.setattr("fastapi_async_safe.params._QUERY_MODELS_SUPPORTED", False)
+
+    with raises(ParamsModelError, match="require FastAPI"):
+        compile_params_models(get_dependant(path="/", call=lambda value=Depends(Sorting): None))
+
+
+def test_not_marked_dependencies_not_compiled():
+    dependant = get_dependant(path="/", call=lambda page: None)
+
+    assert compile_params_models(dependant) is dependant
+
+
+def test_params_model_marker_not_inherited():
+    class Child(Pagination):
+        pass
+
+    assert is_params_model(Pagination)
+    assert not is_params_model(Child)
+    assert not is_params_model(async_safe(lambda: None))
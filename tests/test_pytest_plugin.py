@@ -0,0 +1,100 @@
+from collections.abc import Iterator
+from typing import Any
+
+from fastapi import Depends, FastAPI
+from pytest import Pytester, raises
+
+from fastapi_async_safe import async_safe, init_app
+from fastapi_async_safe.exceptions import ThreadpoolOffloadError
+from fastapi_async_safe.pytest_plugin import ThreadpoolGuard
+
+from .utils import app_ctx
+
+
+def sync_dep() -> int:
+    return 1
+
+
+def gen_dep() -> Iterator[int]:
+    yield 1
+
+
+@async_safe
+def safe_dep() -> int:
+    return 1
+
+
+async def test_offload_reported():
+    app = FastAPI()
+    init_app(app)
+
+    @app.get("/safe")
+    async def safe_route(a: int = Depends(safe_dep)) -> Any:
+        return a
+
+    @app.get("/sync")
+    async def sync_route(a: int = Depends(sync_dep)) -> Any:
+        return a  # pragma: no cover
+
+    @app.get("/gen")
+    async def gen_route(a: int = Depends(gen_dep)) -> Any:
+        return a  # pragma: no cover
+
+    async with app_ctx(app) as client:
+        with ThreadpoolGuard().activate() as guard:
+            response = await client.get("/safe")
+            response.raise_for_status()
+
+            assert not guard.calls
+
+            with raises(ThreadpoolOffloadError, match=r"tests\.test_pytest_plugin\.sync_dep was offloaded"):
+                await client.get("/sync")
+
+            with raises(ThreadpoolOffloadError, match=r"tests\.test_pytest_plugin\.gen_dep was offloaded"):
+                await client.get("/gen")
+
+        assert set(guard.calls) == {sync_dep, gen_dep}
+
+        # guard is not active anymore
+        response = await client.get("/sync")
+        response.raise_for_status()
+
+
+def test_marker(pytester: Pytester):
+    pytester.makeini(
+        """
+        [pytest]
+        asyncio_mode = auto
+        """,
+    )
+    pytester.makepyfile(
+        """
+        from anyio import to_thread
+        from pytest import mark
+
+        @mark.no_threadpool
+        async def test_marked():
+            await to_thread.run_sync(print)
+
+        async def test_fixture(no_threadpool):
+            await to_thread.run_sync(print)
+
+        @mark.no_threadpool
+        async def test_swallowed():
+            try:
+                await to_thread.run_sync(print)
+            except AssertionError:
+                pass
+
+        async def test_not_marked():
+            await to_thread.run_sync(print)
+        """,
+    )
+
+    result = pytester.runpytest("-p", "fastapi_async_safe.pytest_plugin")
+    result.assert_outcomes(passed=2, failed=2, errors=3)
+    result.stdout.fnmatch_lines(["*ThreadpoolOffloadError: builtins.print was offloaded to the thread-pool*"])
+
+    # offload is reported even if error raised inside of the test is swallowed
+    result.stdout.fnmatch_lines(["*Calls were offloaded to the thread-pool: builtins.print*"])
+    result.stdout.fnmatch_lines(["ERROR *::test_swallowed - Failed: Calls were offloaded*"])
@@ -0,0 +1,147 @@
+import os
+import threading
+from typing import Any
+
+from fastapi import FastAPI
+from fastapi.exceptions import ResponseValidationError
+from pydantic import BaseModel, model_validator
+from pytest import mark, raises
+
+from fastapi_async_safe import async_safe, init_app, offload_large_responses, serialization_policy
+from fastapi_async_safe.serialization import serialize_response
+
+from .utils import app_ctx
+
+
+class Item(BaseModel):
+    thread: int = 0
+    pid: int = 0
+
+    @model_validator(mode="after")
+    def _mark_executor(self) -> "Item":
+        self.thread = threading.get_ident()
+        self.pid = os.getpid()
+        return self
+
+
+async def test_sync_endpoint_wrapped():
+    app = FastAPI()
+    init_app(app)
+
+    indent = threading.get_ident()
+
+    @app.get("/", response_model=Item)
+    @async_safe
+    def route() -> Any:
+        assert threading.get_ident() == indent
+        return {}
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        response.raise_for_status()
+
+    assert response.json()["thread"] == indent
+
+
+@mark.parametrize(
+    ("size", "in_loop"),
+    [
+        (1, True),
+        (10, False),
+    ],
+)
+async def test_offload_large_responses(size, in_loop):
+    app = FastAPI()
+    init_app(app, serialization=offload_large_responses(threshold=10))
+
+    @app.get("/", response_model=list[Item])
+    async def route() -> Any:
+        return [{} for _ in range(size)]
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        response.raise_for_status()
+
+    items = response.json()
+    assert len(items) == size
+    assert all((item["thread"] == threading.get_ident()) is in_loop for item in items)
+
+
+async def test_route_policy():
+    app = FastAPI()
+    init_app(app, serialization="thread")
+
+    @app.get("/inline", response_model=Item)
+    @serialization_policy("inline")
+    def inline_route() -> Any:
+        return {}
+
+    @app.get("/thread", response_model=Item)
+    async def thread_route() -> Any:
+        return {}
+
+    @app.get("/no-model")
+    async def no_model_route() -> Any:
+        return {"ok": True}
+
+    async with app_ctx(app) as client:
+        inline = (await client.get("/inline")).json()
+        thread = (await client.get("/thread")).json()
+        no_model = (await client.get("/no-model")).json()
+
+    assert inline["thread"] == threading.get_ident()
+    assert thread["thread"] != threading.get_ident()
+    assert no_model == {"ok": True}
+
+
+async def test_process_policy():
+    app = FastAPI()
+    init_app(app, serialization="process", process_pool_workers=1)
+
+    @app.get("/", response_model=Item)
+    async def route() -> Any:
+        return {}
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        response.raise_for_status()
+
+    assert response.json()["pid"] != os.getpid()
+
+
+async def test_process_policy_not_picklable():
+    app = FastAPI()
+    init_app(app, serialization="process", process_pool_workers=1)
+
+    class LocalItem(Item):
+        pass
+
+    @app.get("/", response_model=LocalItem)
+    async def route() -> Any:
+        return {}
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        response.raise_for_status()
+
+    item = response.json()
+    assert item["pid"] == os.getpid()
+    assert item["thread"] != threading.get_ident()
+
+
+@mark.parametrize("mode", ["inline", "thread", "process"])
+async def test_invalid_response(mode):
+    app = FastAPI()
+    init_app(app, serialization=mode, process_pool_workers=1)
+
+    @app.get("/", response_model=Item)
+    async def route() -> Any:
+        return {"thread": "not-a-number"}
+
+    async with app_ctx(app) as client:
+        with raises(ResponseValidationError):
+            await client.get("/")
+
+
+async def test_serialize_response_outside_of_route():
+    assert await serialize_response(response_content={"a": 1}) == {"a": 1}
@@ -0,0 +1,187 @@
+import asyncio
+import threading
+import time
+
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.dependencies.utils import get_dependant
+from pytest import raises
+
+from fastapi_async_safe import Bulkhead, async_safe, async_unsafe, bulkhead, init_app
+from fastapi_async_safe.decorators import safe_async_wrapper
+from fastapi_async_safe.exceptions import DependencyTimeoutError
+from fastapi_async_safe.markers import get_timeout
+from fastapi_async_safe.timeouts import timeout_wrapper, wrap_timeout
+
+from .utils import app_ctx
+
+
+async def test_threadpool_dependency_timeout():
+    app = FastAPI()
+    init_app(app)
+
+    release = threading.Event()
+    finished = threading.Event()
+
+    @async_unsafe(timeout=0.05)
+    def slow() -> str:
+        release.wait(1)
+        finished.set()
+        return "slow"
+
+    @app.get("/")
+    def route(value: str = Depends(slow)) -> str:
+        return value
+
+    async with app_ctx(app) as client:
+        start = time.perf_counter()
+        response = await client.get("/")
+
+        assert response.status_code == 504
+        assert response.json() == {"detail": "Dependency timed out after 0.05 seconds"}
+
+        # request fails fast, call is left to complete in the thread
+        assert time.perf_counter() - start < 0.5
+        assert not finished.is_set()
+
+        release.set()
+        await asyncio.to_thread(finished.wait, 1)
+
+
+async def test_default_timeout():
+    app = FastAPI()
+
+    def custom_error(call, timeout):
+        return HTTPException(status_code=503, detail=f"{call.__name__} {timeout}")
+
+    init_app(app, timeout=0.05, timeout_error=custom_error)
+
+    async def slow_async() -> None:
+        await asyncio.sleep(1)
+
+    def fast_sync() -> str:
+        return "sync"
+
+    @async_safe(timeout=1)
+    async def marked() -> str:
+        await asyncio.sleep(0.1)
+        return "marked"
+
+    @app.get("/slow")
+    async def slow_route(_: None = Depends(slow_async)) -> None:
+        pass
+
+    @app.get("/fast")
+    async def fast_route(value: str = Depends(fast_sync), other: str = Depends(marked)) -> list[str]:
+        return [value, other]
+
+    async with app_ctx(app) as client:
+        response = await client.get("/slow")
+        assert response.status_code == 503
+        assert response.json() == {"detail": "slow_async 0.05"}
+
+        assert (await client.get("/fast")).json() == ["sync", "marked"]
+
+
+async def test_bulkhead_dependency_timeout():
+    app = FastAPI()
+    init_app(app, bulkheads={"slow": Bulkhead(tokens=1)}, timeout=0.05)
+
+    release = threading.Event()
+
+    def slow() -> None:
+        release.wait(1)
+
+    @app.get("/")
+    @bulkhead("slow")
+    async def route(_: None = Depends(slow)) -> None:
+        pass
+
+    async with app_ctx(app) as client:
+        assert (await client.get("/")).status_code == 504
+
+        release.set()
+
+
+async def test_late_error_discarded():
+    finished = asyncio.Event()
+
+    async def failing() -> None:
+        # e.g. call that is already offloaded to the thread-pool and can't be cancelled
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            finished.set()
+            raise ValueError from None
+
+    failing.__execution_mode__ = "threadpool"  # type: ignore[attr-defined]
+    wrapper = timeout_wrapper(failing, 0.01)
+
+    with raises(DependencyTimeoutError):
+        await wrapper()
+
+    await asyncio.wait_for(finished.wait(), 1)
+    await asyncio.sleep(0)
+
+
+async def test_call_timeout_error_not_replaced():
+    def sync_call() -> None:
+        raise asyncio.TimeoutError("socket")
+
+    async def async_call() -> None:
+        raise asyncio.TimeoutError("socket")
+
+    for call in (sync_call, async_call):
+        with raises(asyncio.TimeoutError, match="socket"):
+            await timeout_wrapper(call, 5)()
+
+
+async def test_cancelled_caller():
+    release = threading.Event()
+
+    def slow() -> str:
+        release.wait(1)
+        return "slow"
+
+    task = asyncio.ensure_future(timeout_wrapper(slow, 1)())
+    await asyncio.sleep(0.01)
+    task.cancel()
+
+    with raises(asyncio.CancelledError):
+        await task
+
+    release.set()
+
+
+def test_timeout_marker():
+    @async_unsafe(timeout=1)
+    def unsafe() -> None:
+        pass
+
+    @async_safe(timeout=2)
+    async def safe() -> None:
+        pass
+
+    assert get_timeout(unsafe) == 1
+    assert get_timeout(safe) == 2
+    assert get_timeout(async_unsafe(lambda: None)) is None
+
+
+def test_wrap_timeout():
+    def inline() -> None:
+        pass
+
+    def gen():
+        yield
+
+    async def coroutine() -> None:
+        pass
+
+    assert not wrap_timeout(get_dependant(path="/", call=coroutine))
+    assert not wrap_timeout(get_dependant(path="/", call=gen), default=1)
+
+    dependant = get_dependant(path="/", call=coroutine)
+    assert wrap_timeout(dependant, default=1)
+    assert not wrap_timeout(dependant, default=1)
+
+    # inline calls can't be interrupted
+    assert not wrap_timeout(get_dependant(path="/", call=safe_async_wrapper(inline)), default=1)
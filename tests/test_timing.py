@@ -0,0 +1,139 @@
+from collections.abc import Iterator
+from typing import Any
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import JSONResponse
+from pytest import mark
+
+from fastapi_async_safe import ServerTimingMiddleware, async_safe, init_app
+from fastapi_async_safe.timing import DependencyTiming, format_server_timing
+
+from .utils import app_ctx
+
+
+def _metrics(header: str) -> dict[str, str]:
+    return dict(metric.split(";", 1) for metric in header.split(", "))
+
+
+async def test_server_timing_header():
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware)
+    init_app(app, server_timing=True)
+
+    @async_safe
+    def inline_dep() -> int:
+        return 1
+
+    def threadpool_dep() -> int:
+        return 2
+
+    async def coroutine_dep() -> int:
+        return 3
+
+    def generator_dep() -> Iterator[int]:
+        yield 4
+
+    @app.get("/")
+    def route(
+        a: int = Depends(inline_dep),
+        b: int = Depends(threadpool_dep),
+        c: int = Depends(coroutine_dep),
+        d: int = Depends(generator_dep),
+    ) -> Any:
+        return [a, b, c, d]
+
+    for _ in range(2):  # lifespan restart should not wrap dependencies twice
+        async with app_ctx(app) as client:
+            response = await client.get("/")
+            response.raise_for_status()
+
+        assert response.json() == [1, 2, 3, 4]
+
+        metrics = _metrics(response.headers["server-timing"])
+        assert list(metrics) == [
+            "test_server_timing_header._locals_.inline_dep",
+            "test_server_timing_header._locals_.threadpool_dep",
+            "test_server_timing_header._locals_.coroutine_dep",
+            "total",
+        ]
+        assert [value.split(";")[0] for value in metrics.values()] == [
+            'desc="inline"',
+            'desc="threadpool"',
+            'desc="coroutine"',
+            metrics["total"],
+        ]
+
+
+async def test_failed_dependency_measured():
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware)
+    init_app(app, server_timing=True)
+
+    async def dep() -> None:
+        raise ValueError
+
+    @app.get("/")
+    async def route(a: Any = Depends(dep)) -> Any:
+        pass  # pragma: no cover
+
+    @app.exception_handler(ValueError)
+    async def handler(*_: Any) -> Any:
+        return JSONResponse({})
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+
+    assert "test_failed_dependency_measured._locals_.dep" in response.headers["server-timing"]
+
+
+async def test_dependency_cache_preserved():
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware)
+    init_app(app, server_timing=True)
+
+    calls = []
+
+    async def dep() -> int:
+        calls.append(1)
+        return len(calls)
+
+    async def other(value: int = Depends(dep)) -> int:
+        return value
+
+    @app.get("/")
+    async def route(a: int = Depends(dep), b: int = Depends(other)) -> Any:
+        return [a, b]
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        response.raise_for_status()
+
+    assert response.json() == [1, 1]
+    assert "test_dependency_cache_preserved._locals_.route" in response.headers["server-timing"]
+
+
+@mark.parametrize("server_timing", [True, False])
+async def test_not_sampled(server_timing):
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware, sample_rate=0)
+    init_app(app, server_timing=server_timing)
+
+    async def dep() -> int:
+        return 1
+
+    @app.get("/")
+    async def route(a: int = Depends(dep)) -> Any:
+        return a
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        response.raise_for_status()
+
+    assert response.json() == 1
+    assert "server-timing" not in response.headers
+
+
+def test_format_server_timing():
+    timings = [DependencyTiming("Service", "inline", 0.001)]
+
+    assert format_server_timing(timings, 0.002) == 'Service;desc="inline";dur=1.000, total;dur=2.000'
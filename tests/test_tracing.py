@@ -0,0 +1,128 @@
+from typing import Any
+
+from fastapi import Depends, FastAPI
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode
+from pytest import fixture, raises
+
+from fastapi_async_safe import async_safe, init_app
+from fastapi_async_safe.dependencies import _all_dependencies
+from fastapi_async_safe.instrumentation import (
+    CACHE_HIT_ATTRIBUTE,
+    EXECUTION_MODE_ATTRIBUTE,
+    LIMITER_WAIT_ATTRIBUTE,
+    execution_mode,
+    instrumented_wrapper,
+    is_instrumented,
+)
+
+from .utils import app_ctx
+
+
+@fixture
+def exporter() -> InMemorySpanExporter:
+    return InMemorySpanExporter()
+
+
+@fixture
+def tracer(exporter):
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+
+    return provider.get_tracer(__name__)
+
+
+@async_safe
+class Service:
+    pass
+
+
+def get_db() -> str:
+    return "db"
+
+
+async def get_user(db: str = Depends(get_db)) -> str:
+    return "user"
+
+
+async def test_dependency_spans(tracer, exporter):
+    app = FastAPI()
+    init_app(app, tracer=tracer)
+
+    @app.get("/")
+    async def route(
+        service: Service = Depends(),
+        user: str = Depends(get_user),
+        db: str = Depends(get_db),
+    ) -> Any:
+        return [user, db]
+
+    for _ in range(2):  # lifespan restart should not instrument dependencies twice
+        exporter.clear()
+
+        async with app_ctx(app) as client:
+            response = await client.get("/")
+            response.raise_for_status()
+
+    spans = {
+        (span.name, span.attributes[EXECUTION_MODE_ATTRIBUTE], span.attributes[CACHE_HIT_ATTRIBUTE]): span
+        for span in exporter.get_finished_spans()
+    }
+
+    assert set(spans) == {
+        ("Service", "inline", False),
+        ("get_db", "threadpool", False),
+        ("get_user", "coroutine", False),
+        ("get_db", "threadpool", True),
+        ("test_dependency_spans.<locals>.route", "coroutine", False),
+    }
+    assert spans["get_db", "threadpool", False].attributes[LIMITER_WAIT_ATTRIBUTE] >= 0
+
+
+async def test_sync_endpoint_not_traced(tracer, exporter):
+    app = FastAPI()
+    init_app(app, tracer=tracer)
+
+    @app.get("/")
+    def route(db: str = Depends(get_db)) -> Any:
+        return db
+
+    async with app_ctx(app) as client:
+        response = await client.get("/")
+        response.raise_for_status()
+
+    assert [span.name for span in exporter.get_finished_spans()] == ["get_db"]
+
+
+async def test_failed_dependency(tracer, exporter):
+    async def dep() -> None:
+        raise ValueError("boom")
+
+    with raises(ValueError, match="boom"):
+        await instrumented_wrapper(dep, tracer=tracer)()
+
+    (span,) = exporter.get_finished_spans()
+    assert span.status.status_code == StatusCode.ERROR
+
+
+async def test_no_tracer():
+    app = FastAPI()
+    init_app(app)
+
+    @app.get("/")
+    async def route(service: Service = Depends(), db: str = Depends(get_db)) -> Any:
+        pass
+
+    async with app_ctx(app):
+        pass
+
+    *_, api_route = app.routes
+
+    # nothing is instrumented, so there is no overhead at all
+    assert [execution_mode(dependant.call) for dependant in api_route.dependant.dependencies] == [
+        "inline",
+        "threadpool",
+    ]
+    assert not any(is_instrumented(dependant.call) for dependant in _all_dependencies(api_route.dependant))
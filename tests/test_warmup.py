@@ -0,0 +1,96 @@
+import logging
+from typing import Any, Optional
+
+from fastapi import Body, Depends, FastAPI, HTTPException, Path
+
+from fastapi_async_safe import async_safe, init_app
+from fastapi_async_safe.warmup import warmup_app
+
+from .utils import app_ctx
+
+
+async def test_warmup(caplog):
+    app = FastAPI()
+    init_app(app, warmup=True)
+
+    calls = []
+
+    @async_safe
+    class CommonParams:
+        def __init__(self, q: Optional[str] = None, limit: int = 10) -> None:
+            calls.append((q, limit))
+
+    @async_safe
+    def failing() -> None:
+        raise ValueError
+
+    async def not_safe() -> None:
+        calls.append("not-safe")  # pragma: no cover
+
+    @app.get("/")
+    async def route(params: CommonParams = Depends()) -> Any:
+        calls.append("endpoint")  # pragma: no cover
+
+    @app.get("/failing")
+    async def failing_route(a: Any = Depends(failing)) -> Any:
+        pass  # pragma: no cover
+
+    @app.get("/not-safe")
+    async def not_safe_route(a: Any = Depends(not_safe)) -> Any:
+        pass  # pragma: no cover
+
+    @app.post("/post")
+    async def post_route(params: CommonParams = Depends()) -> Any:
+        pass  # pragma: no cover
+
+    @app.get("/items/{item_id}")
+    async def item_route(item_id: int = Path(), params: CommonParams = Depends()) -> Any:
+        pass  # pragma: no cover
+
+    with caplog.at_level(logging.INFO, logger="fastapi_async_safe.warmup"):
+        async with app_ctx(app):
+            pass
+
+    # endpoints are not called, path params are not available, but dependencies are exercised
+    assert calls == [(None, 10), (None, 10)]
+    assert app.openapi_schema is not None
+    assert "Warm-up of 5 routes (2 exercised)" in caplog.text
+    assert [r.getMessage() for r in caplog.records if r.levelno == logging.WARNING] == [
+        "Warm-up of /failing route failed",
+    ]
+
+
+async def test_warmup_http_exception(caplog):
+    app = FastAPI()
+    init_app(app, warmup=True)
+
+    @async_safe
+    def auth() -> None:
+        raise HTTPException(401)
+
+    @app.get("/")
+    async def route(a: Any = Depends(auth)) -> Any:
+        pass  # pragma: no cover
+
+    with caplog.at_level(logging.DEBUG, logger="fastapi_async_safe.warmup"):
+        async with app_ctx(app):
+            pass
+
+    # auth dependency is expected to fail without real headers, it's not a warm-up failure
+    assert "Warm-up of 1 routes (1 exercised)" in caplog.text
+    assert "Warm-up of / route stopped by HTTPException(status_code=401" in caplog.text
+    assert not [r for r in caplog.records if r.levelno == logging.WARNING]
+
+
+async def test_warmup_app_with_body():
+    app = FastAPI(openapi_url=None)
+
+    @app.get("/")
+    async def route(body: Any = Body()) -> Any:
+        pass  # pragma: no cover
+
+    report = await warmup_app(app, app.router)
+
+    assert report.routes == 1
+    assert report.exercised == 0
+    assert report.duration >= 0